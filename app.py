@@ -1,7 +1,13 @@
 
+import os
 import streamlit as st
+
+# Optional sidebar logo: shown when assets/logo5.jpg exists (assets/ is copied into the image with the code); nothing is fetched at run time.
+LOGO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "logo5.jpg")
+
 st.set_page_config(page_title="QuLab", layout="wide")
-st.sidebar.image("https://www.quantuniversity.com/assets/img/logo5.jpg")
+if os.path.exists(LOGO_PATH):
+    st.sidebar.image(LOGO_PATH)
 st.sidebar.divider()
 st.title("QuLab")
 st.divider()
@@ -18,17 +24,35 @@ Upon using this application, users will be able to:
 """)
 
 # Your code starts here
+from corix.diagnostics import start_rerun, stage as diagnostics_stage
+
 page = st.sidebar.selectbox(label="Navigation", options=["Data Overview", "CoRIx Tree Explorer", "Interpretation and Conclusion"])
+show_diagnostics = st.sidebar.toggle("Show diagnostics", key="show_diagnostics")
+diagnostics_placeholder = st.sidebar.empty()
+
+# Per-stage timings are only recorded while the panel is open (or CORIX_DIAGNOSTICS=1 is set)
+diagnostics = start_rerun(page, enabled=show_diagnostics)
+try:
+    if page == "Data Overview":
+        with diagnostics_stage("import page"):
+            from application_pages.page1 import run_page1
+        run_page1()
+    elif page == "CoRIx Tree Explorer":
+        with diagnostics_stage("import page"):
+            from application_pages.page2 import run_page2
+        run_page2()
+    elif page == "Interpretation and Conclusion":
+        with diagnostics_stage("import page"):
+            from application_pages.page3 import run_page3
+        run_page3()
+finally:
+    total_ms = diagnostics.finish()
 
-if page == "Data Overview":
-    from application_pages.page1 import run_page1
-    run_page1()
-elif page == "CoRIx Tree Explorer":
-    from application_pages.page2 import run_page2
-    run_page2()
-elif page == "Interpretation and Conclusion":
-    from application_pages.page3 import run_page3
-    run_page3()
+if show_diagnostics:
+    with diagnostics_placeholder.container():
+        st.markdown("**Diagnostics** (this rerun)")
+        st.dataframe(diagnostics.frame(), hide_index=True)
+        st.caption(f"Total {total_ms:.1f} ms. Allocations are traced with tracemalloc while this panel is open, which slows reruns down.")
 # Your code ends
 
 
@@ -0,0 +1,154 @@
+
+import os
+import streamlit as st
+import pandas as pd
+from corix.attribution import attribute_leaves
+from corix.bootstrap import DEFAULT_RESAMPLES, bootstrap_intervals
+from corix.diagnostics import mark_cache_miss
+from corix.engine import aggregate_all_columns
+from corix.hierarchy import default_hierarchy, load_hierarchy
+from corix.ingest import default_standard_errors_path, leaf_standard_errors
+from corix.query import CorixIndex
+from corix.runs import default_runs_path, open_run_store
+from corix.store import load_score_store
+from corix.treecache import warm_tree_cache
+
+CORIX_DATASET_PATH = 'corix_scores.csv'
+# Optional hierarchy config (.json or .toml) replacing the built-in parent map and aggregation rules.
+CORIX_HIERARCHY_ENV = 'CORIX_HIERARCHY'
+# Every distinct set of compared columns is its own entry; the least recently used ones are evicted.
+COMPARISON_CACHE_MAX_ENTRIES = 8
+# Every what-if edit gives new raw scores and so a new bootstrap entry; the oldest ones are evicted.
+BOOTSTRAP_CACHE_MAX_ENTRIES = 32
+
+# Example CoRIx output scores (Table 8, Appendix E of the NIST ARIA 0.1 Pilot Evaluation Report).
+SAMPLE_CORIX_SCORES = {
+    'Level': [2, 3, 3, 3, 4, 4, 4, 4, 4] + [5] * 36,
+    'Construct': ['Validity/Reliability (V/R)', 'Model Testing (MT)', 'Red Teaming (RT)', 'Field Testing (FT)', 'MT Annotator Label', 'RT Annotator Label', 'RT User Perception', 'FT Annotator Label', 'FT User Perception', 'MT RA 1', 'MT RA 2', 'MT DD 3', 'MT CC 4', 'MT CC 5', 'RT RA 1', 'RT RA 2.1', 'RT DD 3', 'RT DD 4', 'RT CC 5', 'RT UR 1', 'RT UR 2', 'RT UR 3', 'RT UR 4', 'RT UR 5', 'FT RA 1', 'FT RA 2', 'FT DD 3', 'FT CC 4', 'FT CC 5', 'FT UR 1', 'FT UR 2', 'FT UR 3', 'FT UR 4', 'FT UR 5', 'MT QQ 1.1', 'MT QQ 2.1', 'RT QQ 1.1', 'RT QQ 2.1', 'FT QQ 1.1', 'FT QQ 2.1', 'MT Annotator Label (Overall)', 'RT Annotator Label (Overall)', 'RT User Perception (Overall)', 'FT Annotator Label (Overall)', 'FT User Perception (Overall)'],
+    'Application A - Pathfinder': [2.88, 0.72, 2.88, 2.36, 0.72, 3.52, 2.24, 3.06, 1.67, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 4.98, 0.0, 4.98, 0.0, 0.0, 0.0, 0.0, 4.98, 0.0, 0.0, 0.0, 0.0, 0.0, 7.41, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+    'Application B - TV Spoilers': [4.29, 2.29, 3.55, 4.29, 2.29, 3.75, 3.34, 3.58, 5.00, 2.0, 0.0, 0.0, 0.0, 0.0, 0.0, 5.40, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 7.42, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+    'Application C - Meal Planner': [6.30, 6.30, 3.39, 2.80, 6.30, 3.74, 3.05, 3.56, 2.03, 9.0, 7.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 7.42, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+}
+
+
+def write_sample_dataset(filepath):
+    """
+    Writes the example CoRIx scores as a CSV file.
+    Arguments: filepath (string or path-like object to the CSV file).
+    Output: None.
+    """
+    pd.DataFrame(SAMPLE_CORIX_SCORES).to_csv(filepath, index=False)
+
+
+@st.cache_resource
+def load_corix_hierarchy():
+    """
+    Loads the hierarchy config named by the CORIX_HIERARCHY environment variable, or the built-in CoRIx hierarchy.
+    Arguments: None.
+    Output: corix.hierarchy.CorixHierarchy (parent map, root construct and aggregation rules).
+    """
+    mark_cache_miss()
+    config_path = os.environ.get(CORIX_HIERARCHY_ENV)
+    return load_hierarchy(config_path) if config_path else default_hierarchy()
+
+
+# The one loader every page shares: nothing is read (or created) until a page first asks for the data.
+@st.cache_resource
+def load_corix_dataset(filepath=CORIX_DATASET_PATH):
+    """
+    Opens the columnar, memory-mapped store for a CoRIx scores CSV (converting the CSV on first use).
+    The example dataset is written first if the file does not exist yet.
+    The per-scenario trees are then built in the background into the process-wide tree cache.
+    Arguments: filepath (string or path-like object to the CSV file).
+    Output: corix.store.ScoreStore; columns are only read when requested.
+    """
+    if not isinstance(filepath, (str, os.PathLike)):
+        raise TypeError(f"filepath must be a string or a path-like object, got {type(filepath).__name__}")
+    mark_cache_miss()
+    # For production, 'corix_scores.csv' should be a pre-existing file.
+    if not os.path.exists(filepath):
+        write_sample_dataset(filepath)
+    score_store = load_score_store(filepath)
+    warm_tree_cache(score_store, **load_corix_hierarchy().options())
+    return score_store
+
+
+@st.cache_resource
+def load_leaf_standard_errors(filepath=CORIX_DATASET_PATH):
+    """
+    Reads the Level 5 standard errors that `python -m corix.ingest` writes next to a CoRIx scores CSV.
+    Arguments: filepath (string or path-like object to the scores CSV).
+    Output: pd.DataFrame in the scores CSV layout, or None when the scores were not ingested from responses.
+    """
+    if not isinstance(filepath, (str, os.PathLike)):
+        raise TypeError(f"filepath must be a string or a path-like object, got {type(filepath).__name__}")
+    mark_cache_miss()
+    standard_errors_path = default_standard_errors_path(filepath)
+    return pd.read_csv(standard_errors_path) if os.path.exists(standard_errors_path) else None
+
+
+@st.cache_resource
+def load_run_store(filepath=CORIX_DATASET_PATH):
+    """
+    Opens the evaluation-run history kept next to a CoRIx scores CSV and records the CSV as a new run
+    when its content changed since the latest run (columns are read one at a time from the store and
+    only the changed ones are aggregated).
+    Arguments: filepath (string or path-like object to the CSV file).
+    Output: corix.runs.RunStore.
+    """
+    if not isinstance(filepath, (str, os.PathLike)):
+        raise TypeError(f"filepath must be a string or a path-like object, got {type(filepath).__name__}")
+    mark_cache_miss()
+    score_store = load_corix_dataset(filepath)
+    run_store = open_run_store(default_runs_path(filepath))
+    run_store.add_store_run(score_store, label=os.path.basename(filepath), **load_corix_hierarchy().options())
+    return run_store
+
+
+@st.cache_resource
+def compute_query_index(_score_store, columns):
+    """
+    Sorted score and name indexes over every application/scenario column, for the search box.
+    Arguments: _score_store (ScoreStore, not hashed), columns (tuple of column names).
+    Output: corix.query.CorixIndex.
+    """
+    mark_cache_miss()
+    return CorixIndex(aggregate_all_columns(_score_store.frame(columns), columns=list(columns), **load_corix_hierarchy().options()))
+
+
+@st.cache_resource(max_entries=COMPARISON_CACHE_MAX_ENTRIES)
+def compute_comparison_score_matrix(_score_store, columns):
+    """
+    Aggregates all compared columns together (one bottom-up pass, not one tree build per column).
+    Arguments: _score_store (ScoreStore, not hashed), columns (tuple of column names).
+    Output: corix.engine.CorixScoreMatrix.
+    """
+    mark_cache_miss()
+    return aggregate_all_columns(_score_store.frame(columns), columns=list(columns), **load_corix_hierarchy().options())
+
+
+@st.cache_data(max_entries=BOOTSTRAP_CACHE_MAX_ENTRIES)
+def compute_bootstrap_bounds(_tree_data, column, raw_scores_bytes, hierarchy_key):
+    """
+    Bootstrap confidence bounds of every node score, cached per column, raw item scores and hierarchy.
+    Items with ingested responses are also perturbed by their standard error (see load_leaf_standard_errors).
+    Arguments: _tree_data (CorixTree, not hashed), column (str), raw_scores_bytes (bytes, cache key only),
+    hierarchy_key (tuple of the topology and aggregation rules keys, cache key only).
+    Output: tuple of the lower and upper bounds (np.ndarray), aligned with the topology's node ids.
+    """
+    mark_cache_miss()
+    standard_errors = load_leaf_standard_errors()
+    leaf_errors = None if standard_errors is None else leaf_standard_errors(standard_errors, _tree_data.topology, column)
+    intervals = bootstrap_intervals(_tree_data, n_resamples=DEFAULT_RESAMPLES, seed=0, leaf_standard_errors=leaf_errors)
+    return intervals.low, intervals.high
+
+
+@st.cache_resource
+def compute_leaf_attribution(_score_store, columns):
+    """
+    Leaf shares, sensitivities and flip moves for all columns, from one aggregation and one top-down sweep.
+    Arguments: _score_store (ScoreStore, not hashed), columns (tuple of column names).
+    Output: corix.attribution.LeafAttribution.
+    """
+    mark_cache_miss()
+    return attribute_leaves(compute_comparison_score_matrix(_score_store, columns))
@@ -2,32 +2,24 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import os # For os.PathLike in load_corix_dataset
 from streamlit_plotly_events import plotly_events
-
-# Helper function to load data - needs to be accessible across pages
-@st.cache_data
-def load_corix_dataset(filepath):
-    if not isinstance(filepath, (str, os.PathLike)):
-        raise TypeError(f"filepath must be a string or a path-like object, got {type(filepath).__name__}")
-    df = pd.read_csv(filepath)
-    return df
-
-# Ensure the corix_scores.csv file exists for the app to run
-if not os.path.exists('corix_scores.csv'):
-    data = {
-        'Level': [2, 3, 3, 3, 4, 4, 4, 4, 4, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5],
-        'Construct': ['Validity/Reliability (V/R)', 'Model Testing (MT)', 'Red Teaming (RT)', 'Field Testing (FT)', 'MT Annotator Label', 'RT Annotator Label', 'RT User Perception', 'FT Annotator Label', 'FT User Perception', 'MT RA 1', 'MT RA 2', 'MT DD 3', 'MT CC 4', 'MT CC 5', 'RT RA 1', 'RT RA 2.1', 'RT DD 3', 'RT DD 4', 'RT CC 5', 'RT UR 1', 'RT UR 2', 'RT UR 3', 'RT UR 4', 'RT UR 5', 'FT RA 1', 'FT RA 2', 'FT DD 3', 'FT CC 4', 'FT CC 5', 'FT UR 1', 'FT UR 2', 'FT UR 3', 'FT UR 4', 'FT UR 5', 'MT QQ 1.1', 'MT QQ 2.1', 'RT QQ 1.1', 'RT QQ 2.1', 'FT QQ 1.1', 'FT QQ 2.1', 'MT Annotator Label (Overall)', 'RT Annotator Label (Overall)', 'RT User Perception (Overall)', 'FT Annotator Label (Overall)', 'FT User Perception (Overall)'],
-        'Application A - Pathfinder': [2.88, 0.72, 2.88, 2.36, 0.72, 3.52, 2.24, 3.06, 1.67, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 4.98, 0.0, 4.98, 0.0, 0.0, 0.0, 0.0, 4.98, 0.0, 0.0, 0.0, 0.0, 0.0, 7.41, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
-        'Application B - TV Spoilers': [4.29, 2.29, 3.55, 4.29, 2.29, 3.75, 3.34, 3.58, 5.00, 2.0, 0.0, 0.0, 0.0, 0.0, 0.0, 5.40, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 7.42, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
-        'Application C - Meal Planner': [6.30, 6.30, 3.39, 2.80, 6.30, 3.74, 3.05, 3.56, 2.03, 9.0, 7.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 7.42, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
-    }
-    corix_df = pd.DataFrame(data)
-    corix_df.to_csv('corix_scores.csv', index=False)
-
-loaded_df = load_corix_dataset('corix_scores.csv')
-
+from application_pages.data import compute_bootstrap_bounds, compute_query_index, load_corix_dataset, load_corix_hierarchy, load_run_store
+from corix.diagnostics import stage as diagnostics_stage
+from corix.bootstrap import DEFAULT_CONFIDENCE, DEFAULT_RESAMPLES, BootstrapIntervals
+from corix.layout import tree_layout
+from corix.render import (
+    DEFAULT_COLLAPSE_BELOW,
+    LARGE_TREE_NODE_THRESHOLD,
+    cached_tree_figure,
+    node_id_from_click,
+)
+from corix.store import ScoreStore
+from corix.treecache import cached_store_tree
+from corix.whatif import WhatIfAggregator
+
+RENDER_MODES = ['Auto', 'Standard', 'Large tree (WebGL)']
+MAX_SEARCH_ROWS = 500
+DETAILS_ITEMS_PAGE_SIZE = 20
 
 def run_page2():
     st.subheader("Section 4: Methodology Overview: Understanding the CoRIx Framework")
@@ -76,117 +68,38 @@ def run_page2():
     These functions are critical for accurately reflecting how risks propagate and combine across different evaluation layers, providing aggregated scores at each level of the tree.
     """)
 
-    def aggregate_node_score(children_scores, level):
-        if level == 2:
-            return np.max(children_scores)
-        elif level in [3, 4, 5]:
-            return np.mean(children_scores)
-        else:
-            return np.nan
-
-    @st.cache_data
-    def build_corix_tree_data(dataframe, application, scenario):
-        if not isinstance(dataframe, pd.DataFrame):
-            raise TypeError("Input 'dataframe' must be a pandas DataFrame.")
-        required_cols = ['Level', 'Construct']
-        for col in required_cols:
-            if col not in dataframe.columns:
-                raise KeyError(f"Required column '{col}' not found in the DataFrame.")
+    def build_corix_tree_data(score_store, application, scenario):
+        if not isinstance(score_store, ScoreStore):
+            raise TypeError("Input 'score_store' must be a ScoreStore.")
         app_scenario_col = f"{application} - {scenario}"
-        if app_scenario_col not in dataframe.columns:
-            raise KeyError(f"The column '{app_scenario_col}' not found in the DataFrame.")
-        if dataframe.empty:
-            return {}
-
-        df_filtered = dataframe[required_cols + [app_scenario_col]].copy()
-        df_filtered.rename(columns={app_scenario_col: 'score'}, inplace=True)
-        df_filtered = df_filtered.sort_values(by=['Level', 'Construct']).reset_index(drop=True)
-
-        nodes = {}
-        parent_map = {
-            'Model Testing (MT)': 'Validity/Reliability (V/R)', 'Red Teaming (RT)': 'Validity/Reliability (V/R)', 'Field Testing (FT)': 'Validity/Reliability (V/R)',
-            'MT Annotator Label': 'Model Testing (MT)', 'RT Annotator Label': 'Red Teaming (RT)', 'RT User Perception': 'Red Teaming (RT)', 'FT Annotator Label': 'Field Testing (FT)', 'FT User Perception': 'Field Testing (FT)',
-            'MT RA 1': 'MT Annotator Label', 'MT RA 2': 'MT Annotator Label', 'MT DD 3': 'MT Annotator Label', 'MT CC 4': 'MT Annotator Label', 'MT CC 5': 'MT Annotator Label', 'MT QQ 1.1': 'MT Annotator Label', 'MT QQ 2.1': 'MT Annotator Label',
-            'RT RA 1': 'RT Annotator Label', 'RT RA 2.1': 'RT Annotator Label', 'RT DD 3': 'RT Annotator Label', 'RT DD 4': 'RT Annotator Label', 'RT CC 5': 'RT Annotator Label', 'RT QQ 1.1': 'RT Annotator Label', 'RT QQ 2.1': 'RT Annotator Label',
-            'RT UR 1': 'RT User Perception', 'RT UR 2': 'RT User Perception', 'RT UR 3': 'RT User Perception', 'RT UR 4': 'RT User Perception', 'RT UR 5': 'RT User Perception',
-            'FT RA 1': 'FT Annotator Label', 'FT RA 2': 'FT Annotator Label', 'FT DD 3': 'FT Annotator Label', 'FT CC 4': 'FT Annotator Label', 'FT CC 5': 'FT Annotator Label', 'FT QQ 1.1': 'FT Annotator Label', 'FT QQ 2.1': 'FT Annotator Label',
-            'FT UR 1': 'FT User Perception', 'FT UR 2': 'FT User Perception', 'FT UR 3': 'FT User Perception', 'FT UR 4': 'FT User Perception', 'FT UR 5': 'FT User Perception',
-            'MT Annotator Label (Overall)': 'MT Annotator Label', 'RT Annotator Label (Overall)': 'RT Annotator Label', 'RT User Perception (Overall)': 'RT User Perception', 'FT Annotator Label (Overall)': 'FT Annotator Label', 'FT User Perception (Overall)': 'FT User Perception'
-        }
-
-        all_nodes = {}
-        for _, row in df_filtered.iterrows():
-            construct = row['Construct']
-            level = row['Level']
-            score = row['score']
-
-            node = {
-                'id': construct, 'name': construct, 'parent_id': None,
-                'score': float(score) if pd.notna(score) else np.nan,
-                'level': int(level), 'construct': construct, 'children': [],
-                'raw_assessment_items': []
-            }
-            all_nodes[construct] = node
-        
-        if not all_nodes:
-            return {}
-        
-        root_node_obj = None
-        for construct_id, node in all_nodes.items():
-            parent_id = parent_map.get(construct_id)
-            if parent_id and parent_id in all_nodes:
-                node['parent_id'] = parent_id
-                all_nodes[parent_id]['children'].append(node)
-            elif 'Validity/Reliability (V/R)' == construct_id:
-                root_node_obj = node
-            
-            if node['level'] == 5 and pd.notna(node['score']):
-                node['raw_assessment_items'].append({
-                    'item_id': construct_id,
-                    'question': f"Assessment for {construct_id}",
-                    'score': node['score']
-                })
-
-        for node in all_nodes.values():
-            node['children'].sort(key=lambda x: x['id'])
-
-        def calculate_and_aggregate_scores(node):
-            if not node['children']:
-                return node['score'] if node['level'] == 5 else 0.0
-
-            children_scores = []
-            for child in node['children']:
-                child_score = calculate_and_aggregate_scores(child)
-                children_scores.append(child_score)
-            
-            if node['level'] < 5:
-                for child in node['children']:
-                    node['raw_assessment_items'].extend(child['raw_assessment_items'])
-                # Remove duplicates from raw_assessment_items based on item_id
-                node['raw_assessment_items'] = list({frozenset(d.items()) for d in node['raw_assessment_items']})
-                node['raw_assessment_items'] = [dict(item) for item in node['raw_assessment_items']]
-                node['raw_assessment_items'].sort(key=lambda x: x['item_id'])
-
-            node['score'] = aggregate_node_score(children_scores, node['level'])
-            return node['score']
-
-        if root_node_obj:
-            calculate_and_aggregate_scores(root_node_obj)
-        else:
-            return {}
-
-        return all_nodes
+        if app_scenario_col not in score_store.column_index:
+            raise KeyError(f"The column '{app_scenario_col}' not found in the score store.")
+
+        # Trees live in one process-wide cache keyed by the content hash of the data and the column,
+        # so every session shares the same read-only tree: a compiled topology plus this column's scores.
+        return cached_store_tree(score_store, app_scenario_col, **load_corix_hierarchy().options())
+
+    with diagnostics_stage('load store', cached=True):
+        score_store = load_corix_dataset()
+    with diagnostics_stage('load runs', cached=True):
+        run_store = load_run_store()
+
+    # The levels present in the data: Levels 2-5 for the built-in hierarchy, configured hierarchies may
+    # be deeper or shallower
+    tree_levels = np.unique(score_store.levels).tolist()
 
     # Initial setup logic for the app to select default values
     if 'selected_app_scenario' not in st.session_state:
-        st.session_state.selected_app_scenario = loaded_df.columns[2] # Default to 'Application A - Pathfinder'
-    if 'max_tree_depth' not in st.session_state:
-        st.session_state.max_tree_depth = 5
+        st.session_state.selected_app_scenario = score_store.columns[0] # Default to 'Application A - Pathfinder'
+    if 'max_tree_depth' not in st.session_state or not tree_levels[0] <= st.session_state.max_tree_depth <= tree_levels[-1]:
+        st.session_state.max_tree_depth = tree_levels[-1]
     if 'selected_node_id' not in st.session_state:
         st.session_state.selected_node_id = None
+    if 'expanded_node_ids' not in st.session_state:
+        st.session_state.expanded_node_ids = set()
 
     st.markdown("""
-    **Interpretation:** The `build_corix_tree_data` function successfully transforms our flat dataset into a hierarchical structure, represented as a dictionary of nodes. Each node now contains its ID, name, parent, level, and aggregated score, along with its children and (for Level 5 nodes) contributing assessment items. This structured data is the foundation for our interactive tree visualization, enabling us to traverse and understand the CoRIx hierarchy. The initial execution for "Application A - Pathfinder" demonstrates this transformation, making the data ready for graphical representation.
+    **Interpretation:** The `build_corix_tree_data` function successfully transforms our flat dataset into a hierarchical structure: a compiled topology (integer node ids, parent and child index arrays, levels) that is built once and shared by every application/scenario, plus the aggregated score array of the selected scenario. Each node can be looked up by its ID to retrieve its parent, level, aggregated score, children and (for Level 5 nodes) contributing assessment items. This structured data is the foundation for our interactive tree visualization, enabling us to traverse and understand the CoRIx hierarchy. The initial execution for "Application A - Pathfinder" demonstrates this transformation, making the data ready for graphical representation.
     """)
 
     st.subheader("Section 7: Understanding Node Details")
@@ -194,46 +107,56 @@ def run_page2():
     A key feature of the CoRIx Tree Explorer is the ability to inspect the details contributing to a node's score. When a node in the tree visualization is "clicked," the `display_node_details` function will retrieve and present a clear breakdown of the specific assessment items, questionnaire questions, or annotation categories that contribute to that node's aggregated score. This helps in understanding the granular elements driving the overall risk assessment at each level, tying back directly to actionable insights for AI system improvement.
     """)
 
-    def display_node_details(tree_data, node_id, placeholder):
+    def display_node_details(tree_data, node_id, placeholder, intervals=None):
         """Extracts and displays detailed information for a specific node, including its direct children and
         the specific assessment items/questionnaire questions that contribute to its score.
         
         Args:
-            tree_data (dict): The hierarchical data structure.
+            tree_data (CorixTree): Compiled topology plus the selected scenario's scores.
             node_id (str): String ID of the selected node.
             placeholder (streamlit.delta_generator.DeltaGenerator): Streamlit placeholder to display details.
+            intervals (BootstrapIntervals, optional): Confidence intervals to show next to the scores.
         """
-        with placeholder:
-            st.empty() # Clear previous content
+        def interval_text(node):
+            if intervals is None:
+                return ""
+            return f" ({intervals.confidence:.0%} CI: {intervals.low[node]:.2f}-{intervals.high[node]:.2f})"
+
+        # A container keeps every element below; writing straight into the st.empty placeholder
+        # would replace each element with the next one and only show the last.
+        with placeholder.container():
             if node_id not in tree_data:
                 st.write(f"Node with ID '{node_id}' not found.")
                 return
 
-            node = tree_data[node_id]
-
-            try:
-                st.markdown(f"--- **Node Details for: {node['name']}** (ID: `{node_id}`) ---")
-                st.write(f"**Level**: {node['level']}, **Construct**: {node['construct']}")
-                st.write(f"**Aggregated Score**: {node['score']:.2f}/10")
-
-                if node['level'] < 5 and node.get('children'):
-                    st.markdown("**Direct Children and their Scores:**")
-                    for child_node_obj in node['children']:
-                        st.write(f"  - `{child_node_obj['name']}` (ID: `{child_node_obj['id']}`): {child_node_obj['score']:.2f}/10")
-                elif node['level'] == 5 and node.get('raw_assessment_items'):
-                    st.markdown("**Contributing Assessment Items:**")
-                    for item in node['raw_assessment_items']:
-                        item_id = item.get('item_id', 'N/A')
-                        question = item.get('question', 'N/A')
-                        score = item.get('score', 0.0)
-                        
-                        st.write(f"  - **Item ID**: `{item_id}`, **Question**: '{question}'")
-                        st.write(f"    **Score**: {score:.2f}/10")
-                else:
-                    st.write("No direct children or raw assessment items to display for this node.")
-
-            except KeyError as e:
-                st.error(f"Error: Node '{node_id}' is missing required key: '{e.args[0]}'")
+            topology = tree_data.topology
+            node = topology.index[node_id]
+            level = int(topology.levels[node])
+            children = topology.children(node)
+
+            st.markdown(f"--- **Node Details for: {node_id}** (ID: `{node_id}`) ---")
+            st.write(f"**Level**: {level}, **Construct**: {node_id}")
+            st.write(f"**Aggregated Score**: {tree_data.scores[node]:.2f}/10{interval_text(node)}")
+
+            has_children = level < tree_data.rules.item_level and len(children)
+            if has_children:
+                st.markdown("**Direct Children and their Scores:**")
+                for child in children:
+                    child_id = topology.names[child]
+                    st.write(f"  - `{child_id}` (ID: `{child_id}`): {tree_data.scores[child]:.2f}/10{interval_text(child)}")
+
+            # The node's items are one contiguous slice of the tree's shared item array; only the
+            # page on screen is read.
+            items = tree_data.assessment_items(node)
+            if len(items):
+                st.markdown(f"**Contributing Assessment Items** ({len(items)}):")
+                n_pages = -(-len(items) // DETAILS_ITEMS_PAGE_SIZE)
+                page = 1
+                if n_pages > 1:
+                    page = st.number_input(f'Page (of {n_pages}):', min_value=1, max_value=n_pages, value=1, step=1, key=f"details_items_page_{node_id}")
+                st.dataframe(items.page((page - 1) * DETAILS_ITEMS_PAGE_SIZE, DETAILS_ITEMS_PAGE_SIZE), hide_index=True)
+            elif not has_children:
+                st.write("No direct children or raw assessment items to display for this node.")
 
     st.markdown("""
     **Interpretation:** The `display_node_details` function is designed to provide a granular view of any selected node in the CoRIx tree. It will dynamically populate an output area with information such as the node's level, construct, aggregated score, and critically, a breakdown of its direct children's scores or the raw assessment items that contribute to its own score. This provides transparency into the specific factors driving the CoRIx scores at each level, enabling users to drill down into the root causes of identified risks.
@@ -244,116 +167,6 @@ def run_page2():
     This section outlines the core visualization function `create_interactive_corix_tree_plot`. This function will utilize `plotly.graph_objects` to render a dynamic node-link diagram of the CoRIx tree. The visualization will be interactive, allowing users to hover over nodes for basic information and to interact with a depth slider to control the visible levels of the tree. This interactive plot is central to our goal of providing an intuitive way to explore AI validity risks.
     """)
 
-    def create_interactive_corix_tree_plot(tree_data, max_depth_to_display=5, selected_node_id=None):
-        if not isinstance(tree_data, dict):
-            raise TypeError("tree_data must be a dictionary.")
-        fig = go.Figure()
-        if not tree_data:
-            return fig
-
-        node_x, node_y, node_hover_text, node_display_text, node_colors, node_sizes, node_custom_data = [], [], [], [], [], [], []
-        edge_x, edge_y = [], []
-        nodes_map = tree_data
-        root_node_id = 'Validity/Reliability (V/R)'
-        if root_node_id not in nodes_map:
-            return fig
-
-        pos = {}
-        queue = [(root_node_id, 0)]
-        visited_nodes = set([root_node_id])
-        level_to_x_coords = {}
-
-        while queue:
-            current_node_id, current_depth_layout = queue.pop(0)
-            node_info = nodes_map[current_node_id]
-            actual_level = node_info.get('level', 0)
-
-            if actual_level > max_depth_to_display:
-                continue
-
-            y_coord = -actual_level * 100
-            if actual_level not in level_to_x_coords:
-                level_to_x_coords[actual_level] = []
-            
-            current_x_offset = len(level_to_x_coords[actual_level]) * 150
-            x_coord = current_x_offset
-            level_to_x_coords[actual_level].append(x_coord)
-            pos[current_node_id] = (x_coord, y_coord)
-
-            node_x.append(x_coord)
-            node_y.append(y_coord)
-
-            hover_text_content = (
-                f"ID: {node_info.get('id', 'N/A')}<br>"
-                f"Name: {node_info.get('name', 'N/A')}<br>"
-                f"Score: {node_info.get('score', 'N/A'):.2f}<br>"
-                f"Level: {node_info.get('level', 'N/A')}"
-            )
-            node_hover_text.append(hover_text_content)
-            node_display_text.append(f"{node_info.get('name', '')}<br>Score: {node_info.get('score', 0):.1f}")
-            node_custom_data.append(node_info.get('id'))
-
-            is_selected = (current_node_id == selected_node_id)
-            node_colors.append('red' if is_selected else '#66b3ff')
-            node_sizes.append(25 if is_selected else 20)
-
-            for child_node_obj in node_info.get('children', []):
-                child_id = child_node_obj['id']
-                child_level = child_node_obj.get('level', actual_level + 1)
-                if child_id in nodes_map and child_id not in visited_nodes and child_level <= max_depth_to_display:
-                    queue.append((child_id, child_level))
-                    visited_nodes.add(child_id)
-                    
-        max_width_per_level = {lvl: (len(coords) * 150) for lvl, coords in level_to_x_coords.items()}
-        max_overall_width = max(max_width_per_level.values(), default=0)
-
-        centered_node_x = []
-        for i, node_id in enumerate(node_custom_data):
-            actual_level = nodes_map[node_id].get('level', 0)
-            original_x = node_x[i]
-            if actual_level in level_to_x_coords:
-                level_width = len(level_to_x_coords[actual_level]) * 150
-                offset = (max_overall_width - level_width) / 2
-                centered_node_x.append(original_x + offset)
-                pos[node_id] = (original_x + offset, pos[node_id][1])
-            else:
-                centered_node_x.append(original_x)
-
-        for node_id, node_info in tree_data.items():
-            if node_id in pos:
-                for child_node_obj in node_info.get('children', []):
-                    child_id = child_node_obj['id']
-                    child_level = child_node_obj.get('level', 0)
-                    if child_id in pos and child_level <= max_depth_to_display:
-                        x0, y0 = pos[node_id]
-                        x1, y1 = pos[child_id]
-                        edge_x.extend([x0, x1, None])
-                        edge_y.extend([y0, y1, None])
-        
-        if len(tree_data) > 1 and edge_x:
-            fig.add_trace(go.Scatter(
-                x=edge_x, y=edge_y, mode='lines', line=dict(width=1, color='#888'),
-                hoverinfo='none', name='Edges'
-            ))
-
-        if centered_node_x:
-            fig.add_trace(go.Scatter(
-                x=centered_node_x, y=node_y, mode='markers+text',
-                marker=dict(size=node_sizes, color=node_colors, line=dict(width=1, color='black')),
-                text=node_display_text, textposition="bottom center",
-                hoverinfo='text', hovertext=node_hover_text, customdata=node_custom_data,
-                name='Nodes'
-            ))
-
-        fig.update_layout(
-            title='Interactive CoRIx Tree Plot', showlegend=False, hovermode='closest',
-            margin=dict(b=20, l=5, r=5, t=40),
-            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False, fixedrange=True),
-            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False, fixedrange=True),
-            plot_bgcolor='white', height=600, width=1000
-        )
-        return fig
-
     st.markdown("""
     **Interpretation:** The `create_interactive_corix_tree_plot` function leverages Plotly to render a visually appealing and interactive node-link diagram. Each node represents a construct in the CoRIx tree, displaying its name and aggregated score. The color and size of a node can change upon selection, providing visual cues. Crucially, the function is designed to work with `max_depth_to_display`, allowing users to control the complexity of the tree shown. Hovering over a node reveals more detailed information, while a click will trigger the display of node-specific details, as described in the previous section. This visualization allows for intuitive exploration of the hierarchical contributions to AI validity risk.
     """)
@@ -366,7 +179,7 @@ def run_page2():
     # Place widgets in the sidebar
     with st.sidebar:
         st.header("Controls")
-        app_dropdown_options = list(loaded_df.columns[2:])
+        app_dropdown_options = list(score_store.columns)
         selected_app_scenario = st.selectbox(
             'Select Application/Scenario:',
             options=app_dropdown_options,
@@ -376,35 +189,181 @@ def run_page2():
 
         max_depth = st.slider(
             'Max Tree Depth:',
-            min_value=2, max_value=5, value=st.session_state.max_tree_depth, step=1,
+            min_value=tree_levels[0], max_value=max(tree_levels[-1], tree_levels[0] + 1), value=st.session_state.max_tree_depth, step=1,
             key='max_tree_depth'
         )
 
+        render_mode = st.selectbox('Render Mode:', options=RENDER_MODES, key='render_mode')
+        collapse_below = st.slider(
+            'Collapse subtrees scoring below (large-tree mode):',
+            min_value=0.0, max_value=10.0, value=DEFAULT_COLLAPSE_BELOW, step=0.5, key='collapse_below'
+        )
+        if st.button('Collapse all expanded subtrees', key='collapse_all'):
+            st.session_state.expanded_node_ids = set()
+        show_intervals = st.toggle('Show 95% bootstrap confidence intervals', key='show_confidence_intervals')
+        run_options = list(range(len(run_store), 0, -1))
+        selected_run = st.selectbox(
+            'Evaluation Run:', options=run_options, key='selected_run',
+            format_func=lambda run_id: f"Run {run_id}" + (" (latest)" if run_id == run_options[0] else "") + f" - {run_store.run(run_id)['created'][:10]}"
+        )
+
     # Extract application and scenario names
     application_name, scenario_name = st.session_state.selected_app_scenario.split(" - ", 1)
 
-    # Build tree data
-    current_tree_data = build_corix_tree_data(loaded_df, application_name, scenario_name)
+    # Build (or fetch the shared) tree data of the selected scenario column
+    with diagnostics_stage('build tree', cached=True):
+        current_tree_data = build_corix_tree_data(score_store, application_name, scenario_name)
+        if selected_run != len(run_store):
+            # Earlier runs are served from the run store as stored; nothing is re-aggregated.
+            if current_tree_data.column in run_store.run(selected_run)['columns']:
+                current_tree_data = run_store.tree(selected_run, current_tree_data.column)
+            else:
+                st.warning(f"Run {selected_run} has no '{current_tree_data.column}' column; showing the latest run.")
+
+    st.markdown("""
+    ### What-if Mode
+    Override the scores of Level 5 assessment items to see how the change would propagate to the overall CoRIx score. Only the ancestors of an edited item are re-aggregated, so each edit stays cheap even on very large trees. Overrides are kept per application/scenario for your session and never modify `corix_scores.csv`.
+    """)
+    if 'whatif_aggregators' not in st.session_state:
+        st.session_state.whatif_aggregators = {}
+    what_if_enabled = st.toggle('Enable what-if mode', key='what_if_enabled')
+    if what_if_enabled:
+        aggregator = st.session_state.whatif_aggregators.get(st.session_state.selected_app_scenario)
+        if aggregator is None or not np.array_equal(aggregator.base_scores, current_tree_data.scores, equal_nan=True):
+            aggregator = WhatIfAggregator(current_tree_data)
+            st.session_state.whatif_aggregators[st.session_state.selected_app_scenario] = aggregator
+
+        topology = current_tree_data.topology
+        leaf_ids = [topology.names[i] for i in np.flatnonzero((topology.levels == aggregator.rules.item_level) & (topology.child_counts == 0))]
+        col_item, col_score, col_apply, col_reset = st.columns([3, 2, 1, 1])
+        with col_item:
+            what_if_item = st.selectbox(f'Level {aggregator.rules.item_level} item:', options=leaf_ids, key='what_if_item')
+        with col_score:
+            current_item_score = aggregator.scores[topology.index[what_if_item]]
+            what_if_score = st.number_input(
+                'New score:', min_value=0.0, max_value=10.0, step=0.1,
+                value=float(current_item_score) if pd.notna(current_item_score) else 0.0,
+                key=f"what_if_score_{what_if_item}"
+            )
+        with col_apply:
+            if st.button('Apply', key='what_if_apply'):
+                aggregator.set_leaf_score(what_if_item, what_if_score)
+        with col_reset:
+            if st.button('Reset all', key='what_if_reset'):
+                aggregator.reset()
+
+        root_node = topology.root
+        if root_node >= 0:
+            baseline_root, what_if_root = current_tree_data.scores[root_node], aggregator.scores[root_node]
+            st.metric(
+                f"What-if {topology.names[root_node]} score", f"{what_if_root:.2f}",
+                delta=f"{what_if_root - baseline_root:+.2f} vs. baseline {baseline_root:.2f}", delta_color='inverse'
+            )
+        if aggregator.overrides:
+            st.dataframe(pd.DataFrame({
+                'Construct': list(aggregator.overrides),
+                'Baseline Score': [current_tree_data.scores[topology.index[name]] for name in aggregator.overrides],
+                'What-if Score': list(aggregator.overrides.values()),
+            }), hide_index=True)
+        with diagnostics_stage('what-if'):
+            current_tree_data = aggregator.tree()
+
+    st.markdown("""
+    ### Search
+    Find constructs by name prefix (for example `RT UR`) and/or by score across every application/scenario column, or list the highest scores. Matches in the selected application/scenario are ringed in green in the tree below. Queries run against precomputed indexes (scores sorted per level and column, names sorted for prefix lookups), so they stay fast on very large trees.
+    """)
+    col_prefix, col_level, col_min, col_top = st.columns([3, 1, 2, 2])
+    with col_prefix:
+        search_prefix = st.text_input('Construct name starts with:', key='search_prefix').strip()
+    with col_level:
+        search_level = st.selectbox('Level:', options=['Any'] + tree_levels, key='search_level')
+    with col_min:
+        search_min_score = st.number_input('Score at least:', min_value=0.0, max_value=10.0, value=None, step=0.5, placeholder='Any', key='search_min_score')
+    with col_top:
+        search_top_k = st.number_input('Only the top k:', min_value=0, value=0, step=5, help='0 shows every match.', key='search_top_k')
+
+    highlighted_node_ids = []
+    if search_prefix or search_min_score is not None or search_top_k:
+        with diagnostics_stage('query index', cached=True):
+            query_index = compute_query_index(score_store, tuple(score_store.columns))
+        level = None if search_level == 'Any' else search_level
+        with diagnostics_stage('query'):
+            if search_top_k and not search_prefix:
+                # Top-k straight off the sorted runs; a score bound then only trims those k rows.
+                matches = query_index.top_k(search_top_k, level=level)
+                if search_min_score is not None:
+                    matches = matches[matches['Score'] >= search_min_score]
+            else:
+                matches = query_index.query(prefix=search_prefix or None, level=level, low=search_min_score)
+                if search_top_k:
+                    matches = matches.head(search_top_k)
+        st.caption(f"{len(matches)} matches across {matches['Column'].nunique()} application/scenario columns" +
+                   (f" (showing the first {MAX_SEARCH_ROWS})" if len(matches) > MAX_SEARCH_ROWS else ""))
+        st.dataframe(matches.head(MAX_SEARCH_ROWS), hide_index=True)
+        highlighted_node_ids = list(matches.loc[matches['Column'] == current_tree_data.column, 'Construct'].unique())
+
+    # Bootstrap intervals resample the Level 5 items; they follow what-if overrides as well
+    intervals = None
+    if show_intervals:
+        with diagnostics_stage('bootstrap', cached=True):
+            low, high = compute_bootstrap_bounds(
+                current_tree_data, current_tree_data.column, current_tree_data.raw_scores.tobytes(),
+                (current_tree_data.topology.key, current_tree_data.rules.key)
+            )
+            intervals = BootstrapIntervals(current_tree_data.topology, current_tree_data.column, low, high, DEFAULT_CONFIDENCE, DEFAULT_RESAMPLES)
 
     # Placeholder for node details
     details_placeholder = st.empty()
 
-    # Create and display the plot
-    fig = create_interactive_corix_tree_plot(current_tree_data, max_depth_to_display=max_depth, selected_node_id=st.session_state.selected_node_id)
-    clicked_points = plotly_events(fig, click_event=True, key="corix_tree_plot")
-
-    # Handle click event
-    if clicked_points:
-        clicked_node_id = clicked_points[0]['customdata']
-        if st.session_state.selected_node_id != clicked_node_id:
-            st.session_state.selected_node_id = clicked_node_id
-            details_placeholder.empty() # Clear previous details immediately
-            display_node_details(current_tree_data, st.session_state.selected_node_id, details_placeholder)
-    elif st.session_state.selected_node_id: # If a node was previously selected and no new click, re-display its details
-        display_node_details(current_tree_data, st.session_state.selected_node_id, details_placeholder)
+    # Create and display the plot; big trees switch to WebGL with labels and subtrees reduced.
+    # The base figure is cached across sessions and reruns; a selection only patches its marker styles.
+    with diagnostics_stage('layout', cached=True):
+        visible_node_count = len(tree_layout(current_tree_data.topology).visible(max_depth))
+    use_large_tree_mode = render_mode == 'Large tree (WebGL)' or (render_mode == 'Auto' and visible_node_count > LARGE_TREE_NODE_THRESHOLD)
+    with diagnostics_stage('figure', cached=True):
+        base_figure = cached_tree_figure(
+            current_tree_data, max_depth_to_display=max_depth, large_tree_mode=use_large_tree_mode,
+            expanded_node_ids=st.session_state.expanded_node_ids, collapse_below=collapse_below, intervals=intervals,
+            highlighted_node_ids=highlighted_node_ids
+        )
+        fig = base_figure.with_selection(st.session_state.selected_node_id)
+    with diagnostics_stage('serialize figure'):
+        fig.to_json() # memoized, so plotly_events below reuses it
+    with diagnostics_stage('plotly_events'):
+        clicked_points = plotly_events(fig, click_event=True, key="corix_tree_plot")
+
+    # Handle click event. The component keeps returning the last click, so only a click on a
+    # different node counts as new; a new click on a collapsed aggregate node also expands it.
+    clicked_node_id = node_id_from_click(fig, clicked_points[0]) if clicked_points else None
+    if clicked_node_id is not None and st.session_state.selected_node_id != clicked_node_id:
+        st.session_state.selected_node_id = clicked_node_id
+        if use_large_tree_mode and clicked_node_id not in st.session_state.expanded_node_ids:
+            st.session_state.expanded_node_ids.add(clicked_node_id)
+            st.rerun()
+        details_placeholder.empty() # Clear previous details immediately
+
+    if st.session_state.selected_node_id: # Display details of the selected node
+        with diagnostics_stage('details'):
+            display_node_details(current_tree_data, st.session_state.selected_node_id, details_placeholder, intervals)
     else: # If no node is selected, prompt the user
         details_placeholder.info("Click on a node in the tree to see its details.")
 
+    st.markdown("""
+    ### Run-to-run Trend
+    Every change to `corix_scores.csv` is recorded as a new evaluation run; columns whose content did not change are reused from earlier runs instead of being re-aggregated. The chart reads the selected node's stored score in every run.
+    """)
+    if not st.session_state.selected_node_id:
+        st.caption("Click on a node in the tree to see its score across runs.")
+    elif len(run_store) < 2:
+        st.caption(f"Only one evaluation run has been recorded so far ({len(run_store)} run).")
+    else:
+        with diagnostics_stage('trend'):
+            # Only the selected column is read; the store caches both results per run count.
+            trend = run_store.trend(st.session_state.selected_node_id, columns=[current_tree_data.column])
+        st.line_chart(trend)
+        changes = run_store.changes(len(run_store) - 1, len(run_store))
+        st.caption(f"Latest run: {len(changes['changed_columns'])} changed columns, {len(changes['changed_constructs'])} changed constructs.")
+
 
     st.markdown("""
     **Interpretation:** This section sets up the interactive controls for our CoRIx Tree Explorer. The dropdown allows users to select different AI application and scenario combinations, while the slider controls the maximum depth of the tree visualization. The interaction logic, integrated with Streamlit's state management, redraws the tree and updates node details whenever a selection is made or a node is clicked. This interactivity is key to enabling dynamic exploration and comparison of AI validity risks across various contexts, directly supporting the learning goals of this application.
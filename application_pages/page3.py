@@ -1,5 +1,13 @@
 
+import numpy as np
 import streamlit as st
+from application_pages.data import compute_comparison_score_matrix, compute_leaf_attribution, load_corix_dataset
+from corix.compare import compare_scenarios
+from corix.diagnostics import stage as diagnostics_stage
+from corix.render import create_diff_corix_tree_plot
+
+DEFAULT_TOP_K_LEAVES = 10
+DEFAULT_TOP_DRIVERS = 25
 
 def run_page3():
     st.subheader("Section 10: Displaying the Interactive CoRIx Tree for Application A / Pathfinder")
@@ -23,7 +31,63 @@ def run_page3():
     **Interpretation:** "Application C / Meal Planner" shows the highest overall CoRIx score of $6.30$, indicating the greatest validity risk among the pilot examples. Notably, Model Testing (score of $6.30$) shows the highest risk at Level 3, with Red Teaming ($3.39$) and Field Testing ($2.80$) contributing less. At Level 4, Model Testing Annotator Labels ($6.30$) scored highest. Further breakdown in Level 5 reveals extremely high scores for `MT RA 1` (Model Testing Risk Assessment 1, general functionality) at $9.00$ and `MT RA 2` (Model Testing Risk Assessment 2, response quality) at $7.00$, along with `FT CC 3` (Field Testing Content Characterization 3, superfluous information) at $7.42$. This indicates significant issues with basic functionality and response quality observed during model testing, along with superfluous information in field testing. These findings provide clear guidance for developers to address fundamental AI system shortcomings.
     """)
 
-    st.subheader("Section 13: Interpreting CoRIx Scores and Hierarchical Contribution")
+    st.subheader("Section 13: Comparing Scenarios")
+    st.markdown("""
+    The sections above compare the three applications by reading their trees one at a time. The comparison below does the same for any set of application/scenario columns at once: it aggregates every selected column in a single pass, then computes per-node score deltas against a baseline, ranks the scenarios at every node and lists the assessment items whose scores differ the most.
+    """)
+
+    with diagnostics_stage('load store', cached=True):
+        score_store = load_corix_dataset()
+    compared_columns = st.multiselect(
+        "Scenarios to compare", options=score_store.columns, default=score_store.columns[:3], key='compared_columns'
+    )
+    if len(compared_columns) < 2:
+        st.info("Select at least two application/scenario columns to compare.")
+    else:
+        baseline = st.selectbox("Baseline scenario", options=compared_columns, key='comparison_baseline')
+        with diagnostics_stage('aggregate compared columns', cached=True):
+            score_matrix = compute_comparison_score_matrix(score_store, tuple(compared_columns))
+        with diagnostics_stage('compare scenarios'):
+            comparison = compare_scenarios(score_matrix, compared_columns, baseline=baseline)
+
+        st.markdown("**Overall scores and ranks** (rank 1 is the highest validity risk)")
+        st.dataframe(comparison.scenario_summary(), hide_index=True)
+
+        top_k = st.slider("Top differing assessment items", min_value=1, max_value=50, value=DEFAULT_TOP_K_LEAVES, key='comparison_top_k')
+        st.dataframe(comparison.top_differing_leaves(top_k), hide_index=True)
+
+        with st.expander("Per-node deltas"):
+            # The levels present in the data, so configured hierarchies offer their own levels
+            comparison_levels = np.unique(score_store.levels).tolist()
+            level = st.selectbox("Level", options=comparison_levels, index=min(1, len(comparison_levels) - 1), key='comparison_level')
+            st.dataframe(comparison.node_frame(level=level), hide_index=True)
+
+        others = [col for col in compared_columns if col != baseline]
+        diff_column = st.selectbox("Diff tree", options=others, key='comparison_diff_column')
+        st.plotly_chart(create_diff_corix_tree_plot(comparison, diff_column))
+        st.markdown("""
+    **Interpretation:** Nodes drawn in red score higher (riskier) than the baseline scenario and blue nodes score lower; the labels show the size of the difference. Reading the diff tree top-down shows which testing layer and which assessment items account for the change in the overall CoRIx score between two scenarios.
+    """)
+
+    st.subheader("Section 14: Top Risk Drivers")
+    st.markdown("""
+    The interpretations above single out drivers such as `RT DD 4` and `FT CC 3` by reading the trees. The table below computes them for every application/scenario column at once. **Share of Root** is the fraction of the overall CoRIx score an assessment item accounts for: its score weighted by the mean at Levels 3-5, counted only if its testing layer wins the max at Level 2. **Sensitivity** is how much the overall score moves per point the item moves. **Move to Flip** is how far the item would have to move for its testing layer to take (or lose) the max at Level 2; `inf` means this is not possible within the 0-10 range. Click a column header to sort.
+    """)
+    try:
+        with diagnostics_stage('attribution', cached=True):
+            attribution = compute_leaf_attribution(score_store, tuple(score_store.columns))
+    except ValueError as error:
+        # Shares and sensitivities are only defined for the max/mean rules.
+        st.info(f"Top risk drivers are not available under the configured aggregation rules: {error}")
+    else:
+        driver_column = st.selectbox("Scenario", options=['All scenarios'] + list(score_store.columns), key='driver_column')
+        top_drivers = st.slider("Number of drivers", min_value=5, max_value=200, value=DEFAULT_TOP_DRIVERS, step=5, key='driver_count')
+        st.dataframe(
+            attribution.top_drivers(column=None if driver_column == 'All scenarios' else driver_column, k=top_drivers),
+            hide_index=True
+        )
+
+    st.subheader("Section 15: Interpreting CoRIx Scores and Hierarchical Contribution")
     st.markdown("""
     Throughout this exploration, remember that **a higher numeric CoRIx score signifies greater negative risk to validity**.
 
@@ -36,7 +100,7 @@ def run_page3():
     By interactively navigating these trees, users can gain a deeper understanding of how various factors contribute to the overall trustworthiness and validity of AI systems. This empowers stakeholders to make informed decisions about AI deployment and risk mitigation.
     """)
 
-    st.subheader("Section 14: Conclusion and References")
+    st.subheader("Section 16: Conclusion and References")
     st.markdown("""
     This Streamlit application has provided an interactive tool to explore CoRIx measurement trees, enhancing the understanding of how AI validity risk is assessed through various testing layers and aggregation logic. By visualizing and interpreting CoRIx scores, we gain insights into the contextual robustness of AI systems as defined by NIST. This transparent approach facilitates the identification of specific areas for AI system improvement.
 
@@ -0,0 +1,43 @@
+"""Streamlit-free CoRIx scoring core shared by the explorer pages.
+
+The public names below are imported from their submodules on first access, so importing one
+light submodule (e.g. `corix.diagnostics` from `app.py`) does not pull in NumPy and pandas.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'corix.engine': (
+        'DEFAULT_RULES', 'MAX_LEVELS', 'MEAN_LEVELS', 'PARENT_MAP', 'ROOT_CONSTRUCT', 'AssessmentItems', 'CorixScoreMatrix', 'CorixTree',
+        'aggregate_all_columns', 'aggregate_scores', 'score_columns', 'topology_from_frame', 'tree_data_from_scores',
+    ),
+    'corix.topology': ('CorixTopology', 'compile_topology'),
+    'corix.operators': ('OPERATORS', 'AggregationOperator', 'AggregationRules', 'Segments', 'register_operator'),
+    'corix.hierarchy': ('CorixHierarchy', 'default_hierarchy', 'load_hierarchy'),
+    'corix.whatif': ('WhatIfAggregator',),
+    'corix.store': ('ScoreStore', 'convert_csv_to_store', 'load_score_store', 'open_score_store'),
+    'corix.ingest': ('ResponseAccumulator', 'ingest_responses', 'iter_response_chunks'),
+    'corix.layout': ('TreeLayout', 'compute_tree_layout', 'tree_layout'),
+    'corix.compare': ('ScenarioComparison', 'compare_scenarios'),
+    'corix.bootstrap': ('BootstrapIntervals', 'bootstrap_intervals', 'bootstrap_resamples'),
+    'corix.attribution': ('LeafAttribution', 'attribute_leaves'),
+    'corix.query': ('CorixIndex', 'build_index'),
+    'corix.treecache': ('TreeCache', 'cached_store_tree', 'warm_tree_cache'),
+    'corix.runs': ('RunStore', 'default_runs_path', 'open_run_store'),
+}
+_EXPORT_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_EXPORT_MODULES)
+
+
+def __getattr__(name):
+    module = _EXPORT_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module 'corix' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,157 @@
+"""Leaf-to-root contribution and sensitivity attribution for every scenario column at once.
+
+Under the aggregation rules a leaf reaches the root through a chain of mean nodes (each dividing by
+its child count) and max nodes (which pass on only their winning child). One top-down sweep over the
+compiled topology therefore gives, for every node and column:
+
+- the sensitivity d(root)/d(node): the product of the mean weights on the path, or 0 when the path
+  goes through a max node the node's branch does not win;
+- the node's share of the root score: its contribution times its sensitivity, divided by the root;
+- the move needed to flip the max: how far the node must go for its branch to take the max (or, for
+  the winning branch, to lose it to the runner-up). On the winning path every move changes the root
+  value; elsewhere this is the smallest move that changes the root at all.
+"""
+
+import numpy as np
+import pandas as pd
+
+from corix.engine import CorixScoreMatrix
+
+SCORE_RANGE = (0.0, 10.0)
+
+
+class LeafAttribution:
+    """Per-leaf, per-column attribution of the root score (rows follow `leaves`, columns `columns`).
+
+    Attributes:
+        leaves (np.ndarray): Node ids of the Level 5 leaves in the root's tree.
+        scores (np.ndarray): The leaves' scores.
+        share (np.ndarray): Fraction of the root score each leaf accounts for.
+        sensitivity (np.ndarray): Change of the root per unit change of the leaf.
+        move_to_flip (np.ndarray): Signed leaf move that flips the max winner on its path; `inf` when
+            that is outside the score range, NaN when the path has no max node.
+    """
+
+    def __init__(self, topology, columns, leaves, scores, share, sensitivity, move_to_flip):
+        self.topology = topology
+        self.columns = list(columns)
+        self.leaves = leaves
+        self.scores = scores
+        self.share = share
+        self.sensitivity = sensitivity
+        self.move_to_flip = move_to_flip
+
+    def top_drivers(self, column=None, k=None):
+        """The leaves with the largest share of the root score.
+
+        Args:
+            column (str, optional): Restrict to one scenario column. Defaults to all columns.
+            k (int, optional): Number of rows to return. Defaults to all.
+
+        Returns:
+            pd.DataFrame: `Column`, `Construct`, `Score`, `Share of Root`, `Sensitivity` and
+            `Move to Flip`, largest share first.
+        """
+        columns = range(len(self.columns))
+        if column is not None:
+            if column not in self.columns:
+                raise KeyError(f"The column '{column}' not found in the attribution.")
+            columns = [self.columns.index(column)]
+        columns = np.asarray(list(columns), dtype=np.int64)
+        share = np.nan_to_num(self.share[:, columns], nan=-np.inf).ravel()
+        order = np.arange(len(share))
+        if k is not None and k < len(share):
+            order = np.argpartition(-share, k)[:k]
+        order = order[np.argsort(-share[order], kind='stable')]
+        rows, cols = np.divmod(order, len(columns))
+        cols = columns[cols]
+        return pd.DataFrame({
+            'Column': [self.columns[j] for j in cols],
+            'Construct': [self.topology.names[i] for i in self.leaves[rows]],
+            'Score': self.scores[rows, cols],
+            'Share of Root': self.share[rows, cols],
+            'Sensitivity': self.sensitivity[rows, cols],
+            'Move to Flip': self.move_to_flip[rows, cols],
+        })
+
+
+def attribute_leaves(score_matrix):
+    """Computes `LeafAttribution` for every column of an aggregated score matrix in one sweep.
+
+    Args:
+        score_matrix (CorixScoreMatrix): Aggregated scores, e.g. from `aggregate_all_columns`.
+
+    Returns:
+        LeafAttribution: Shares, sensitivities and flip moves of the Level 5 leaves.
+
+    Raises:
+        ValueError: If the matrix was aggregated with operators other than max and mean.
+    """
+    if not isinstance(score_matrix, CorixScoreMatrix):
+        raise TypeError("score_matrix must be a CorixScoreMatrix.")
+    topology = score_matrix.topology
+    scores = score_matrix.scores
+    n, k = scores.shape
+    levels, child_counts = topology.levels, topology.child_counts
+    item_level = score_matrix.rules.item_level
+    is_leaf = child_counts == 0
+    leaves = np.flatnonzero(is_leaf & (levels == item_level) & (topology.depths >= 0))
+    operators = score_matrix.rules.node_operators(topology)
+    unsupported = sorted({op for op in operators[~is_leaf & (topology.depths >= 0)] if op not in (None, 'max', 'mean')})
+    if unsupported:
+        raise ValueError(f"Leaf attribution supports the max and mean operators only, got {unsupported}.")
+    if topology.root < 0:
+        empty = np.empty((0, k))
+        return LeafAttribution(topology, score_matrix.columns, leaves[:0], empty, empty, empty, empty)
+
+    contributions = scores.copy()
+    contributions[is_leaf & (levels != item_level)] = 0.0
+    sensitivity = np.zeros((n, k))
+    sensitivity[topology.root] = 1.0
+    path_weight = np.ones(n)           # product of mean weights up to the nearest max node
+    branch = np.full(n, -1)            # child of the nearest max ancestor on the path
+    branch_wins = np.zeros((n, k), dtype=bool)
+    branch_margin = np.full((n, k), np.nan)
+
+    # Top-down: the reduce plan is ordered deepest first.
+    for children, starts, group_parents in reversed(topology.reduce_plan):
+        counts = np.diff(np.append(starts, len(children)))
+        parents = np.repeat(group_parents, counts)
+        parent_is_max = operators[parents] == 'max'
+        parent_is_mean = operators[parents] == 'mean'
+        values = contributions[children]
+
+        # First child (in name order) reaching the parent's max wins it; ties go to that child only.
+        reaches_max = values == scores[parents]
+        running = np.cumsum(reaches_max, axis=0)
+        before_group = np.where(starts[:, None] > 0, running[np.maximum(starts - 1, 0)], 0)
+        winner = reaches_max & (running - np.repeat(before_group, counts, axis=0) == 1)
+        runner_up = np.maximum.reduceat(np.where(winner, -np.inf, np.nan_to_num(values, nan=-np.inf)), starts, axis=0)
+        runner_up = np.repeat(runner_up, counts, axis=0)
+
+        mean_weight = np.where(parent_is_mean, 1.0 / child_counts[parents], 0.0)
+        factor = np.where(parent_is_max[:, None], winner, mean_weight[:, None])
+        sensitivity[children] = sensitivity[parents] * factor
+
+        path_weight[children] = np.where(parent_is_max, 1.0, path_weight[parents] * mean_weight)
+        branch[children] = np.where(parent_is_max, children, branch[parents])
+        max_children = children[parent_is_max]
+        branch_wins[max_children] = winner[parent_is_max]
+        branch_margin[max_children] = np.where(
+            winner[parent_is_max],
+            values[parent_is_max] - runner_up[parent_is_max],
+            scores[parents[parent_is_max]] - values[parent_is_max],
+        )
+
+    leaf_scores = scores[leaves]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        share = contributions[leaves] * sensitivity[leaves] / scores[topology.root]
+        leaf_branch = branch[leaves]
+        has_branch = leaf_branch >= 0
+        margin = np.where(has_branch[:, None], branch_margin[np.maximum(leaf_branch, 0)], np.nan)
+        wins = branch_wins[np.maximum(leaf_branch, 0)]
+        move = np.where(wins, -margin, margin) / path_weight[leaves][:, None]
+        target = leaf_scores + move
+        out_of_range = (target < SCORE_RANGE[0]) | (target > SCORE_RANGE[1])
+        move = np.where(out_of_range, np.inf, move)
+    return LeafAttribution(topology, score_matrix.columns, leaves, leaf_scores, share, sensitivity[leaves], move)
@@ -0,0 +1,139 @@
+"""Headless batch scoring of CoRIx score files across a process pool (no Streamlit or Plotly needed).
+
+Every input CSV is converted to (or opened as) its columnar store first; the score columns are then
+split into tasks of `columns_per_task` columns, and each worker memory-maps only its own columns and
+aggregates them in one vectorized pass. Results are written in long format, one row per
+(source, column, construct)::
+
+    python -m corix.batch nightly/*.csv -o scores.parquet --workers 8
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from corix.engine import ROOT_CONSTRUCT, aggregate_all_columns
+from corix.store import load_score_store, open_score_store
+
+DEFAULT_COLUMNS_PER_TASK = 64
+OUTPUT_FORMATS = ('csv', 'json', 'parquet')
+RESULT_COLUMNS = ['Source', 'Column', 'Level', 'Construct', 'Score']
+
+
+class BatchReport:
+    """Counts and timing of one batch run."""
+
+    def __init__(self, n_files, n_columns, n_tasks, workers, seconds):
+        self.n_files = n_files
+        self.n_columns = n_columns
+        self.n_tasks = n_tasks
+        self.workers = workers
+        self.seconds = seconds
+
+    @property
+    def columns_per_second(self):
+        return self.n_columns / self.seconds if self.seconds > 0 else float('inf')
+
+    def __str__(self):
+        return (f"Scored {self.n_columns} columns from {self.n_files} file(s) in {self.seconds:.2f}s "
+                f"({self.columns_per_second:.1f} columns/s, {self.n_tasks} tasks, {self.workers} worker(s))")
+
+
+def score_matrix_to_long_frame(score_matrix, source=''):
+    """Flattens a `CorixScoreMatrix` into `RESULT_COLUMNS` rows, column by column."""
+    n, k = score_matrix.scores.shape
+    return pd.DataFrame({
+        'Source': np.full(n * k, source, dtype=object),
+        'Column': np.repeat(np.asarray(score_matrix.columns, dtype=object), n),
+        'Level': np.tile(score_matrix.levels, k),
+        'Construct': np.tile(np.asarray(score_matrix.names, dtype=object), k),
+        'Score': score_matrix.scores.ravel(order='F'),
+    })
+
+
+def _score_task(store_path, source, columns, parent_map, root_construct, rules):
+    store = open_score_store(store_path)
+    score_matrix = aggregate_all_columns(store.frame(columns), parent_map=parent_map, root_construct=root_construct, columns=columns, rules=rules)
+    return score_matrix_to_long_frame(score_matrix, source)
+
+
+def batch_score(paths, columns=None, workers=None, columns_per_task=DEFAULT_COLUMNS_PER_TASK,
+                parent_map=None, root_construct=ROOT_CONSTRUCT, rules=None):
+    """Aggregates every score column of many CoRIx score files in parallel.
+
+    Args:
+        paths (str or list): Score CSV file(s) in the `corix_scores.csv` layout.
+        columns (list, optional): Only score these columns (files without them are skipped).
+        workers (int, optional): Worker processes. Defaults to `os.cpu_count()`; 1 runs in-process.
+        columns_per_task (int): Columns aggregated per task.
+        parent_map (dict, optional): Child construct -> parent construct. Defaults to `PARENT_MAP`.
+        root_construct (str): Name of the Level 2 root node.
+        rules (AggregationRules, optional): Operator per level/node. Defaults to `DEFAULT_RULES`.
+
+    Returns:
+        tuple: (pd.DataFrame with `RESULT_COLUMNS`, BatchReport).
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    if columns_per_task < 1:
+        raise ValueError(f"columns_per_task must be at least 1, got {columns_per_task}")
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    # Stores are converted up front, in this process, so workers only ever open them read-only.
+    tasks = []
+    for path in paths:
+        store = load_score_store(path)
+        selected = store.columns if columns is None else [col for col in columns if col in store.column_index]
+        for i in range(0, len(selected), columns_per_task):
+            tasks.append((store.path, os.fspath(path), selected[i:i + columns_per_task], parent_map, root_construct, rules))
+
+    if workers == 1 or len(tasks) <= 1:
+        frames = [_score_task(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            frames = list(pool.map(_score_task, *zip(*tasks)))
+
+    result = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=RESULT_COLUMNS)
+    report = BatchReport(len(paths), sum(len(task[2]) for task in tasks), len(tasks), workers, time.perf_counter() - start)
+    return result, report
+
+
+def write_results(frame, output, output_format=None):
+    """Writes batch results as CSV, JSON (records) or Parquet; the format defaults to the file extension."""
+    if output_format is None:
+        output_format = os.path.splitext(os.fspath(output))[1].lstrip('.').lower() or 'csv'
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format '{output_format}', expected one of {OUTPUT_FORMATS}.")
+    if output_format == 'csv':
+        frame.to_csv(output, index=False)
+    elif output_format == 'json':
+        frame.to_json(output, orient='records')
+    else:
+        frame.to_parquet(output, index=False)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from corix.hierarchy import default_hierarchy, load_hierarchy
+
+    parser = argparse.ArgumentParser(description="Score CoRIx score files headlessly across a process pool.")
+    parser.add_argument('paths', nargs='+', help="Score CSV files (Level, Construct, one column per application/scenario).")
+    parser.add_argument('-o', '--output', default='corix_batch_scores.csv', help="Output file (default: corix_batch_scores.csv).")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, help="Output format (default: from the output file extension).")
+    parser.add_argument('--columns', nargs='+', help="Only score these application/scenario columns.")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: number of CPUs).")
+    parser.add_argument('--columns-per-task', type=int, default=DEFAULT_COLUMNS_PER_TASK, help="Columns aggregated per task.")
+    parser.add_argument('--hierarchy', help="Hierarchy config (.json or .toml) with the parent map and aggregation rules.")
+    args = parser.parse_args()
+
+    hierarchy = load_hierarchy(args.hierarchy) if args.hierarchy else default_hierarchy()
+    results, batch_report = batch_score(args.paths, columns=args.columns, workers=args.workers, columns_per_task=args.columns_per_task,
+                                        **hierarchy.options())
+    write_results(results, args.output, args.format)
+    print(f"{batch_report} -> {args.output}", file=sys.stderr)
@@ -0,0 +1,204 @@
+"""Benchmark suite for the CoRIx pipeline on synthetic trees from 10^2 to 10^6 nodes.
+
+Each stage is timed on its own with the process caches cleared (best of `repeat` runs) and then run
+once more under `tracemalloc` to record its peak allocated memory:
+
+- ``build``: compile the topology from the table (`topology_from_frame`).
+- ``aggregate``: aggregate every scenario column (`aggregate_scores`).
+- ``layout``: tidy tree layout (`compute_tree_layout`).
+- ``render``: build one scenario's base figure and serialize it to JSON (`corix.render`), WebGL
+  mode above `LARGE_TREE_NODE_THRESHOLD` nodes.
+
+Results are written as JSON (environment metadata plus one record per stage and size) so runs of
+different versions can be compared with ``--baseline``::
+
+    python -m corix.benchmark -o bench.json
+    python -m corix.benchmark -o bench_new.json --baseline bench.json
+"""
+
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from corix import layout as layout_module
+from corix import topology as topology_module
+from corix.engine import CorixTree, aggregate_scores, score_columns, topology_from_frame
+from corix.layout import compute_tree_layout
+from corix.synthetic import DEFAULT_DEPTH, fanout_for_size, generate_corix_table, synthetic_rules, tree_size
+
+DEFAULT_SIZES = (100, 1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_STAGES = ('build', 'aggregate', 'layout', 'render')
+DEFAULT_COLUMNS = 3
+DEFAULT_MAX_RENDER_NODES = 200_000
+REGRESSION_TOLERANCE = 1.25
+
+
+def _clear_caches():
+    with topology_module._TOPOLOGY_CACHE_LOCK:
+        topology_module._TOPOLOGY_CACHE.clear()
+    with layout_module._LAYOUT_CACHE_LOCK:
+        layout_module._LAYOUT_CACHE.clear()
+    if 'corix.render' in sys.modules:
+        render = sys.modules['corix.render']
+        with render._FIGURE_CACHE_LOCK:
+            render._FIGURE_CACHE.clear()
+
+
+def _render_stage(tree):
+    from corix.render import LARGE_TREE_NODE_THRESHOLD, cached_tree_figure
+
+    figure = cached_tree_figure(tree, large_tree_mode=len(tree) > LARGE_TREE_NODE_THRESHOLD)
+    return figure.to_json()
+
+
+def _measure(run, repeat, measure_memory):
+    seconds = []
+    for _ in range(repeat):
+        _clear_caches()
+        start = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - start)
+    peak_bytes = None
+    if measure_memory:
+        _clear_caches()
+        tracemalloc.start()
+        try:
+            run()
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return min(seconds), peak_bytes
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, stages=DEFAULT_STAGES, n_columns=DEFAULT_COLUMNS, depth=DEFAULT_DEPTH,
+                   nan_fraction=0.0, repeat=3, measure_memory=True, max_render_nodes=DEFAULT_MAX_RENDER_NODES,
+                   seed=0, progress=None):
+    """Times every stage on synthetic trees of the requested sizes.
+
+    Args:
+        sizes (iterable): Approximate node counts.
+        stages (iterable): Subset of `DEFAULT_STAGES`.
+        n_columns (int): Scenario columns in the synthetic table.
+        depth (int): Levels of the synthetic tree, root included.
+        nan_fraction (float): Fraction of missing leaf scores.
+        repeat (int): Timed runs per stage; the fastest is kept.
+        measure_memory (bool): Also record peak traced memory (one extra run per stage).
+        max_render_nodes (int): Larger trees skip the render stage.
+        seed (int): Seed of the synthetic scores.
+        progress (callable, optional): Called with each record as it is produced.
+
+    Returns:
+        list: One dict per (size, stage) with `stage`, `n_nodes`, `n_columns`, `seconds`,
+        `peak_bytes` and `skipped`.
+    """
+    unknown = [stage for stage in stages if stage not in DEFAULT_STAGES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark stages {unknown}, expected a subset of {DEFAULT_STAGES}.")
+    records = []
+    for size in sizes:
+        fanout = fanout_for_size(size, depth)
+        table, parent_map = generate_corix_table(fanout, n_columns=n_columns, nan_fraction=nan_fraction, seed=seed)
+        columns = score_columns(table)
+        rules = synthetic_rules(fanout)
+        topology, df_sorted = topology_from_frame(table, parent_map)
+        raw_scores = df_sorted[columns].to_numpy(dtype=np.float64)
+        scores = aggregate_scores(topology, raw_scores, rules)
+        # Leaves off the rules' item level (or levels without a rule) aggregate to 0 or NaN and would
+        # time nothing useful; all-ones leaves must give a root score of 1 whatever the NaN density.
+        root_check = aggregate_scores(topology, np.ones((len(topology), 1)), rules)[topology.root, 0]
+        if root_check != 1.0:
+            raise RuntimeError(f"The synthetic tree with fan-out {fanout} aggregates all-ones leaves to a root score of {root_check}.")
+        tree = CorixTree(topology, scores[:, 0], raw_scores[:, 0], columns[0], rules)
+
+        runs = {
+            'build': lambda: topology_from_frame(table, parent_map),
+            'aggregate': lambda: aggregate_scores(topology, raw_scores, rules),
+            'layout': lambda: compute_tree_layout(topology),
+            'render': lambda: _render_stage(tree),
+        }
+        for stage in stages:
+            record = {'stage': stage, 'n_nodes': tree_size(fanout), 'n_columns': n_columns, 'fanout': fanout,
+                      'seconds': None, 'peak_bytes': None, 'skipped': False}
+            if stage == 'render' and record['n_nodes'] > max_render_nodes:
+                record['skipped'] = True
+            else:
+                record['seconds'], record['peak_bytes'] = _measure(runs[stage], repeat, measure_memory)
+            records.append(record)
+            if progress is not None:
+                progress(record)
+    _clear_caches()
+    return records
+
+
+def environment():
+    """Versions and platform recorded next to the results."""
+    return {
+        'python': platform.python_version(), 'platform': platform.platform(), 'machine': platform.machine(),
+        'numpy': np.__version__, 'pandas': pd.__version__, 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+def compare_results(records, baseline_records, tolerance=REGRESSION_TOLERANCE):
+    """Returns the (stage, n_nodes, n_columns) entries that got slower than `tolerance` x the baseline.
+
+    Returns:
+        list: Dicts with `stage`, `n_nodes`, `seconds`, `baseline_seconds` and `ratio`.
+    """
+    baseline = {(r['stage'], r['n_nodes'], r['n_columns']): r for r in baseline_records}
+    regressions = []
+    for record in records:
+        previous = baseline.get((record['stage'], record['n_nodes'], record['n_columns']))
+        if previous is None or not record['seconds'] or not previous['seconds']:
+            continue
+        ratio = record['seconds'] / previous['seconds']
+        if ratio > tolerance:
+            regressions.append({'stage': record['stage'], 'n_nodes': record['n_nodes'], 'seconds': record['seconds'],
+                                'baseline_seconds': previous['seconds'], 'ratio': ratio})
+    return regressions
+
+
+def _format_record(record):
+    if record['skipped']:
+        return f"{record['stage']:>9} {record['n_nodes']:>9} nodes  skipped"
+    memory = f"{record['peak_bytes'] / 2**20:10.1f} MiB peak" if record['peak_bytes'] is not None else ''
+    return f"{record['stage']:>9} {record['n_nodes']:>9} nodes {record['seconds'] * 1000:10.1f} ms {memory}"
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark CoRIx build, aggregation, layout and rendering on synthetic trees.")
+    parser.add_argument('-o', '--output', default='corix_benchmark.json', help="Results file (default: corix_benchmark.json).")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="Approximate node counts.")
+    parser.add_argument('--stages', nargs='+', choices=DEFAULT_STAGES, default=list(DEFAULT_STAGES), help="Stages to run.")
+    parser.add_argument('--columns', type=int, default=DEFAULT_COLUMNS, help="Scenario columns per table.")
+    parser.add_argument('--depth', type=int, default=DEFAULT_DEPTH, help="Tree levels, root included.")
+    parser.add_argument('--nan-fraction', type=float, default=0.0, help="Fraction of missing leaf scores.")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per stage (fastest kept).")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc peak-memory run.")
+    parser.add_argument('--max-render-nodes', type=int, default=DEFAULT_MAX_RENDER_NODES, help="Skip rendering above this size.")
+    parser.add_argument('--baseline', help="Earlier results file to compare against.")
+    args = parser.parse_args()
+
+    results = run_benchmarks(
+        sizes=args.sizes, stages=args.stages, n_columns=args.columns, depth=args.depth, nan_fraction=args.nan_fraction,
+        repeat=args.repeat, measure_memory=not args.no_memory, max_render_nodes=args.max_render_nodes,
+        progress=lambda record: print(_format_record(record), flush=True),
+    )
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            slower = compare_results(results, json.load(f)['results'])
+        for entry in slower:
+            print(f"REGRESSION {entry['stage']} at {entry['n_nodes']} nodes: {entry['seconds'] * 1000:.1f} ms "
+                  f"vs {entry['baseline_seconds'] * 1000:.1f} ms ({entry['ratio']:.2f}x)")
+        if slower:
+            sys.exit(1)
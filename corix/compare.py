@@ -0,0 +1,135 @@
+"""Bulk comparison of application/scenario columns: per-node deltas, ranks and the most divergent leaves.
+
+All statistics are computed once over the (nodes x scenarios) slice of an aggregated
+`CorixScoreMatrix`, so comparing dozens of scenarios costs a handful of array operations rather than
+one tree build per column.
+"""
+
+import numpy as np
+import pandas as pd
+
+from corix.engine import CorixScoreMatrix, CorixTree
+
+
+class ScenarioComparison:
+    """Scores of several scenarios side by side, with deltas against a baseline scenario.
+
+    Attributes:
+        scores (np.ndarray): (n_nodes, n_scenarios) aggregated scores.
+        deltas (np.ndarray): `scores` minus the baseline column.
+        spread (np.ndarray): Per-node highest minus lowest score across scenarios (NaN-ignoring).
+        ranks (np.ndarray): Per-node rank of each scenario, 1 being the riskiest; NaN scores rank last.
+    """
+
+    def __init__(self, score_matrix, columns=None, baseline=None):
+        if not isinstance(score_matrix, CorixScoreMatrix):
+            raise TypeError("score_matrix must be a CorixScoreMatrix.")
+        columns = list(score_matrix.columns if columns is None else columns)
+        if not columns:
+            raise ValueError("At least one column is needed for a comparison.")
+        for col in columns:
+            if col not in score_matrix.column_index:
+                raise KeyError(f"The column '{col}' not found in the score matrix.")
+        if baseline is None:
+            baseline = columns[0]
+        if baseline not in columns:
+            raise KeyError(f"The baseline column '{baseline}' is not one of the compared columns.")
+
+        self.topology = score_matrix.topology
+        self.columns = columns
+        self.column_index = {col: j for j, col in enumerate(columns)}
+        self.baseline = baseline
+        self.scores = score_matrix.scores[:, [score_matrix.column_index[col] for col in columns]]
+        self.raw_scores = score_matrix.raw_scores[:, [score_matrix.column_index[col] for col in columns]]
+        self.deltas = self.scores - self.scores[:, [self.column_index[baseline]]]
+        self.spread = np.fmax.reduce(self.scores, axis=1) - np.fmin.reduce(self.scores, axis=1)
+
+        n, k = self.scores.shape
+        order = np.argsort(-np.nan_to_num(self.scores, nan=-np.inf), axis=1, kind='stable')
+        self.ranks = np.empty((n, k), dtype=np.int64)
+        self.ranks[np.arange(n)[:, None], order] = np.arange(1, k + 1)
+        self._in_tree = self.topology.depths >= 0
+
+    def delta_tree(self, column):
+        """Returns a `CorixTree` whose scores are `column`'s deltas against the baseline."""
+        if column not in self.column_index:
+            raise KeyError(f"The column '{column}' is not one of the compared columns.")
+        j = self.column_index[column]
+        return CorixTree(self.topology, self.deltas[:, j], self.raw_scores[:, j], f"{column} vs {self.baseline}")
+
+    def scenario_summary(self):
+        """Root score, rank and delta against the baseline for every scenario, riskiest first."""
+        root = self.topology.root
+        if root < 0:
+            return pd.DataFrame(columns=['Scenario', 'Overall Score', 'Rank', f'Delta vs {self.baseline}'])
+        frame = pd.DataFrame({
+            'Scenario': self.columns,
+            'Overall Score': self.scores[root],
+            'Rank': self.ranks[root],
+            f'Delta vs {self.baseline}': self.deltas[root],
+        })
+        return frame.sort_values('Rank', kind='stable').reset_index(drop=True)
+
+    def node_frame(self, level=None):
+        """Per-node scores, deltas against the baseline and spread, most divergent nodes first.
+
+        Args:
+            level (int, optional): Only include nodes of this CoRIx level.
+
+        Returns:
+            pd.DataFrame: `Level`, `Construct`, one score column per scenario, one `Delta` column per
+            non-baseline scenario and `Spread`.
+        """
+        nodes = np.flatnonzero(self._in_tree if level is None else self._in_tree & (self.topology.levels == level))
+        data = {'Level': self.topology.levels[nodes], 'Construct': [self.topology.names[i] for i in nodes]}
+        for col, j in self.column_index.items():
+            data[col] = self.scores[nodes, j]
+        for col, j in self.column_index.items():
+            if col != self.baseline:
+                data[f'Delta {col}'] = self.deltas[nodes, j]
+        data['Spread'] = self.spread[nodes]
+        order = np.argsort(-np.nan_to_num(self.spread[nodes], nan=-np.inf), kind='stable')
+        return pd.DataFrame(data).iloc[order].reset_index(drop=True)
+
+    def top_differing_leaves(self, k=10):
+        """The `k` leaves whose scores differ most across scenarios.
+
+        Returns:
+            pd.DataFrame: `Construct`, `Level`, `Spread`, the highest- and lowest-scoring scenarios
+            and their scores, largest spread first.
+        """
+        leaves = np.flatnonzero(self._in_tree & (self.topology.child_counts == 0))
+        spread = np.nan_to_num(self.spread[leaves], nan=-np.inf)
+        if k < len(leaves):
+            top = np.argpartition(-spread, k)[:k]
+            leaves, spread = leaves[top], spread[top]
+        order = np.argsort(-spread, kind='stable')
+        leaves = leaves[order]
+
+        scores = self.scores[leaves]
+        highest = np.argmax(np.nan_to_num(scores, nan=-np.inf), axis=1)
+        lowest = np.argmin(np.nan_to_num(scores, nan=np.inf), axis=1)
+        rows = np.arange(len(leaves))
+        return pd.DataFrame({
+            'Construct': [self.topology.names[i] for i in leaves],
+            'Level': self.topology.levels[leaves],
+            'Spread': self.spread[leaves],
+            'Highest Scenario': [self.columns[j] for j in highest],
+            'Highest Score': scores[rows, highest],
+            'Lowest Scenario': [self.columns[j] for j in lowest],
+            'Lowest Score': scores[rows, lowest],
+        })
+
+
+def compare_scenarios(score_matrix, columns=None, baseline=None):
+    """Compares scenario columns of an aggregated score matrix in one vectorized pass.
+
+    Args:
+        score_matrix (CorixScoreMatrix): Aggregated scores, e.g. from `aggregate_all_columns`.
+        columns (list, optional): Scenario columns to compare. Defaults to all of them.
+        baseline (str, optional): Column the deltas are taken against. Defaults to the first column.
+
+    Returns:
+        ScenarioComparison: Scores, deltas, ranks and spreads of the compared columns.
+    """
+    return ScenarioComparison(score_matrix, columns=columns, baseline=baseline)
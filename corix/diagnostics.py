@@ -0,0 +1,170 @@
+"""Per-stage wall time, allocation and cache hit/miss instrumentation for one app rerun.
+
+A `Diagnostics` recorder is started per rerun and made current for the thread; code wraps its
+stages in `with stage(name):`. Cached functions call `mark_cache_miss()` from their
+body (which only runs on a miss), so the enclosing stage can report hit or miss. When the recorder
+is disabled, `stage` returns a shared no-op context manager and nothing is timed, traced or logged.
+
+Every finished rerun is also logged as one JSON line per stage on the ``corix.diagnostics`` logger::
+
+    {"event": "stage", "page": "explorer", "stage": "build tree", "ms": 3.2, "alloc_bytes": 10240, "cache": "hit"}
+
+Set ``CORIX_DIAGNOSTICS=1`` to record and log every rerun without opening the panel.
+
+`tracemalloc` counts every thread of the process, so a stage's `alloc_bytes` (its traced peak
+above the memory in use when it started) is only attributable to that stage while a single rerun
+is tracking memory. When other reruns overlap the stage (concurrent sessions), it is reported as
+null rather than mixing in their allocations, and the shared peak is not reset under them.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+
+LOGGER = logging.getLogger('corix.diagnostics')
+ENV_FLAG = 'CORIX_DIAGNOSTICS'
+
+_local = threading.local()
+# tracemalloc is process-wide: it runs only while at least one enabled rerun is tracking memory.
+_tracing_reruns = 0
+# Counts every rerun that started tracking memory, so a stage can tell whether another one overlapped it.
+_tracing_starts = 0
+_tracing_lock = threading.Lock()
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, diagnostics, name, cached):
+        self.diagnostics = diagnostics
+        self.name = name
+        self.cached = cached
+        self.cache_miss = False
+
+    def __enter__(self):
+        self.diagnostics._open.append(self)
+        self._exclusive = False
+        if self.diagnostics.track_memory:
+            with _tracing_lock:
+                self._exclusive = _tracing_reruns == 1
+                self._tracing_starts = _tracing_starts
+                if self._exclusive:
+                    self._memory_start = tracemalloc.get_traced_memory()[0]
+                    tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self._start
+        alloc_bytes = None
+        if self._exclusive:
+            with _tracing_lock:
+                if _tracing_reruns == 1 and _tracing_starts == self._tracing_starts:
+                    alloc_bytes = max(tracemalloc.get_traced_memory()[1] - self._memory_start, 0)
+        self.diagnostics._open.pop()
+        cache = ('miss' if self.cache_miss else 'hit') if self.cached else None
+        self.diagnostics.records.append({'stage': self.name, 'ms': seconds * 1000, 'alloc_bytes': alloc_bytes, 'cache': cache})
+        return False
+
+
+class Diagnostics:
+    """Stage records of one rerun of one page."""
+
+    def __init__(self, page, enabled=False, track_memory=True):
+        self.page = page
+        self.enabled = enabled
+        self.track_memory = enabled and track_memory
+        self.records = []
+        self._open = []
+        self._started = time.perf_counter()
+        if self.track_memory:
+            global _tracing_reruns, _tracing_starts
+            with _tracing_lock:
+                _tracing_reruns += 1
+                _tracing_starts += 1
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+
+    def stage(self, name, cached=False):
+        """Context manager timing one stage; `cached=True` reports cache hit/miss for it."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, cached)
+
+    def frame(self):
+        """The recorded stages as a DataFrame (`Stage`, `ms`, `Cache`, `Allocated KiB`; empty when other reruns overlapped the stage)."""
+        import pandas as pd
+
+        return pd.DataFrame({
+            'Stage': [r['stage'] for r in self.records],
+            'ms': [round(r['ms'], 2) for r in self.records],
+            'Cache': [r['cache'] or '' for r in self.records],
+            'Allocated KiB': [None if r['alloc_bytes'] is None else round(r['alloc_bytes'] / 1024, 1) for r in self.records],
+        })
+
+    def finish(self):
+        """Logs every stage as a structured line plus a rerun total; returns the total milliseconds."""
+        total_ms = (time.perf_counter() - self._started) * 1000
+        if self.enabled:
+            for record in self.records:
+                LOGGER.info(json.dumps({'event': 'stage', 'page': self.page, **record}))
+            LOGGER.info(json.dumps({'event': 'rerun', 'page': self.page, 'ms': total_ms, 'stages': len(self.records)}))
+        if self.track_memory:
+            global _tracing_reruns
+            with _tracing_lock:
+                _tracing_reruns -= 1
+                if _tracing_reruns == 0:
+                    tracemalloc.stop()
+            self.track_memory = False
+        if _local.__dict__.get('current') is self:
+            _local.current = None
+        return total_ms
+
+
+def start_rerun(page, enabled=False, track_memory=True):
+    """Starts (and makes current for this thread) the recorder of a rerun.
+
+    Args:
+        page (str): Page name used in the log lines.
+        enabled (bool): Record stages. Also enabled by the `CORIX_DIAGNOSTICS` environment variable.
+        track_memory (bool): Trace allocations with `tracemalloc` while enabled.
+
+    Returns:
+        Diagnostics: The recorder; call `finish` at the end of the rerun.
+    """
+    enabled = enabled or os.environ.get(ENV_FLAG, '') not in ('', '0')
+    diagnostics = Diagnostics(page, enabled=enabled, track_memory=track_memory)
+    _local.current = diagnostics
+    return diagnostics
+
+
+def current():
+    """The recorder of the rerun running on this thread, or None."""
+    return _local.__dict__.get('current')
+
+
+def stage(name, cached=False):
+    """`Diagnostics.stage` on the current recorder; a no-op when there is none or it is disabled."""
+    diagnostics = _local.__dict__.get('current')
+    if diagnostics is None:
+        return _NULL_STAGE
+    return diagnostics.stage(name, cached)
+
+
+def mark_cache_miss():
+    """Called from a cached function's body: marks the innermost open stage as a cache miss."""
+    diagnostics = _local.__dict__.get('current')
+    if diagnostics is not None and diagnostics._open:
+        diagnostics._open[-1].cache_miss = True
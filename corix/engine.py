@@ -0,0 +1,298 @@
+"""Vectorized CoRIx aggregation over every application/scenario column at once."""
+
+import numpy as np
+import pandas as pd
+
+from corix.operators import AggregationRules
+from corix.topology import compile_topology
+
+ROOT_CONSTRUCT = 'Validity/Reliability (V/R)'
+
+PARENT_MAP = {
+    'Model Testing (MT)': 'Validity/Reliability (V/R)', 'Red Teaming (RT)': 'Validity/Reliability (V/R)', 'Field Testing (FT)': 'Validity/Reliability (V/R)',
+    'MT Annotator Label': 'Model Testing (MT)', 'RT Annotator Label': 'Red Teaming (RT)', 'RT User Perception': 'Red Teaming (RT)', 'FT Annotator Label': 'Field Testing (FT)', 'FT User Perception': 'Field Testing (FT)',
+    'MT RA 1': 'MT Annotator Label', 'MT RA 2': 'MT Annotator Label', 'MT DD 3': 'MT Annotator Label', 'MT CC 4': 'MT Annotator Label', 'MT CC 5': 'MT Annotator Label', 'MT QQ 1.1': 'MT Annotator Label', 'MT QQ 2.1': 'MT Annotator Label',
+    'RT RA 1': 'RT Annotator Label', 'RT RA 2.1': 'RT Annotator Label', 'RT DD 3': 'RT Annotator Label', 'RT DD 4': 'RT Annotator Label', 'RT CC 5': 'RT Annotator Label', 'RT QQ 1.1': 'RT Annotator Label', 'RT QQ 2.1': 'RT Annotator Label',
+    'RT UR 1': 'RT User Perception', 'RT UR 2': 'RT User Perception', 'RT UR 3': 'RT User Perception', 'RT UR 4': 'RT User Perception', 'RT UR 5': 'RT User Perception',
+    'FT RA 1': 'FT Annotator Label', 'FT RA 2': 'FT Annotator Label', 'FT DD 3': 'FT Annotator Label', 'FT CC 4': 'FT Annotator Label', 'FT CC 5': 'FT Annotator Label', 'FT QQ 1.1': 'FT Annotator Label', 'FT QQ 2.1': 'FT Annotator Label',
+    'FT UR 1': 'FT User Perception', 'FT UR 2': 'FT User Perception', 'FT UR 3': 'FT User Perception', 'FT UR 4': 'FT User Perception', 'FT UR 5': 'FT User Perception',
+    'MT Annotator Label (Overall)': 'MT Annotator Label', 'RT Annotator Label (Overall)': 'RT Annotator Label', 'RT User Perception (Overall)': 'RT User Perception', 'FT Annotator Label (Overall)': 'FT Annotator Label', 'FT User Perception (Overall)': 'FT User Perception'
+}
+
+REQUIRED_COLUMNS = ['Level', 'Construct']
+# Default aggregation rule per parent level: Level 2 takes the max of its children, Levels 3-5 the mean.
+# Other operators, per level or per node, are configured with `corix.operators.AggregationRules`.
+MAX_LEVELS = (2,)
+MEAN_LEVELS = (3, 4, 5)
+DEFAULT_RULES = AggregationRules({**{level: 'max' for level in MAX_LEVELS}, **{level: 'mean' for level in MEAN_LEVELS}})
+
+
+class CorixScoreMatrix:
+    """Aggregated scores for every node (rows) and application/scenario column (columns).
+
+    Rows are the node ids of `topology`, which follow the `(Level, Construct)` sort order of the
+    source table. `raw_scores` keeps the values read from the table before aggregation and `rules`
+    the `AggregationRules` the scores were aggregated with.
+    """
+
+    def __init__(self, topology, columns, raw_scores, scores, rules=None):
+        self.topology = topology
+        self.columns = list(columns)
+        self.raw_scores = raw_scores
+        self.scores = scores
+        self.rules = DEFAULT_RULES if rules is None else rules
+        self.column_index = {col: j for j, col in enumerate(self.columns)}
+
+    @property
+    def names(self):
+        return self.topology.names
+
+    @property
+    def levels(self):
+        return self.topology.levels
+
+    @property
+    def parents(self):
+        return self.topology.parents
+
+    @property
+    def root(self):
+        return self.topology.root
+
+    @property
+    def index(self):
+        return self.topology.index
+
+    def __len__(self):
+        return len(self.topology)
+
+    def column_scores(self, column):
+        """Returns the aggregated scores of one column as a 1-D view (no copy)."""
+        if column not in self.column_index:
+            raise KeyError(f"The column '{column}' not found in the score matrix.")
+        return self.scores[:, self.column_index[column]]
+
+    def tree(self, column):
+        """Returns the per-scenario `CorixTree` view of one column."""
+        scores = self.column_scores(column)
+        return CorixTree(self.topology, scores, self.raw_scores[:, self.column_index[column]], column, self.rules)
+
+    def to_frame(self):
+        """Returns the aggregated scores as a DataFrame in the `corix_scores.csv` layout."""
+        frame = pd.DataFrame(self.scores, columns=self.columns)
+        frame.insert(0, 'Construct', list(self.names))
+        frame.insert(0, 'Level', self.levels)
+        return frame
+
+
+class AssessmentItems:
+    """Lazy view of the scored assessment items contributing to one node (a slice of the tree's shared item array)."""
+
+    def __init__(self, tree, start, stop):
+        self.tree = tree
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def node_ids(self, offset=0, limit=None):
+        """Item node ids `offset` to `offset + limit` (in tree order) as a read-only slice."""
+        stop = self.stop if limit is None else min(self.start + offset + limit, self.stop)
+        return self.tree.scored_items[self.start + offset:stop]
+
+    def page(self, offset=0, limit=None):
+        """One page of items as a DataFrame with `Item ID`, `Question` and `Score`."""
+        nodes = self.node_ids(offset, limit)
+        names = [self.tree.topology.names[i] for i in nodes.tolist()]
+        return pd.DataFrame({
+            'Item ID': names,
+            'Question': [f"Assessment for {name}" for name in names],
+            'Score': np.asarray(self.tree.raw_scores[nodes], dtype=np.float64),
+        })
+
+
+class CorixTree:
+    """One application/scenario: a shared topology plus two float arrays aligned with its node ids.
+
+    `rules` are the `AggregationRules` that produced `scores` (what-if and bootstrap re-aggregate with them).
+    """
+
+    def __init__(self, topology, scores, raw_scores, column, rules=None):
+        self.topology = topology
+        self.scores = scores
+        self.raw_scores = raw_scores
+        self.column = column
+        self.rules = DEFAULT_RULES if rules is None else rules
+        self._scored_items = None
+
+    def __len__(self):
+        return len(self.topology)
+
+    def __contains__(self, node_id):
+        return node_id in self.topology.index
+
+    def _item_index(self):
+        # The topology's items at the rules' item level that have a raw score in this column, the rank
+        # of every topology item position among them, and the item intervals, so a node's interval
+        # maps to a slice of the scored items.
+        if self._scored_items is None:
+            item_nodes, item_start, item_stop = self.topology.item_intervals(self.rules.item_level)
+            scored = ~np.isnan(np.asarray(self.raw_scores)[item_nodes])
+            ranks = np.r_[0, np.cumsum(scored)].astype(np.int64)
+            self._scored_items = (item_nodes[scored], ranks, item_start, item_stop)
+        return self._scored_items
+
+    @property
+    def scored_items(self):
+        """Item-level nodes of the root's tree with a raw score in this column, in tree (pre-order) order."""
+        return self._item_index()[0]
+
+    def assessment_items(self, node):
+        """Returns the scored assessment items contributing to `node` as an `AssessmentItems` view.
+
+        The items are the contiguous slice of `scored_items` covered by the node's Euler-tour
+        interval; nothing is copied until a page is read.
+        """
+        _, ranks, item_start, item_stop = self._item_index()
+        return AssessmentItems(self, int(ranks[item_start[node]]), int(ranks[item_stop[node]]))
+
+
+def score_columns(dataframe):
+    """Returns the application/scenario columns of a CoRIx table (everything but Level/Construct)."""
+    return [col for col in dataframe.columns if col not in REQUIRED_COLUMNS]
+
+
+def aggregate_scores(topology, raw_scores, rules=None):
+    """Aggregates a nodes x columns matrix of raw scores bottom-up over a compiled topology.
+
+    Nodes are processed one tree depth at a time, deepest first, following `topology.reduce_plan`.
+    Each depth's parents are grouped by the operator their rule selects and every group is reduced
+    by that operator's segment kernel, e.g. `np.maximum.reduceat` (Level 2) or `np.add.reduceat`
+    divided by the child count (Levels 3-5) under the default rules. The cost is a handful of NumPy
+    calls per depth and operator regardless of how many columns are scored. Leaves keep their raw
+    score but pass 0.0 up to their parent unless they are at the rules' item level (Level 5); nodes
+    outside the root's tree are not touched.
+
+    Args:
+        topology (CorixTopology): Compiled hierarchy.
+        raw_scores (np.ndarray): Float matrix of shape (len(topology), n_columns).
+        rules (AggregationRules, optional): Operator per level/node. Defaults to `DEFAULT_RULES`.
+
+    Returns:
+        np.ndarray: Aggregated scores with the same shape as `raw_scores`.
+    """
+    if rules is None:
+        rules = DEFAULT_RULES
+    scores = np.array(raw_scores, dtype=np.float64)
+    if topology.root < 0:
+        return scores
+
+    # What a node passes up to its parent: leaves above the item level contribute 0.0.
+    contributions = scores.copy()
+    contributions[(topology.child_counts == 0) & (topology.levels != rules.item_level)] = 0.0
+
+    for (children, starts, group_parents), step in zip(topology.reduce_plan, rules.plan(topology)):
+        values = contributions[children]
+        aggregated = np.full((len(group_parents), scores.shape[1]), np.nan)
+        for kernel, params, groups, rows, segments in step:
+            if groups is None:
+                aggregated = kernel(values, segments, **params)
+            else:
+                aggregated[groups] = kernel(values[rows], segments, **params)
+        scores[group_parents] = aggregated
+        contributions[group_parents] = aggregated
+    return scores
+
+
+def topology_from_frame(dataframe, parent_map=None, root_construct=ROOT_CONSTRUCT):
+    """Compiles the topology of a CoRIx table and returns it with the table in node-id order.
+
+    Rows are sorted by `(Level, Construct)` and duplicate constructs keep their last row, the same
+    order and "last row wins" behaviour as the historical per-column dict builder.
+
+    Returns:
+        tuple: (CorixTopology, pd.DataFrame sorted into node-id order).
+    """
+    if parent_map is None:
+        parent_map = PARENT_MAP
+    df_sorted = dataframe.sort_values(by=REQUIRED_COLUMNS, kind='stable')
+    df_sorted = df_sorted.drop_duplicates(subset='Construct', keep='last').reset_index(drop=True)
+    topology = compile_topology(df_sorted['Construct'].tolist(), df_sorted['Level'].to_numpy(dtype=np.int64), parent_map, root_construct)
+    return topology, df_sorted
+
+
+def aggregate_all_columns(dataframe, parent_map=None, root_construct=ROOT_CONSTRUCT, columns=None, rules=None):
+    """Aggregates every application/scenario column of a CoRIx table in one bottom-up pass.
+
+    Args:
+        dataframe (pd.DataFrame): Table with `Level`, `Construct` and one column per application/scenario.
+        parent_map (dict, optional): Child construct -> parent construct. Defaults to `PARENT_MAP`.
+        root_construct (str): Name of the Level 2 root node.
+        columns (list, optional): Subset of score columns to aggregate. Defaults to all of them.
+        rules (AggregationRules, optional): Operator per level/node. Defaults to `DEFAULT_RULES`.
+
+    Returns:
+        CorixScoreMatrix: Dense nodes x columns matrix of aggregated scores.
+    """
+    if not isinstance(dataframe, pd.DataFrame):
+        raise TypeError("Input 'dataframe' must be a pandas DataFrame.")
+    for col in REQUIRED_COLUMNS:
+        if col not in dataframe.columns:
+            raise KeyError(f"Required column '{col}' not found in the DataFrame.")
+    if columns is None:
+        columns = score_columns(dataframe)
+    for col in columns:
+        if col not in dataframe.columns:
+            raise KeyError(f"The column '{col}' not found in the DataFrame.")
+
+    topology, df_sorted = topology_from_frame(dataframe[REQUIRED_COLUMNS + list(columns)], parent_map, root_construct)
+    raw_scores = df_sorted[list(columns)].to_numpy(dtype=np.float64).reshape(len(topology), len(columns))
+    scores = aggregate_scores(topology, raw_scores, rules)
+    return CorixScoreMatrix(topology, columns, raw_scores, scores, rules)
+
+
+def tree_data_from_scores(score_matrix, column):
+    """Reads the per-column node dictionary of the historical `build_corix_tree_data` out of a score matrix.
+
+    Each node dict has `children` (sorted by id) and `raw_assessment_items`. The explorer page works
+    on `CorixTree` views instead; this is kept for exports that need plain nested dicts. Item dicts
+    are built once and every node's list is a slice of that shared list (its Euler-tour interval),
+    in tree order. As in `build_corix_tree_data`, a scored item-level node outside the root's tree
+    (e.g. one whose parent row is missing) lists itself as its only item.
+
+    Args:
+        score_matrix (CorixScoreMatrix): Result of `aggregate_all_columns`.
+        column (str): Application/scenario column to read.
+
+    Returns:
+        dict: Node id -> node dict, or an empty dict when the tree has no root.
+    """
+    if score_matrix.root < 0:
+        return {}
+    tree = score_matrix.tree(column)
+    topology = tree.topology
+    names = topology.names
+
+    items = [
+        {'item_id': names[i], 'question': f"Assessment for {names[i]}", 'score': float(tree.raw_scores[i])}
+        for i in tree.scored_items.tolist()
+    ]
+    all_nodes = {}
+    for i, name in enumerate(names):
+        parent = topology.parents[i]
+        if topology.depths[i] < 0:
+            node_items = []
+            if topology.levels[i] == tree.rules.item_level and not np.isnan(tree.raw_scores[i]):
+                node_items = [{'item_id': name, 'question': f"Assessment for {name}", 'score': float(tree.raw_scores[i])}]
+        else:
+            node_items = tree.assessment_items(i)
+            node_items = items[node_items.start:node_items.stop]
+        all_nodes[name] = {
+            'id': name, 'name': name, 'parent_id': names[parent] if parent >= 0 else None,
+            'score': float(tree.scores[i]), 'level': int(topology.levels[i]), 'construct': name,
+            'children': [], 'raw_assessment_items': node_items
+        }
+    for i, name in enumerate(names):
+        all_nodes[name]['children'] = [all_nodes[names[c]] for c in topology.children(i)]
+    return all_nodes
@@ -0,0 +1,98 @@
+"""CoRIx hierarchies (parent map, root construct and aggregation rules) read from JSON or TOML files.
+
+A hierarchy config replaces the inline `PARENT_MAP` and the built-in max/mean rules, e.g. in JSON:
+
+    {
+      "root_construct": "Validity/Reliability (V/R)",
+      "parent_map": {"Model Testing (MT)": "Validity/Reliability (V/R)", "...": "..."},
+      "levels": {"2": "max", "3": "mean", "4": {"operator": "trimmed_mean", "proportion": 0.2}, "5": "nanmean"},
+      "nodes": {"Red Teaming (RT)": {"operator": "quantile", "q": 0.75}},
+      "weights": {"RT UR 1": 2.0},
+      "item_level": 5
+    }
+
+Every key is optional; missing ones take the built-in hierarchy's value (`levels` is replaced as a
+whole, not merged). Deeper hierarchies list their extra levels under `levels` and set `item_level`
+to the level of their scored leaves. Operators are the names registered in `corix.operators`.
+"""
+
+import json
+import os
+
+from corix.engine import DEFAULT_RULES, PARENT_MAP, ROOT_CONSTRUCT
+from corix.operators import AggregationRules
+
+CONFIG_FORMATS = ('json', 'toml')
+RULE_KEYS = ('levels', 'nodes', 'weights', 'item_level')
+
+
+class CorixHierarchy:
+    """A parent map, its root construct and the `AggregationRules` it is aggregated with."""
+
+    def __init__(self, parent_map=None, root_construct=ROOT_CONSTRUCT, rules=None):
+        if parent_map is not None and not isinstance(parent_map, dict):
+            raise TypeError(f"parent_map must be a dict, got {type(parent_map).__name__}")
+        self.parent_map = PARENT_MAP if parent_map is None else {str(child): str(parent) for child, parent in parent_map.items()}
+        self.root_construct = str(root_construct)
+        self.rules = DEFAULT_RULES if rules is None else rules
+
+    def options(self):
+        """Keyword arguments for `aggregate_all_columns`, `cached_store_tree`, `warm_tree_cache`, `batch_score`, `RunStore.add_run` and `RunStore.add_store_run`."""
+        return {'parent_map': self.parent_map, 'root_construct': self.root_construct, 'rules': self.rules}
+
+    def to_dict(self):
+        """The hierarchy in the config-file format."""
+        return {'root_construct': self.root_construct, 'parent_map': dict(self.parent_map), **self.rules.to_dict()}
+
+    @classmethod
+    def from_dict(cls, value):
+        """Builds a hierarchy from the config-file format; missing keys take the built-in values."""
+        if not isinstance(value, dict):
+            raise TypeError(f"A hierarchy config must be a mapping, got {type(value).__name__}")
+        unknown = sorted(set(value) - {'root_construct', 'parent_map', *RULE_KEYS})
+        if unknown:
+            raise ValueError(f"Unknown hierarchy config key(s): {unknown}")
+        rules = DEFAULT_RULES
+        if any(key in value for key in RULE_KEYS):
+            rules = AggregationRules.from_dict({**DEFAULT_RULES.to_dict(), **{key: value[key] for key in RULE_KEYS if key in value}})
+        return cls(value.get('parent_map'), value.get('root_construct', ROOT_CONSTRUCT), rules)
+
+
+def default_hierarchy():
+    """The built-in CoRIx hierarchy: `PARENT_MAP`, `ROOT_CONSTRUCT` and `DEFAULT_RULES`."""
+    return CorixHierarchy()
+
+
+def load_hierarchy(path):
+    """Reads a hierarchy config file (`.json` or `.toml`).
+
+    Args:
+        path (str or os.PathLike): Config file; the format follows the extension.
+
+    Returns:
+        CorixHierarchy: The configured hierarchy.
+    """
+    if not isinstance(path, (str, os.PathLike)):
+        raise TypeError(f"path must be a string or a path-like object, got {type(path).__name__}")
+    config_format = os.path.splitext(os.fspath(path))[1].lstrip('.').lower()
+    if config_format not in CONFIG_FORMATS:
+        raise ValueError(f"Unsupported hierarchy config format '{config_format}', expected one of {CONFIG_FORMATS}.")
+    if config_format == 'json':
+        with open(path, encoding='utf-8') as f:
+            value = json.load(f)
+    else:
+        import tomllib
+        with open(path, 'rb') as f:
+            value = tomllib.load(f)
+    return CorixHierarchy.from_dict(value)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate a CoRIx hierarchy config and print it as JSON (the built-in hierarchy by default).")
+    parser.add_argument('config', nargs='?', help="Hierarchy config (.json or .toml).")
+    args = parser.parse_args()
+
+    hierarchy = load_hierarchy(args.config) if args.config else default_hierarchy()
+    print(json.dumps(hierarchy.to_dict(), indent=2))
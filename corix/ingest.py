@@ -0,0 +1,260 @@
+"""Streaming ingestion of raw Level 6 annotator/questionnaire responses into Level 5 scores.
+
+Responses are read in fixed-size chunks from CSV or JSONL files. Each record names a Level 5
+construct, the application/scenario it was collected for and a 0-10 score::
+
+    {"construct": "MT RA 1", "application": "Application A", "scenario": "Pathfinder", "score": 7.5}
+
+(a single ``column`` field, e.g. ``"Application A - Pathfinder"``, may replace application/scenario).
+Only running sums, counts and sums of squared deviations from the mean per (construct, column) are
+kept, so memory is bounded by the number of distinct constructs and columns, not by the number of
+responses. Each chunk's squared deviations are taken from the chunk's own means and merged into the
+totals with Chan et al.'s pairwise update, which stays accurate for many responses with low spread
+(the one-pass `sum(x^2) - n * mean^2` form cancels catastrophically there).
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from corix.engine import PARENT_MAP, REQUIRED_COLUMNS, aggregate_all_columns
+
+DEFAULT_CHUNKSIZE = 100_000
+STANDARD_ERRORS_SUFFIX = '.stderr.csv'
+
+
+def default_standard_errors_path(csv_path):
+    """Returns the standard-error table written next to a score CSV (`scores.csv` -> `scores.stderr.csv`)."""
+    root, _ = os.path.splitext(os.fspath(csv_path))
+    return root + STANDARD_ERRORS_SUFFIX
+
+
+class ResponseAccumulator:
+    """Running per-construct, per-scenario sums, counts and squared deviations (`m2`) of raw response scores."""
+
+    def __init__(self):
+        self.constructs = []
+        self.columns = []
+        self.levels = {}
+        self._construct_index = {}
+        self._column_index = {}
+        self.sums = np.zeros((0, 0))
+        self.m2 = np.zeros((0, 0))
+        self.counts = np.zeros((0, 0), dtype=np.int64)
+        self.n_responses = 0
+
+    def _codes(self, values, names, index):
+        uniques, codes = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        for i, name in enumerate(uniques):
+            if name not in index:
+                index[name] = len(names)
+                names.append(name)
+            mapping[i] = index[name]
+        return mapping[codes]
+
+    def _grow(self):
+        shape = (len(self.constructs), len(self.columns))
+        if self.sums.shape == shape:
+            return
+        for attr in ('sums', 'm2', 'counts'):
+            old = getattr(self, attr)
+            new = np.zeros(shape, dtype=old.dtype)
+            new[:old.shape[0], :old.shape[1]] = old
+            setattr(self, attr, new)
+
+    def add_chunk(self, chunk):
+        """Folds one chunk of responses (a DataFrame with `construct`, `column` and `score`) into the totals."""
+        scores = pd.to_numeric(chunk['score'], errors='coerce').to_numpy(dtype=np.float64)
+        valid = ~np.isnan(scores)
+        if not valid.any():
+            return
+        constructs = chunk['construct'].to_numpy()[valid]
+        rows = self._codes(constructs, self.constructs, self._construct_index)
+        cols = self._codes(chunk['column'].to_numpy()[valid], self.columns, self._column_index)
+        if 'level' in chunk.columns:
+            for construct, level in zip(constructs, chunk['level'].to_numpy()[valid]):
+                self.levels.setdefault(str(construct), int(level))
+        self._grow()
+        scores = scores[valid]
+
+        # Per-cell count, sum and squared deviations of this chunk, around the chunk's own means.
+        cells = rows * len(self.columns) + cols
+        size = self.counts.size
+        chunk_counts = np.bincount(cells, minlength=size)
+        chunk_sums = np.bincount(cells, weights=scores, minlength=size)
+        touched = np.flatnonzero(chunk_counts)
+        chunk_means = np.zeros(size)
+        chunk_means[touched] = chunk_sums[touched] / chunk_counts[touched]
+        chunk_m2 = np.bincount(cells, weights=(scores - chunk_means[cells]) ** 2, minlength=size)
+
+        # Chan et al. merge of (count, mean, m2) of the totals so far and of the chunk.
+        counts, sums, m2 = self.counts.reshape(-1), self.sums.reshape(-1), self.m2.reshape(-1)
+        n_a, n_b = counts[touched].astype(np.float64), chunk_counts[touched].astype(np.float64)
+        mean_a = np.where(n_a > 0, sums[touched] / np.maximum(n_a, 1.0), 0.0)
+        delta = chunk_means[touched] - mean_a
+        m2[touched] += chunk_m2[touched] + delta * delta * n_a * n_b / (n_a + n_b)
+        sums[touched] += chunk_sums[touched]
+        counts[touched] += chunk_counts[touched]
+        self.n_responses += int(valid.sum())
+
+    def means(self):
+        """Level 5 scores: mean response per construct (rows) and column; NaN where nothing was collected."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.counts > 0, self.sums / np.maximum(self.counts, 1), np.nan)
+
+    def standard_errors(self):
+        """Standard error of every mean (sample standard deviation / sqrt(count)); NaN below two responses."""
+        counts = self.counts.astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variances = self.m2 / (counts - 1)
+            return np.where(self.counts > 1, np.sqrt(variances / counts), np.nan)
+
+    def node_standard_errors(self, topology, column):
+        """Standard errors of one column aligned with a topology's node ids (NaN for other nodes)."""
+        if column not in self._column_index:
+            raise KeyError(f"The column '{column}' not found in the ingested responses.")
+        errors = np.full(len(topology), np.nan)
+        column_errors = self.standard_errors()[:, self._column_index[column]]
+        for name, row in self._construct_index.items():
+            if name in topology.index:
+                errors[topology.index[name]] = column_errors[row]
+        return errors
+
+    def to_frame(self, parent_map=None, include_hierarchy=True):
+        """Returns the accumulated scores in the `corix_scores.csv` layout.
+
+        Args:
+            parent_map (dict, optional): Used to add the ancestor constructs (Levels 2-4) with NaN
+                scores so the table can be aggregated directly. Defaults to `PARENT_MAP`.
+            include_hierarchy (bool): Set to False to emit only the ingested Level 5 rows.
+
+        Returns:
+            pd.DataFrame: `Level`, `Construct` and one column per application/scenario.
+        """
+        if parent_map is None:
+            parent_map = PARENT_MAP
+        levels = {name: self.levels.get(name, 5) for name in self.constructs}
+        if include_hierarchy:
+            for name in self.constructs:
+                parent, level = parent_map.get(name), levels[name]
+                while parent is not None and parent not in levels:
+                    level -= 1
+                    levels[parent] = level
+                    parent = parent_map.get(parent)
+
+        names = sorted(levels, key=lambda name: (levels[name], name))
+        means = self.means()
+        values = np.full((len(names), len(self.columns)), np.nan)
+        for i, name in enumerate(names):
+            if name in self._construct_index:
+                values[i] = means[self._construct_index[name]]
+        frame = pd.DataFrame(values, columns=self.columns)
+        frame.insert(0, 'Construct', names)
+        frame.insert(0, 'Level', [levels[name] for name in names])
+        return frame
+
+    def standard_errors_frame(self):
+        """Returns the standard errors of the ingested constructs in the `corix_scores.csv` layout (NaN below two responses)."""
+        names = sorted(self.constructs, key=lambda name: (self.levels.get(name, 5), name))
+        rows = [self._construct_index[name] for name in names]
+        frame = pd.DataFrame(self.standard_errors()[rows].reshape(len(names), len(self.columns)), columns=self.columns)
+        frame.insert(0, 'Construct', names)
+        frame.insert(0, 'Level', [self.levels.get(name, 5) for name in names])
+        return frame
+
+    def to_score_matrix(self, parent_map=None):
+        """Feeds the accumulated Level 5 scores straight into the aggregation engine."""
+        return aggregate_all_columns(self.to_frame(parent_map=parent_map), parent_map=parent_map)
+
+
+def leaf_standard_errors(frame, topology, column):
+    """Aligns one column of a `standard_errors_frame` table with a topology's node ids.
+
+    Returns:
+        np.ndarray or None: Standard errors (NaN for constructs without one), or None when the
+        table has no such column.
+    """
+    if column not in frame.columns:
+        return None
+    errors = np.full(len(topology), np.nan)
+    rows = frame['Construct'].map(topology.index)
+    known = rows.notna().to_numpy()
+    errors[rows[known].astype(np.int64).to_numpy()] = frame[column].to_numpy(dtype=np.float64)[known]
+    return errors
+
+
+def _normalise_chunk(chunk):
+    if 'column' not in chunk.columns:
+        missing = [col for col in ('application', 'scenario') if col not in chunk.columns]
+        if missing:
+            raise KeyError(f"Responses need a 'column' field or 'application' and 'scenario' fields; missing {missing}.")
+        chunk = chunk.assign(column=chunk['application'].astype(str) + ' - ' + chunk['scenario'].astype(str))
+    for col in ('construct', 'score'):
+        if col not in chunk.columns:
+            raise KeyError(f"Required response field '{col}' not found.")
+    return chunk
+
+
+def iter_response_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Yields DataFrames of at most `chunksize` responses from a `.csv` or `.jsonl` file."""
+    if not isinstance(path, (str, os.PathLike)):
+        raise TypeError(f"path must be a string or a path-like object, got {type(path).__name__}")
+    if os.fspath(path).endswith(('.jsonl', '.ndjson')):
+        with open(path, encoding='utf-8') as f:
+            records = []
+            for line in f:
+                if line.strip():
+                    records.append(json.loads(line))
+                if len(records) >= chunksize:
+                    yield _normalise_chunk(pd.DataFrame.from_records(records))
+                    records = []
+            if records:
+                yield _normalise_chunk(pd.DataFrame.from_records(records))
+    else:
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            yield _normalise_chunk(chunk)
+
+
+def ingest_responses(paths, chunksize=DEFAULT_CHUNKSIZE, accumulator=None):
+    """Streams one or more response files into a `ResponseAccumulator`.
+
+    Args:
+        paths (str or list): Response file(s), CSV or JSONL.
+        chunksize (int): Responses held in memory at a time.
+        accumulator (ResponseAccumulator, optional): Existing totals to extend.
+
+    Returns:
+        ResponseAccumulator: Running totals over all files.
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    if accumulator is None:
+        accumulator = ResponseAccumulator()
+    for path in paths:
+        for chunk in iter_response_chunks(path, chunksize=chunksize):
+            accumulator.add_chunk(chunk)
+    return accumulator
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stream raw Level 6 responses into a corix_scores.csv-style table.")
+    parser.add_argument('paths', nargs='+', help="Response files (.csv or .jsonl).")
+    # Required, so an ingest never silently replaces the explorer's corix_scores.csv.
+    parser.add_argument('-o', '--output', required=True, help="Output CSV, e.g. corix_scores.csv.")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Responses read per chunk.")
+    parser.add_argument('--leaves-only', action='store_true', help="Emit only the ingested Level 5 rows.")
+    args = parser.parse_args()
+
+    totals = ingest_responses(args.paths, chunksize=args.chunksize)
+    frame = totals.to_frame(include_hierarchy=not args.leaves_only)
+    frame[REQUIRED_COLUMNS + list(totals.columns)].to_csv(args.output, index=False)
+    # Read back by the explorer, which then adds the response-level noise to its bootstrap intervals.
+    standard_errors_path = default_standard_errors_path(args.output)
+    totals.standard_errors_frame().to_csv(standard_errors_path, index=False)
+    print(f"{totals.n_responses} responses -> {len(frame)} constructs x {len(totals.columns)} columns written to {args.output}"
+          f" (standard errors in {standard_errors_path})")
@@ -0,0 +1,206 @@
+"""Linear-time tidy tree layout (Reingold-Tilford, Walker's algorithm as improved by Buchheim et al.).
+
+Positions depend only on the topology, so they are computed once per compiled hierarchy and cached;
+depth filtering and highlighting are then cheap reads over the cached coordinate arrays.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from corix.diagnostics import mark_cache_miss
+
+SIBLING_DISTANCE = 1.0
+_LAYOUT_CACHE = OrderedDict()
+_LAYOUT_CACHE_LOCK = threading.Lock()
+_LAYOUT_CACHE_MAX_ENTRIES = 16
+
+
+class TreeLayout:
+    """Cached node coordinates for one topology.
+
+    `x` is in sibling-distance units (the root's tree spans `0..width`); `y` is the node's CoRIx
+    level, so deeper levels sit lower in the plot. Nodes outside the root's tree get NaN.
+    """
+
+    def __init__(self, topology, x):
+        self.topology = topology
+        self.x = x
+        self.y = topology.levels.astype(np.float64)
+        self.y[topology.depths < 0] = np.nan
+        self.x.setflags(write=False)
+        self.y.setflags(write=False)
+        self.width = float(np.nanmax(x)) if np.isfinite(x).any() else 0.0
+
+    def visible(self, max_level):
+        """Returns the ids of laid-out nodes at or above `max_level` (a mask read, no re-layout)."""
+        return np.flatnonzero((self.topology.depths >= 0) & (self.topology.levels <= max_level))
+
+    def edges(self, nodes):
+        """Returns (x, y) arrays of parent->child segments for `nodes`, separated by NaN, for line traces."""
+        nodes = np.asarray(nodes)
+        parents = self.topology.parents[nodes]
+        keep = parents >= 0
+        if len(nodes):
+            shown = np.zeros(len(self.topology), dtype=bool)
+            shown[nodes] = True
+            keep &= shown[np.maximum(parents, 0)]
+        children, parents = nodes[keep], parents[keep]
+        edge_x = np.column_stack([self.x[parents], self.x[children], np.full(len(children), np.nan)]).ravel()
+        edge_y = np.column_stack([self.y[parents], self.y[children], np.full(len(children), np.nan)]).ravel()
+        return edge_x, edge_y
+
+
+def _first_walk(topology, root, distance):
+    """Buchheim's first walk, done iteratively; returns the `prelim` and `mod` arrays."""
+    n = len(topology)
+    offsets = topology.child_offsets.tolist()
+    child_index = topology.child_index.tolist()
+    parents = topology.parents.tolist()
+
+    prelim = [0.0] * n
+    mod = [0.0] * n
+    shift = [0.0] * n
+    change = [0.0] * n
+    thread = [-1] * n
+    ancestor = list(range(n))
+    number = [0] * n
+    default_ancestor = [-1] * n
+    for v in range(n):
+        for k, w in enumerate(child_index[offsets[v]:offsets[v + 1]]):
+            number[w] = k
+
+    def left_sibling(v):
+        p = parents[v]
+        return child_index[offsets[p] + number[v] - 1] if p >= 0 and number[v] > 0 else -1
+
+    def next_left(v):
+        return child_index[offsets[v]] if offsets[v + 1] > offsets[v] else thread[v]
+
+    def next_right(v):
+        return child_index[offsets[v + 1] - 1] if offsets[v + 1] > offsets[v] else thread[v]
+
+    def apportion(v, default):
+        w = left_sibling(v)
+        if w < 0:
+            return default
+        p = parents[v]
+        vir = vor = v
+        vil = w
+        vol = child_index[offsets[p]]
+        sir, sor, sil, sol = mod[vir], mod[vor], mod[vil], mod[vol]
+        while True:
+            nr, nl = next_right(vil), next_left(vir)
+            if nr < 0 or nl < 0:
+                break
+            vil, vir = nr, nl
+            vol, vor = next_left(vol), next_right(vor)
+            ancestor[vor] = v
+            gap = (prelim[vil] + sil) - (prelim[vir] + sir) + distance
+            if gap > 0:
+                a = ancestor[vil]
+                wl = a if parents[a] == p else default
+                subtrees = number[v] - number[wl]
+                change[v] -= gap / subtrees
+                shift[v] += gap
+                change[wl] += gap / subtrees
+                prelim[v] += gap
+                mod[v] += gap
+                sir += gap
+                sor += gap
+            sil += mod[vil]
+            sir += mod[vir]
+            sol += mod[vol]
+            sor += mod[vor]
+        if next_right(vil) >= 0 and next_right(vor) < 0:
+            thread[vor] = next_right(vil)
+            mod[vor] += sil - sor
+        if next_left(vir) >= 0 and next_left(vol) < 0:
+            thread[vol] = next_left(vir)
+            mod[vol] += sir - sol
+            default = v
+        return default
+
+    def finish(v):
+        start, end = offsets[v], offsets[v + 1]
+        w = left_sibling(v)
+        if start == end:
+            prelim[v] = prelim[w] + distance if w >= 0 else 0.0
+        else:
+            total_shift = total_change = 0.0
+            for c in reversed(child_index[start:end]):
+                prelim[c] += total_shift
+                mod[c] += total_shift
+                total_change += change[c]
+                total_shift += shift[c] + total_change
+            midpoint = (prelim[child_index[start]] + prelim[child_index[end - 1]]) / 2
+            if w >= 0:
+                prelim[v] = prelim[w] + distance
+                mod[v] = prelim[v] - midpoint
+            else:
+                prelim[v] = midpoint
+        p = parents[v]
+        if p >= 0 and v != root:
+            default_ancestor[p] = apportion(v, default_ancestor[p])
+
+    # Post-order traversal: each child is finished (and apportioned) before its next sibling starts.
+    stack = [(root, offsets[root])]
+    while stack:
+        v, k = stack[-1]
+        if k < offsets[v + 1]:
+            stack[-1] = (v, k + 1)
+            c = child_index[k]
+            if k == offsets[v]:
+                default_ancestor[v] = c
+            stack.append((c, offsets[c]))
+        else:
+            stack.pop()
+            finish(v)
+    return np.array(prelim), np.array(mod)
+
+
+def compute_tree_layout(topology, distance=SIBLING_DISTANCE):
+    """Lays out the root's tree in O(n) with Buchheim's improvement of Walker's algorithm.
+
+    Args:
+        topology (CorixTopology): Compiled hierarchy.
+        distance (float): Minimum horizontal gap between neighbouring nodes on the same level.
+
+    Returns:
+        TreeLayout: Node coordinates aligned with the topology's node ids.
+    """
+    n = len(topology)
+    x = np.full(n, np.nan)
+    root = topology.root
+    if root < 0:
+        return TreeLayout(topology, x)
+
+    prelim, mod = _first_walk(topology, root, distance)
+    # Second walk, one depth at a time: a node's offset is the sum of its ancestors' mods.
+    offset = np.zeros(n)
+    depths = topology.depths
+    for depth in range(1, topology.max_depth + 1):
+        nodes = np.flatnonzero(depths == depth)
+        parents = topology.parents[nodes]
+        offset[nodes] = offset[parents] + mod[parents]
+    in_tree = depths >= 0
+    x[in_tree] = prelim[in_tree] + offset[in_tree]
+    x[in_tree] -= x[in_tree].min()
+    return TreeLayout(topology, x)
+
+
+def tree_layout(topology):
+    """Returns the cached layout for a topology, computing it on first use."""
+    with _LAYOUT_CACHE_LOCK:
+        layout = _LAYOUT_CACHE.get(topology.key)
+        if layout is not None:
+            _LAYOUT_CACHE.move_to_end(topology.key)
+            return layout
+    mark_cache_miss()
+    layout = compute_tree_layout(topology)
+    with _LAYOUT_CACHE_LOCK:
+        _LAYOUT_CACHE[topology.key] = layout
+        while len(_LAYOUT_CACHE) > _LAYOUT_CACHE_MAX_ENTRIES:
+            _LAYOUT_CACHE.popitem(last=False)
+    return layout
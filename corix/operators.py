@@ -0,0 +1,343 @@
+"""Registry of vectorized aggregation operators and the per-level/per-node rules that select them.
+
+An operator reduces the child contributions of many parents at once. Its kernel receives the
+children's rows of one reduction step (`values`, shape (n_children, n_columns), grouped by parent
+in CSR order) and the `Segments` describing those groups, and returns one row per parent. Kernels
+are built from segment reductions (`np.ufunc.reduceat`) and per-segment sorts, so every scenario
+column is reduced in the same few NumPy calls.
+
+Built-in operators:
+
+- ``max``, ``min``, ``mean``: NaN in any child makes the parent NaN.
+- ``nanmean``: mean of the non-NaN children (NaN when all children are NaN).
+- ``weighted_mean``: children weighted by the rules' per-node `weights` (default 1.0).
+- ``trimmed_mean`` (``proportion``, default 0.1): mean after dropping `floor(proportion * n)`
+  children from each end.
+- ``quantile`` (``q``, default 0.5): linearly interpolated quantile, as `np.quantile`.
+
+`AggregationRules` picks an operator per parent node: a node rule (by construct name) wins over its
+level's rule, and parents with neither are NaN. Operators are written as a name or as a dict with
+an ``operator`` key plus parameters, e.g. ``{"operator": "quantile", "q": 0.75}``.
+"""
+
+import hashlib
+import json
+import threading
+
+import numpy as np
+
+DEFAULT_ITEM_LEVEL = 5
+_PLAN_CACHE_MAX_ENTRIES = 16
+
+
+class Segments:
+    """The child rows of one reduction step: group g is rows `starts[g]:starts[g] + counts[g]`.
+
+    Attributes:
+        children (np.ndarray): Child node ids, one per row.
+        starts (np.ndarray): First row of each group.
+        counts (np.ndarray): Rows per group (at least 1).
+        weights (np.ndarray): The children's weights, one per row.
+    """
+
+    def __init__(self, children, starts, weights):
+        self.children = children
+        self.starts = starts
+        self.counts = np.diff(np.r_[starts, len(children)]).astype(np.int64)
+        self.weights = weights
+        self._group_ids = None
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def group_ids(self):
+        """Group of every row."""
+        if self._group_ids is None:
+            self._group_ids = np.repeat(np.arange(len(self.starts)), self.counts)
+        return self._group_ids
+
+    def any_nan(self, values):
+        """Boolean (n_groups, n_columns) mask of the groups with a NaN child."""
+        return np.logical_or.reduceat(np.isnan(values), self.starts, axis=0)
+
+    def sort(self, values):
+        """Sorts every group's rows independently per column (NaN last); group boundaries are kept."""
+        order = np.argsort(values, axis=0, kind='stable')
+        order = np.take_along_axis(order, np.argsort(self.group_ids[order], axis=0, kind='stable'), axis=0)
+        return np.take_along_axis(values, order, axis=0)
+
+
+def _max(values, segments):
+    return np.maximum.reduceat(values, segments.starts, axis=0)
+
+
+def _min(values, segments):
+    return np.minimum.reduceat(values, segments.starts, axis=0)
+
+
+def _mean(values, segments):
+    return np.add.reduceat(values, segments.starts, axis=0) / segments.counts[:, None]
+
+
+def _nanmean(values, segments):
+    valid = ~np.isnan(values)
+    sums = np.add.reduceat(np.where(valid, values, 0.0), segments.starts, axis=0)
+    counts = np.add.reduceat(valid, segments.starts, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
+
+
+def _weighted_mean(values, segments):
+    weights = segments.weights[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.add.reduceat(values * weights, segments.starts, axis=0) / np.add.reduceat(weights, segments.starts, axis=0)
+
+
+def _trimmed_mean(values, segments, proportion):
+    ordered = segments.sort(values)
+    counts = segments.counts
+    trim = np.floor(proportion * counts).astype(np.int64)
+    rank = np.arange(len(ordered)) - np.repeat(segments.starts, counts)
+    keep = (rank >= np.repeat(trim, counts)) & (rank < np.repeat(counts - trim, counts))
+    result = np.add.reduceat(np.where(keep[:, None], ordered, 0.0), segments.starts, axis=0) / (counts - 2 * trim)[:, None]
+    # Trimming can drop a NaN child (NaN sorts last); it still makes the parent NaN.
+    result[segments.any_nan(values)] = np.nan
+    return result
+
+
+def _quantile(values, segments, q):
+    ordered = segments.sort(values)
+    position = q * (segments.counts - 1)
+    low = np.floor(position).astype(np.int64)
+    high = np.minimum(low + 1, segments.counts - 1)
+    below, above = ordered[segments.starts + low], ordered[segments.starts + high]
+    fraction = (position - low)[:, None]
+    with np.errstate(invalid='ignore'):
+        result = np.where(fraction > 0, below + (above - below) * fraction, below)
+    result[segments.any_nan(values)] = np.nan
+    return result
+
+
+def _check_proportion(params):
+    if not 0.0 <= params['proportion'] < 0.5:
+        raise ValueError(f"trimmed_mean proportion must be in [0, 0.5), got {params['proportion']}")
+
+
+def _check_q(params):
+    if not 0.0 <= params['q'] <= 1.0:
+        raise ValueError(f"quantile q must be in [0, 1], got {params['q']}")
+
+
+class AggregationOperator:
+    """A named kernel `kernel(values, segments, **params)` with its default parameters.
+
+    Args:
+        name (str): Registry name.
+        kernel (callable): Returns an (n_groups, n_columns) array for `values` grouped by `segments`.
+        defaults (dict, optional): Parameter names and default values; other parameters are rejected.
+        check (callable, optional): Validates the full parameter dict; raises ValueError.
+    """
+
+    def __init__(self, name, kernel, defaults=None, check=None):
+        self.name = name
+        self.kernel = kernel
+        self.defaults = dict(defaults or {})
+        self.check = check
+
+    def params(self, params):
+        """Returns the complete, validated parameter dict for a rule."""
+        unknown = sorted(set(params) - set(self.defaults))
+        if unknown:
+            raise ValueError(f"Unknown parameter(s) {unknown} for aggregation operator '{self.name}'.")
+        params = {**self.defaults, **params}
+        if self.check is not None:
+            self.check(params)
+        return params
+
+
+OPERATORS = {}
+# Bumped whenever an operator is replaced; compiled plans hold kernels, so rules drop plans built
+# under an older registry.
+_registry_version = 0
+
+
+def register_operator(operator):
+    """Adds (or replaces) an operator in the registry so rules can refer to it by name.
+
+    Replacing an operator invalidates every plan already compiled, so all rules pick up the new kernel.
+    """
+    global _registry_version
+    if not isinstance(operator, AggregationOperator):
+        raise TypeError("operator must be an AggregationOperator.")
+    if operator.name in OPERATORS:
+        _registry_version += 1
+    OPERATORS[operator.name] = operator
+    return operator
+
+
+for _operator in (
+    AggregationOperator('max', _max),
+    AggregationOperator('min', _min),
+    AggregationOperator('mean', _mean),
+    AggregationOperator('nanmean', _nanmean),
+    AggregationOperator('weighted_mean', _weighted_mean),
+    AggregationOperator('trimmed_mean', _trimmed_mean, {'proportion': 0.1}, _check_proportion),
+    AggregationOperator('quantile', _quantile, {'q': 0.5}, _check_q),
+):
+    register_operator(_operator)
+
+
+def _operator_spec(spec):
+    # A name or {'operator': name, **params} -> (name, sorted params) with the operator's defaults filled in.
+    if isinstance(spec, str):
+        name, params = spec, {}
+    elif isinstance(spec, dict) and 'operator' in spec:
+        name, params = spec['operator'], {key: value for key, value in spec.items() if key != 'operator'}
+    else:
+        raise TypeError(f"An aggregation operator must be a name or a dict with an 'operator' key, got {spec!r}")
+    if name not in OPERATORS:
+        raise ValueError(f"Unknown aggregation operator '{name}'. Registered: {sorted(OPERATORS)}")
+    return name, tuple(sorted(OPERATORS[name].params(params).items()))
+
+
+def _spec_dict(spec):
+    name, params = spec
+    return {'operator': name, **dict(params)} if params else name
+
+
+class AggregationRules:
+    """Which operator reduces the children of each parent, plus child weights and the item level.
+
+    Args:
+        levels (dict): Parent level -> operator.
+        nodes (dict, optional): Parent construct -> operator; overrides its level's rule.
+        weights (dict, optional): Child construct -> weight used by `weighted_mean` (default 1.0).
+        item_level (int): Level whose leaves pass their raw score up; other leaves contribute 0.0.
+    """
+
+    def __init__(self, levels, nodes=None, weights=None, item_level=DEFAULT_ITEM_LEVEL):
+        self.levels = {int(level): _operator_spec(spec) for level, spec in levels.items()}
+        self.nodes = {str(name): _operator_spec(spec) for name, spec in (nodes or {}).items()}
+        self.weights = {str(name): float(weight) for name, weight in (weights or {}).items()}
+        self.item_level = int(item_level)
+        self.key = hashlib.blake2b(json.dumps(self.to_dict(), sort_keys=True).encode('utf-8'), digest_size=16).hexdigest()
+        self._plans = {}
+        self._plans_version = _registry_version
+        self._weights = {}
+        self._plans_lock = threading.Lock()
+
+    def to_dict(self):
+        """The rules as plain JSON-compatible values (the `from_dict` and config-file format)."""
+        return {
+            'levels': {str(level): _spec_dict(spec) for level, spec in sorted(self.levels.items())},
+            'nodes': {name: _spec_dict(spec) for name, spec in sorted(self.nodes.items())},
+            'weights': dict(sorted(self.weights.items())),
+            'item_level': self.item_level,
+        }
+
+    @classmethod
+    def from_dict(cls, value):
+        """Builds rules from `to_dict`'s format; `levels` defaults to none, the rest to the defaults."""
+        return cls(value.get('levels', {}), value.get('nodes'), value.get('weights'), value.get('item_level', DEFAULT_ITEM_LEVEL))
+
+    def __reduce__(self):
+        # Pickled (e.g. for batch worker processes) as the plain config; compiled plans are rebuilt.
+        return AggregationRules.from_dict, (self.to_dict(),)
+
+    def __eq__(self, other):
+        return isinstance(other, AggregationRules) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def node_operators(self, topology):
+        """Operator name of every node of `topology` (None where no rule applies), as an object array."""
+        names = np.empty(len(topology), dtype=object)
+        for i, (name, level) in enumerate(zip(topology.names, topology.levels.tolist())):
+            spec = self.nodes.get(name) or self.levels.get(level)
+            names[i] = spec[0] if spec else None
+        return names
+
+    def node_weights(self, topology):
+        """Weight of every node of `topology` as a read-only array (cached per topology)."""
+        weights = self._weights.get(topology.key)
+        if weights is None:
+            weights = np.ones(len(topology))
+            for name, weight in self.weights.items():
+                node = topology.index.get(name)
+                if node is not None:
+                    weights[node] = weight
+            weights.setflags(write=False)
+            with self._plans_lock:
+                if len(self._weights) >= _PLAN_CACHE_MAX_ENTRIES:
+                    self._weights.pop(next(iter(self._weights)))
+                self._weights[topology.key] = weights
+        return weights
+
+    def plan(self, topology):
+        """The rules compiled against `topology`: one list per `topology.reduce_plan` step.
+
+        Each list holds `(kernel, params, groups, rows, segments)` per operator used in the step,
+        where `groups` are the step's parent positions it covers and `rows` the matching child rows
+        (both None when it covers the whole step). Plans are cached per topology until an operator
+        is replaced in the registry.
+        """
+        with self._plans_lock:
+            if self._plans_version != _registry_version:
+                self._plans.clear()
+                self._plans_version = _registry_version
+            plan = self._plans.get(topology.key)
+        if plan is not None:
+            return plan
+
+        specs = sorted(set(self.levels.values()) | set(self.nodes.values()))
+        spec_ids = {spec: k for k, spec in enumerate(specs)}
+        node_specs = np.full(len(topology), -1, dtype=np.int64)
+        for level, spec in self.levels.items():
+            node_specs[topology.levels == level] = spec_ids[spec]
+        for name, spec in self.nodes.items():
+            node = topology.index.get(name)
+            if node is not None:
+                node_specs[node] = spec_ids[spec]
+        weights = self.node_weights(topology)
+
+        plan = []
+        for children, starts, group_parents in topology.reduce_plan:
+            counts = np.diff(np.r_[starts, len(children)])
+            parent_specs = node_specs[group_parents]
+            step = []
+            for k in np.unique(parent_specs[parent_specs >= 0]).tolist():
+                name, params = specs[k]
+                selected = parent_specs == k
+                if selected.all():
+                    groups = rows = None
+                    segments = Segments(children, starts, weights[children])
+                else:
+                    groups = np.flatnonzero(selected)
+                    rows = np.flatnonzero(np.repeat(selected, counts))
+                    segment_starts = np.r_[0, np.cumsum(counts[selected])[:-1]].astype(np.int64)
+                    segments = Segments(children[rows], segment_starts, weights[children[rows]])
+                step.append((OPERATORS[name].kernel, dict(params), groups, rows, segments))
+            plan.append(step)
+
+        with self._plans_lock:
+            if len(self._plans) >= _PLAN_CACHE_MAX_ENTRIES:
+                self._plans.pop(next(iter(self._plans)))
+            plan = self._plans.setdefault(topology.key, plan)
+        return plan
+
+    def reduce_node(self, topology, node, values):
+        """Applies `node`'s operator to its children's contributions `values` (one row per child).
+
+        Returns:
+            np.ndarray: One value per column; NaN when no rule applies to the node.
+        """
+        spec = self.nodes.get(topology.names[node]) or self.levels.get(int(topology.levels[node]))
+        values = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+        if spec is None or not len(values):
+            return np.full(values.shape[1], np.nan)
+        name, params = spec
+        children = topology.children(node)
+        segments = Segments(children, np.zeros(1, dtype=np.int64), self.node_weights(topology)[children])
+        return OPERATORS[name].kernel(values, segments, **dict(params))[0]
@@ -0,0 +1,171 @@
+"""Indexed threshold, top-k and name-prefix queries over every node and scenario column.
+
+`CorixIndex` is built once per aggregated score matrix:
+
+- per level and column, the node ids sorted by score (NaN last) next to the sorted scores, so a
+  score range is two binary searches per (level, column) and a top-k is the tail of each run;
+- the case-folded `Construct` names in sorted order, so a name prefix is two binary searches.
+
+Query cost therefore grows with the number of levels x columns searched and the number of matches,
+not with the number of nodes. Results are long DataFrames with one row per (column, node).
+"""
+
+import bisect
+
+import numpy as np
+import pandas as pd
+
+from corix.engine import CorixScoreMatrix
+
+RESULT_COLUMNS = ['Column', 'Level', 'Construct', 'Score']
+
+
+class CorixIndex:
+    """Sorted score and name indexes over a `CorixScoreMatrix` (rows follow the topology's node ids)."""
+
+    def __init__(self, score_matrix):
+        if not isinstance(score_matrix, CorixScoreMatrix):
+            raise TypeError("score_matrix must be a CorixScoreMatrix.")
+        topology = score_matrix.topology
+        scores = score_matrix.scores
+        self.topology = topology
+        self.columns = list(score_matrix.columns)
+        self.column_index = dict(score_matrix.column_index)
+        self.levels = tuple(int(level) for level in np.unique(topology.levels))
+        self._scores = scores
+
+        # Column-major so each (level, column) run is one contiguous slice.
+        self._sorted_nodes = {}
+        self._sorted_scores = {}
+        self._valid_counts = {}
+        for level in self.levels:
+            nodes = np.flatnonzero(topology.levels == level)
+            level_scores = scores[nodes]
+            order = np.argsort(level_scores, axis=0, kind='stable')
+            self._sorted_nodes[level] = np.asfortranarray(nodes[order])
+            self._sorted_scores[level] = np.asfortranarray(np.take_along_axis(level_scores, order, axis=0))
+            self._valid_counts[level] = np.count_nonzero(~np.isnan(level_scores), axis=0)
+
+        folded = [name.casefold() for name in topology.names]
+        name_order = sorted(range(len(folded)), key=folded.__getitem__)
+        self._prefix_keys = [folded[i] for i in name_order]
+        self._prefix_nodes = np.array(name_order, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.topology)
+
+    def _column_ids(self, columns):
+        if columns is None:
+            return list(range(len(self.columns)))
+        if isinstance(columns, str):
+            columns = [columns]
+        for column in columns:
+            if column not in self.column_index:
+                raise KeyError(f"The column '{column}' not found in the index.")
+        return [self.column_index[column] for column in columns]
+
+    def _level_ids(self, level):
+        if level is None:
+            return self.levels
+        return (int(level),) if int(level) in self._sorted_nodes else ()
+
+    def _frame(self, column_ids, nodes, scores):
+        # Highest score first (NaN last); ties in node-id order, then column order.
+        nodes = np.asarray(nodes, dtype=np.int64)
+        order = np.lexsort((column_ids, nodes, -np.nan_to_num(scores, nan=-np.inf)))
+        column_ids, nodes = np.asarray(column_ids, dtype=np.int64)[order], nodes[order]
+        return pd.DataFrame({
+            'Column': [self.columns[j] for j in column_ids],
+            'Level': self.topology.levels[nodes],
+            'Construct': [self.topology.names[i] for i in nodes],
+            'Score': np.asarray(scores, dtype=np.float64)[order],
+        }, columns=RESULT_COLUMNS)
+
+    def prefix_nodes(self, prefix, level=None):
+        """Node ids whose `Construct` starts with `prefix` (case-insensitive), in name order."""
+        key = prefix.casefold()
+        lo = bisect.bisect_left(self._prefix_keys, key)
+        hi = bisect.bisect_left(self._prefix_keys, key[:-1] + chr(ord(key[-1]) + 1)) if key else len(self._prefix_keys)
+        nodes = self._prefix_nodes[lo:hi]
+        if level is not None:
+            nodes = nodes[self.topology.levels[nodes] == int(level)]
+        return nodes
+
+    def score_range(self, low=None, high=None, level=None, columns=None):
+        """Every (column, node) whose score lies in [`low`, `high`] (either bound optional).
+
+        Args:
+            low (float, optional): Smallest score to match.
+            high (float, optional): Largest score to match.
+            level (int, optional): Restrict to one CoRIx level.
+            columns (list, optional): Scenario columns to search. Defaults to all of them.
+
+        Returns:
+            pd.DataFrame: `Column`, `Level`, `Construct` and `Score`, highest score first.
+        """
+        column_ids, nodes, scores = [], [], []
+        for level_id in self._level_ids(level):
+            sorted_nodes, sorted_scores, valid = self._sorted_nodes[level_id], self._sorted_scores[level_id], self._valid_counts[level_id]
+            for j in self._column_ids(columns):
+                run = sorted_scores[:valid[j], j]
+                lo = 0 if low is None else np.searchsorted(run, low, side='left')
+                hi = len(run) if high is None else np.searchsorted(run, high, side='right')
+                if hi > lo:
+                    column_ids.append(np.full(hi - lo, j))
+                    nodes.append(sorted_nodes[lo:hi, j])
+                    scores.append(run[lo:hi])
+        if not nodes:
+            return self._frame([], [], [])
+        return self._frame(np.concatenate(column_ids), np.concatenate(nodes), np.concatenate(scores))
+
+    def above(self, threshold, level=None, columns=None):
+        """Every (column, node) scoring at least `threshold`; see `score_range`."""
+        return self.score_range(low=threshold, level=level, columns=columns)
+
+    def top_k(self, k, level=None, columns=None):
+        """The `k` highest (column, node) scores across the searched levels and columns.
+
+        Each (level, column) run contributes at most its last `k` entries, so only those candidates
+        are compared.
+        """
+        if k < 1:
+            raise ValueError(f"k must be at least 1, got {k}")
+        column_ids, nodes, scores = [], [], []
+        for level_id in self._level_ids(level):
+            sorted_nodes, sorted_scores, valid = self._sorted_nodes[level_id], self._sorted_scores[level_id], self._valid_counts[level_id]
+            for j in self._column_ids(columns):
+                lo = max(valid[j] - k, 0)
+                column_ids.append(np.full(valid[j] - lo, j))
+                nodes.append(sorted_nodes[lo:valid[j], j])
+                scores.append(sorted_scores[lo:valid[j], j])
+        if not nodes:
+            return self._frame([], [], [])
+        column_ids, nodes, scores = np.concatenate(column_ids), np.concatenate(nodes), np.concatenate(scores)
+        if len(scores) > k:
+            keep = np.argpartition(-scores, k - 1)[:k]
+            column_ids, nodes, scores = column_ids[keep], nodes[keep], scores[keep]
+        return self._frame(column_ids, nodes, scores)
+
+    def query(self, prefix=None, level=None, low=None, high=None, columns=None):
+        """Combines a name prefix with a score range: one row per matching (column, node).
+
+        With a prefix, its matches are found by name and their scores filtered; without one, the
+        score range is searched. Without any score bound, every searched column of every prefix
+        match is returned (NaN scores included).
+        """
+        if not prefix and (low is not None or high is not None):
+            return self.score_range(low=low, high=high, level=level, columns=columns)
+        nodes = self.prefix_nodes(prefix or '', level)
+        column_ids = np.asarray(self._column_ids(columns), dtype=np.int64)
+        scores = self._scores[nodes][:, column_ids].T.ravel()
+        column_ids, nodes = np.repeat(column_ids, len(nodes)), np.tile(nodes, len(column_ids))
+        if low is not None or high is not None:
+            with np.errstate(invalid='ignore'):
+                keep = (scores >= (-np.inf if low is None else low)) & (scores <= (np.inf if high is None else high))
+            column_ids, nodes, scores = column_ids[keep], nodes[keep], scores[keep]
+        return self._frame(column_ids, nodes, scores)
+
+
+def build_index(score_matrix):
+    """Builds the `CorixIndex` of an aggregated score matrix."""
+    return CorixIndex(score_matrix)
@@ -0,0 +1,505 @@
+"""Plotly figures for CoRIx trees: the standard SVG plot and a WebGL level-of-detail mode for large trees."""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from corix.diagnostics import mark_cache_miss
+from corix.engine import CorixTree
+from corix.layout import tree_layout
+
+# Plot units per layout unit (sibling distance) and per CoRIx level
+NODE_SPACING_X = 150
+LEVEL_SPACING_Y = 100
+
+# Trees with more visible nodes than this are drawn with the large-tree mode by default.
+LARGE_TREE_NODE_THRESHOLD = 500
+# Subtrees whose highest score is below this are collapsed into one aggregate node.
+DEFAULT_COLLAPSE_BELOW = 2.0
+# Labels drawn in large-tree mode, most important (shallowest, then riskiest) first.
+DEFAULT_MAX_LABELS = 150
+
+# Node styles. Values that change on selection have the same JSON width selected and unselected,
+# which is what lets cached figures be patched in place (see `TreeFigure`).
+NODE_COLOR = '#66b3ff'
+SELECTED_NODE_COLOR = '#ff0000'
+NODE_SIZE = 20
+SELECTED_NODE_SIZE = 25
+LARGE_NODE_SIZE = 10
+LARGE_COLLAPSED_NODE_SIZE = 13
+LARGE_SELECTED_NODE_SIZE = 18
+LARGE_NODE_LINE_COLOR = '#000000'
+LARGE_NODE_LINE_WIDTH = 0.5
+LARGE_SELECTED_NODE_LINE_WIDTH = 3.0
+
+# Confidence-interval shading: a translucent halo that grows by this many pixels per score point of width.
+CI_HALO_PX_PER_POINT = 4
+CI_HALO_COLOR = 'rgba(255, 140, 0, 0.3)'
+
+# Search matches: an open ring this many pixels wider than the node.
+HIGHLIGHT_RING_PX = 10
+HIGHLIGHT_COLOR = '#00a65a'
+
+FIGURE_CACHE_MAX_ENTRIES = 64
+_FIGURE_CACHE = OrderedDict()
+_FIGURE_CACHE_LOCK = threading.Lock()
+
+
+def _base_layout(title, fixed_range=True):
+    return dict(
+        title=dict(text=title), showlegend=False, hovermode='closest',
+        margin=dict(b=20, l=5, r=5, t=40),
+        xaxis=dict(showgrid=False, zeroline=False, showticklabels=False, fixedrange=fixed_range),
+        yaxis=dict(showgrid=False, zeroline=False, showticklabels=False, fixedrange=fixed_range),
+        plot_bgcolor='white', height=600, width=1000
+    )
+
+
+def _interval_hover_text(intervals, nodes):
+    if intervals is None:
+        return [''] * len(nodes)
+    return [f"<br>{intervals.confidence:.0%} CI: {intervals.low[i]:.2f}-{intervals.high[i]:.2f}" for i in nodes]
+
+
+def _interval_halo(trace_type, x, y, node_size, intervals, nodes):
+    """Trace shading each node with a halo whose size grows with its confidence-interval width."""
+    widths = np.nan_to_num(intervals.width[nodes], nan=0.0)
+    return dict(
+        type=trace_type, x=x, y=y, mode='markers', hoverinfo='skip', name='Confidence intervals',
+        marker=dict(size=node_size + widths * CI_HALO_PX_PER_POINT, color=CI_HALO_COLOR, line=dict(width=0))
+    )
+
+
+def _highlight_ring(trace_type, x, y, node_size, mask):
+    """Trace drawing an open ring around the nodes selected by `mask` (e.g. search matches)."""
+    return dict(
+        type=trace_type, x=x[mask], y=y[mask], mode='markers', hoverinfo='skip', name='Search matches',
+        marker=dict(size=node_size + HIGHLIGHT_RING_PX, symbol='circle-open', color=HIGHLIGHT_COLOR, line=dict(width=3))
+    )
+
+
+def _highlight_mask(topology, visible, highlighted_node_ids):
+    highlighted = np.zeros(len(topology), dtype=bool)
+    highlighted[[topology.index[name] for name in highlighted_node_ids if name in topology.index]] = True
+    return highlighted[visible]
+
+
+# The cached base figures are plain figure dicts: the values are known to be valid, and Plotly's
+# per-element validation of graph objects costs seconds at 10^5 nodes.
+
+def _standard_base_figure(tree_data, max_depth_to_display, intervals=None, highlighted_node_ids=()):
+    """Standard SVG plot with no node selected; returns (figure dict, node trace index, selection patches)."""
+    traces = []
+    topology = tree_data.topology
+    if topology.root < 0:
+        return dict(data=traces, layout={}), None, ()
+
+    # Positions come from the tidy-tree layout cached per topology; the depth slider only
+    # selects which of the cached coordinates are drawn.
+    layout = tree_layout(topology)
+    visible = layout.visible(max_depth_to_display)
+    names, scores = topology.names, tree_data.scores
+    node_x = layout.x[visible] * NODE_SPACING_X
+    node_y = -layout.y[visible] * LEVEL_SPACING_Y
+    node_custom_data = [names[i] for i in visible]
+    node_hover_text = [
+        f"ID: {names[i]}<br>Name: {names[i]}<br>Score: {scores[i]:.2f}<br>Level: {topology.levels[i]}{ci_text}"
+        for i, ci_text in zip(visible, _interval_hover_text(intervals, visible))
+    ]
+    node_display_text = [f"{names[i]}<br>Score: {scores[i]:.1f}" for i in visible]
+
+    edge_x, edge_y = layout.edges(visible)
+    if len(tree_data) > 1 and len(edge_x):
+        traces.append(dict(
+            type='scatter', x=edge_x * NODE_SPACING_X, y=-edge_y * LEVEL_SPACING_Y, mode='lines',
+            line=dict(width=1, color='#888'), hoverinfo='none', name='Edges'
+        ))
+
+    layout = _base_layout('Interactive CoRIx Tree Plot')
+    if not len(visible):
+        return dict(data=traces, layout=layout), None, ()
+    if intervals is not None:
+        traces.append(_interval_halo('scatter', node_x, node_y, NODE_SIZE, intervals, visible))
+    if len(highlighted_node_ids):
+        traces.append(_highlight_ring('scatter', node_x, node_y, NODE_SIZE, _highlight_mask(topology, visible, highlighted_node_ids)))
+    traces.append(dict(
+        type='scatter', x=node_x, y=node_y, mode='markers+text',
+        marker=dict(size=[NODE_SIZE] * len(visible), color=[NODE_COLOR] * len(visible), line=dict(width=1, color='black')),
+        text=node_display_text, textposition="bottom center",
+        hoverinfo='text', hovertext=node_hover_text, customdata=node_custom_data,
+        name='Nodes'
+    ))
+    patches = ((('marker', 'color'), SELECTED_NODE_COLOR), (('marker', 'size'), SELECTED_NODE_SIZE))
+    return dict(data=traces, layout=layout), len(traces) - 1, patches
+
+
+def create_interactive_corix_tree_plot(tree_data, max_depth_to_display=5, selected_node_id=None):
+    if not isinstance(tree_data, CorixTree):
+        raise TypeError("tree_data must be a CorixTree.")
+    return cached_tree_figure(tree_data, max_depth_to_display).figure(selected_node_id)
+
+
+def subtree_max_scores(tree_data):
+    """Highest score anywhere in each node's subtree (NaN-ignoring), computed bottom-up with segment maxima."""
+    topology = tree_data.topology
+    subtree_max = np.array(tree_data.scores, dtype=np.float64)
+    for children, starts, group_parents in topology.reduce_plan:
+        child_max = np.fmax.reduceat(subtree_max[children], starts)
+        subtree_max[group_parents] = np.fmax(subtree_max[group_parents], child_max)
+    return subtree_max
+
+
+def collapsed_nodes(tree_data, max_depth_to_display, collapse_below=DEFAULT_COLLAPSE_BELOW, expanded_node_ids=()):
+    """Works out which nodes are drawn in large-tree mode.
+
+    A node is collapsed when its whole subtree scores below `collapse_below` and the user has not
+    expanded it; its descendants are hidden and it is drawn as one aggregate node.
+
+    Returns:
+        tuple: (visible node ids, boolean mask over them marking collapsed aggregate nodes,
+        number of hidden descendants per visible node).
+    """
+    topology = tree_data.topology
+    layout = tree_layout(topology)
+    in_view = np.zeros(len(topology), dtype=bool)
+    in_view[layout.visible(max_depth_to_display)] = True
+
+    expanded = np.zeros(len(topology), dtype=bool)
+    expanded_ids = [topology.index[name] for name in expanded_node_ids if name in topology.index]
+    expanded[expanded_ids] = True
+    has_visible_children = np.zeros(len(topology), dtype=bool)
+    attached = topology.child_index
+    has_visible_children[topology.parents[attached[in_view[attached]]]] = True
+    collapsed = has_visible_children & ~expanded & (subtree_max_scores(tree_data) < collapse_below)
+    if topology.root >= 0:
+        collapsed[topology.root] = False
+
+    # Hidden flags flow top-down one depth at a time; descendant counts flow bottom-up.
+    hidden = np.zeros(len(topology), dtype=bool)
+    for depth in range(1, topology.max_depth + 1):
+        nodes = np.flatnonzero(topology.depths == depth)
+        parents = topology.parents[nodes]
+        hidden[nodes] = hidden[parents] | collapsed[parents]
+    descendants = in_view.astype(np.int64)
+    for children, starts, group_parents in topology.reduce_plan:
+        descendants[group_parents] += np.add.reduceat(descendants[children], starts)
+    descendants -= in_view
+
+    visible = np.flatnonzero(in_view & ~hidden)
+    return visible, collapsed[visible], descendants[visible]
+
+
+def _large_base_figure(tree_data, max_depth_to_display, expanded_node_ids, collapse_below, max_labels, intervals=None,
+                       highlighted_node_ids=()):
+    """WebGL plot with no node selected; returns (figure dict, node trace index, selection patches)."""
+    traces = []
+    topology = tree_data.topology
+    if topology.root < 0:
+        return dict(data=traces, layout={}), None, ()
+
+    layout = tree_layout(topology)
+    visible, is_collapsed, hidden_counts = collapsed_nodes(tree_data, max_depth_to_display, collapse_below, expanded_node_ids)
+    names, scores, levels = topology.names, tree_data.scores[visible], topology.levels[visible]
+    node_ids = [names[i] for i in visible]
+    x = layout.x[visible] * NODE_SPACING_X
+    y = -layout.y[visible] * LEVEL_SPACING_Y
+
+    edge_x, edge_y = layout.edges(visible)
+    if len(edge_x):
+        traces.append(dict(
+            type='scattergl', x=edge_x * NODE_SPACING_X, y=-edge_y * LEVEL_SPACING_Y, mode='lines',
+            line=dict(width=1, color='#bbb'), hoverinfo='none', name='Edges'
+        ))
+
+    hover_text = [
+        f"ID: {node_id}<br>Score: {score:.2f}<br>Level: {level}{ci_text}" + (f"<br>{count} hidden nodes (click to expand)" if collapsed else "")
+        for node_id, score, level, ci_text, collapsed, count in zip(
+            node_ids, scores, levels, _interval_hover_text(intervals, visible), is_collapsed, hidden_counts
+        )
+    ]
+    if intervals is not None:
+        traces.append(_interval_halo('scattergl', x, y, LARGE_NODE_SIZE, intervals, visible))
+    if len(highlighted_node_ids):
+        traces.append(_highlight_ring('scattergl', x, y, LARGE_NODE_SIZE, _highlight_mask(topology, visible, highlighted_node_ids)))
+    traces.append(dict(
+        type='scattergl', x=x, y=y, mode='markers', customdata=node_ids, hoverinfo='text', hovertext=hover_text,
+        marker=dict(
+            size=[LARGE_COLLAPSED_NODE_SIZE if collapsed else LARGE_NODE_SIZE for collapsed in is_collapsed],
+            symbol=np.where(is_collapsed, 'diamond', 'circle'),
+            color=np.nan_to_num(scores, nan=0.0), colorscale='YlOrRd', cmin=0, cmax=10,
+            line=dict(width=[LARGE_NODE_LINE_WIDTH] * len(visible), color=[LARGE_NODE_LINE_COLOR] * len(visible)),
+            showscale=True, colorbar=dict(title=dict(text='Score'), thickness=10)
+        ),
+        name='Nodes'
+    ))
+    node_trace = len(traces) - 1
+
+    labelled = np.lexsort((-np.nan_to_num(scores, nan=-1.0), levels))[:max_labels]
+    if len(labelled):
+        traces.append(dict(
+            type='scattergl', x=x[labelled], y=y[labelled], mode='text', textposition='bottom center',
+            text=[f"{node_ids[i]} ({scores[i]:.1f})" + (f" +{hidden_counts[i]}" if is_collapsed[i] else "") for i in labelled],
+            hoverinfo='skip', name='Labels'
+        ))
+
+    patches = (
+        (('marker', 'size'), LARGE_SELECTED_NODE_SIZE),
+        (('marker', 'line', 'width'), LARGE_SELECTED_NODE_LINE_WIDTH),
+        (('marker', 'line', 'color'), SELECTED_NODE_COLOR),
+    )
+    title = f'Interactive CoRIx Tree Plot (large-tree mode, {len(visible)} of {len(topology)} nodes)'
+    return dict(data=traces, layout=_base_layout(title, fixed_range=False)), node_trace, patches
+
+
+def create_large_corix_tree_plot(tree_data, max_depth_to_display=5, selected_node_id=None,
+                                 expanded_node_ids=(), collapse_below=DEFAULT_COLLAPSE_BELOW,
+                                 max_labels=DEFAULT_MAX_LABELS):
+    """WebGL rendering of big trees with level-of-detail.
+
+    Nodes and edges are `Scattergl` traces fed with NumPy arrays. Only the `max_labels` most important
+    nodes (shallowest first, then highest score) get a text label; every node keeps its hover text.
+    Low-risk subtrees are drawn as a single diamond aggregate node until expanded.
+
+    Args:
+        tree_data (CorixTree): Topology plus the selected scenario's scores.
+        max_depth_to_display (int): Deepest CoRIx level to draw.
+        selected_node_id (str, optional): Node to highlight.
+        expanded_node_ids (iterable): Collapsed nodes the user has expanded.
+        collapse_below (float): Subtrees whose highest score is below this are collapsed.
+        max_labels (int): Label budget.
+
+    Returns:
+        go.Figure: Figure whose node trace carries node ids in `customdata`.
+    """
+    if not isinstance(tree_data, CorixTree):
+        raise TypeError("tree_data must be a CorixTree.")
+    cached = cached_tree_figure(
+        tree_data, max_depth_to_display, large_tree_mode=True, expanded_node_ids=expanded_node_ids,
+        collapse_below=collapse_below, max_labels=max_labels
+    )
+    return cached.figure(selected_node_id)
+
+
+def create_diff_corix_tree_plot(comparison, column, max_depth_to_display=5, max_labels=DEFAULT_MAX_LABELS):
+    """Tree colored by one scenario's score delta against the comparison baseline.
+
+    Red nodes score higher (riskier) than the baseline, blue nodes lower. Only the `max_labels`
+    nodes with the largest absolute delta get a text label; big trees are drawn with WebGL.
+
+    Args:
+        comparison (ScenarioComparison): Bulk comparison the deltas are read from.
+        column (str): Compared scenario column.
+        max_depth_to_display (int): Deepest CoRIx level to draw.
+        max_labels (int): Label budget.
+
+    Returns:
+        go.Figure: Diff-colored node-link diagram.
+    """
+    if column not in comparison.column_index:
+        raise KeyError(f"The column '{column}' is not one of the compared columns.")
+    fig = go.Figure()
+    topology = comparison.topology
+    if topology.root < 0:
+        return fig
+
+    layout = tree_layout(topology)
+    visible = layout.visible(max_depth_to_display)
+    j, base = comparison.column_index[column], comparison.column_index[comparison.baseline]
+    scores, base_scores, deltas = comparison.scores[visible, j], comparison.scores[visible, base], comparison.deltas[visible, j]
+    names = [topology.names[i] for i in visible]
+    x = layout.x[visible] * NODE_SPACING_X
+    y = -layout.y[visible] * LEVEL_SPACING_Y
+    scatter = go.Scattergl if len(visible) > LARGE_TREE_NODE_THRESHOLD else go.Scatter
+
+    edge_x, edge_y = layout.edges(visible)
+    if len(edge_x):
+        fig.add_trace(scatter(
+            x=edge_x * NODE_SPACING_X, y=-edge_y * LEVEL_SPACING_Y, mode='lines',
+            line=dict(width=1, color='#bbb'), hoverinfo='none', name='Edges'
+        ))
+
+    limit = max(float(np.nanmax(np.abs(comparison.deltas[:, j]), initial=0.0)), 1e-9)
+    hover_text = [
+        f"ID: {name}<br>{column}: {score:.2f}<br>{comparison.baseline}: {base_score:.2f}<br>Delta: {delta:+.2f}"
+        for name, score, base_score, delta in zip(names, scores, base_scores, deltas)
+    ]
+    fig.add_trace(scatter(
+        x=x, y=y, mode='markers', customdata=names, hoverinfo='text', hovertext=hover_text,
+        marker=dict(
+            size=LARGE_COLLAPSED_NODE_SIZE, color=np.nan_to_num(deltas, nan=0.0), colorscale='RdBu_r',
+            cmin=-limit, cmax=limit, line=dict(width=0.5, color=LARGE_NODE_LINE_COLOR),
+            showscale=True, colorbar=dict(title='Delta', thickness=10)
+        ),
+        name='Nodes'
+    ))
+
+    labelled = np.argsort(-np.nan_to_num(np.abs(deltas), nan=-1.0), kind='stable')[:max_labels]
+    if len(labelled):
+        fig.add_trace(scatter(
+            x=x[labelled], y=y[labelled], mode='text', textposition='bottom center',
+            text=[f"{names[i]} ({deltas[i]:+.1f})" for i in labelled], hoverinfo='skip', name='Labels'
+        ))
+    return fig.update_layout(_base_layout(f'{column} vs {comparison.baseline}', fixed_range=len(visible) <= LARGE_TREE_NODE_THRESHOLD))
+
+
+class TreeFigure:
+    """A built tree figure, serialized once, whose selection highlight is patched into the JSON.
+
+    Every per-node style array that changes on selection (`selection_patches`) is kept as a JSON
+    array of fixed-width tokens, so highlighting node i means splicing one token at a known offset
+    instead of rebuilding or re-serializing the figure. Instances are shared across sessions and
+    never mutated after construction.
+    """
+
+    def __init__(self, figure, node_trace=None, selection_patches=()):
+        self.traces = tuple(figure['data'])
+        self.node_trace = node_trace
+        self.node_positions = {}
+        fig_dict = dict(figure, data=list(self.traces))
+        self._arrays = []
+        if node_trace is not None:
+            self.node_positions = {node_id: i for i, node_id in enumerate(self.traces[node_trace]['customdata'])}
+            trace = fig_dict['data'][node_trace] = dict(self.traces[node_trace])
+            for k, (path, selected_value) in enumerate(selection_patches):
+                # Copy the containers on the path so the placeholder never leaks into `self.traces`.
+                container = trace
+                for key in path[:-1]:
+                    container[key] = dict(container[key])
+                    container = container[key]
+                tokens = [json.dumps(value.item() if hasattr(value, 'item') else value) for value in container[path[-1]]]
+                selected_token = json.dumps(selected_value)
+                if any(len(token) != len(selected_token) for token in tokens):
+                    raise ValueError(f"Selection patch {'.'.join(path)} needs fixed-width values.")
+                container[path[-1]] = f"__corix_patch_{k}__"
+                self._arrays.append(('[' + ','.join(tokens) + ']', selected_token))
+
+        text = pio.to_json(fig_dict, validate=False)
+        # Split the serialized figure around the placeholders, in the order they appear in the JSON.
+        markers = sorted((text.index(f'"__corix_patch_{k}__"'), k) for k in range(len(self._arrays)))
+        self._arrays = [self._arrays[k] for _, k in markers]
+        self._parts = []
+        start = 0
+        for position, k in markers:
+            self._parts.append(text[start:position])
+            start = position + len(f'"__corix_patch_{k}__"')
+        self._parts.append(text[start:])
+        self.nbytes = sum(len(part) for part in self._parts) + sum(len(array) for array, _ in self._arrays)
+
+    def to_json(self, selected_node_id=None):
+        """Figure JSON with `selected_node_id` highlighted; cost is independent of the node count
+        apart from concatenating the cached strings."""
+        position = self.node_positions.get(selected_node_id)
+        pieces = [self._parts[0]]
+        for (array, selected_token), part in zip(self._arrays, self._parts[1:]):
+            if position is None:
+                pieces.append(array)
+            else:
+                offset = 1 + position * (len(selected_token) + 1)
+                pieces.extend((array[:offset], selected_token, array[offset + len(selected_token):]))
+            pieces.append(part)
+        return ''.join(pieces)
+
+    def with_selection(self, selected_node_id):
+        """Lightweight figure-like view for `plotly_events` (it only calls `to_json`)."""
+        return SelectedTreeFigure(self, selected_node_id)
+
+    def customdata(self, curve):
+        """Returns the `customdata` of trace `curve` (None if it has none)."""
+        return self.traces[curve].get('customdata') if 0 <= curve < len(self.traces) else None
+
+    def figure(self, selected_node_id=None):
+        """Returns a standalone `go.Figure` copy with the selection applied."""
+        return pio.from_json(self.to_json(selected_node_id), skip_invalid=True)
+
+
+class SelectedTreeFigure:
+    """A cached `TreeFigure` plus the node to highlight."""
+
+    def __init__(self, tree_figure, selected_node_id):
+        self.tree_figure = tree_figure
+        self.selected_node_id = selected_node_id
+        self._json = None
+
+    def to_json(self):
+        if self._json is None:
+            self._json = self.tree_figure.to_json(self.selected_node_id)
+        return self._json
+
+    def customdata(self, curve):
+        return self.tree_figure.customdata(curve)
+
+
+def _scores_digest(scores):
+    return hashlib.blake2b(np.ascontiguousarray(scores, dtype=np.float64).tobytes(), digest_size=16).hexdigest()
+
+
+def cached_tree_figure(tree_data, max_depth_to_display=5, large_tree_mode=False, expanded_node_ids=(),
+                       collapse_below=DEFAULT_COLLAPSE_BELOW, max_labels=DEFAULT_MAX_LABELS, intervals=None,
+                       highlighted_node_ids=()):
+    """Returns the process-wide cached base figure for a tree, building it on a miss.
+
+    The key is (scenario column, depth, topology hash, score digest) plus the large-tree options and
+    the confidence intervals, so what-if overrides get their own entry while node clicks reuse the
+    same one. `intervals` (BootstrapIntervals, optional) adds CI hover text and halo shading, and
+    `highlighted_node_ids` (e.g. search matches) are ringed.
+
+    Returns:
+        TreeFigure: Shared base figure; use `with_selection` to highlight a node.
+    """
+    if not isinstance(tree_data, CorixTree):
+        raise TypeError("tree_data must be a CorixTree.")
+    key = (tree_data.column, int(max_depth_to_display), tree_data.topology.key, _scores_digest(tree_data.scores), bool(large_tree_mode))
+    if large_tree_mode:
+        expanded = tuple(sorted(name for name in expanded_node_ids if name in tree_data.topology.index))
+        key += (expanded, float(collapse_below), int(max_labels))
+    if intervals is not None:
+        key += (intervals.confidence, _scores_digest(np.concatenate([intervals.low, intervals.high])))
+    if len(highlighted_node_ids):
+        highlighted_node_ids = sorted({name for name in highlighted_node_ids if name in tree_data.topology.index})
+        key += (hashlib.blake2b('\x1f'.join(highlighted_node_ids).encode('utf-8'), digest_size=16).hexdigest(),)
+
+    with _FIGURE_CACHE_LOCK:
+        tree_figure = _FIGURE_CACHE.get(key)
+        if tree_figure is not None:
+            _FIGURE_CACHE.move_to_end(key)
+            return tree_figure
+
+    mark_cache_miss()
+    if large_tree_mode:
+        built = _large_base_figure(tree_data, max_depth_to_display, expanded_node_ids, collapse_below, max_labels, intervals,
+                                   highlighted_node_ids)
+    else:
+        built = _standard_base_figure(tree_data, max_depth_to_display, intervals, highlighted_node_ids)
+    tree_figure = TreeFigure(*built)
+
+    with _FIGURE_CACHE_LOCK:
+        _FIGURE_CACHE[key] = tree_figure
+        while len(_FIGURE_CACHE) > FIGURE_CACHE_MAX_ENTRIES:
+            _FIGURE_CACHE.popitem(last=False)
+    return tree_figure
+
+
+def node_id_from_click(fig, point):
+    """Maps a `plotly_events` click back to a node id.
+
+    The events component reports `curveNumber`/`pointIndex` (and `customdata` only on some versions),
+    so the id is read from the clicked trace's `customdata`. `fig` is a `go.Figure` or a cached
+    `TreeFigure`/`SelectedTreeFigure`.
+    """
+    if point.get('customdata') is not None:
+        return point['customdata']
+    curve, index = point.get('curveNumber'), point.get('pointIndex', point.get('pointNumber'))
+    if curve is None or index is None:
+        return None
+    if isinstance(fig, (TreeFigure, SelectedTreeFigure)):
+        custom_data = fig.customdata(curve)
+    else:
+        custom_data = fig.data[curve].customdata if curve < len(fig.data) else None
+    if custom_data is None or index >= len(custom_data):
+        return None
+    return custom_data[index]
@@ -0,0 +1,429 @@
+"""Append-only history of evaluation runs with content-addressed, incrementally aggregated columns.
+
+A run store is a directory next to the source CSV (``corix_scores.csv`` -> ``corix_scores.runs/``):
+
+- ``runs.jsonl``: one JSON line per run, appended and never rewritten. Each line has the run id,
+  label, creation time, structure and hierarchy hashes, the content hash of every scenario column,
+  the columns that had to be aggregated for it and the blob with its per-construct hashes.
+- ``structures/<hash>.json``: `Construct` names and levels in node-id order.
+- ``hierarchies/<hash>.json``: parent map, root construct and (when not the defaults) aggregation rules.
+- ``raw/<column hash>.npy``: a column's scores as read, in node-id order.
+- ``aggregated/<column hash>-<hierarchy hash>.npy``: the same column aggregated.
+- ``constructs/<hash>.npy``: the per-construct hashes of a run (16 bytes per construct).
+
+Blobs are content-addressed and written once, so a column whose hash did not change since an
+earlier run is neither stored nor aggregated again. Historical trees and run-to-run trends are read
+from the (memory-mapped) blobs without recomputing anything.
+
+The store assumes a single writer; readers may run concurrently.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from corix.engine import DEFAULT_RULES, PARENT_MAP, REQUIRED_COLUMNS, ROOT_CONSTRUCT, CorixTree, aggregate_scores, score_columns, topology_from_frame
+from corix.operators import AggregationRules
+from corix.topology import compile_topology
+
+RUNS_SUFFIX = '.runs'
+MANIFEST = 'runs.jsonl'
+# Changed columns are aggregated this many at a time, so recording a wide table never holds more
+# than one chunk of raw and aggregated scores in memory.
+AGGREGATE_CHUNK_COLUMNS = 64
+READ_CACHE_MAX_ENTRIES = 256
+
+
+def default_runs_path(csv_path):
+    """Returns the run store directory used for a CSV file (`scores.csv` -> `scores.runs`)."""
+    root, _ = os.path.splitext(os.fspath(csv_path))
+    return root + RUNS_SUFFIX
+
+
+def _digest(*parts):
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+def structure_hash(names, levels):
+    """Hash of the `Construct` names and levels in node-id order."""
+    return _digest('\x1f'.join(names), np.ascontiguousarray(levels, dtype=np.int64).tobytes())
+
+
+def hierarchy_hash(parent_map, root_construct, rules=None):
+    """Hash of a parent map, its root construct and its aggregation rules.
+
+    The default rules are left out, so stores recorded before rules were configurable keep their hashes.
+    """
+    if rules is None or rules == DEFAULT_RULES:
+        return _digest(json.dumps(sorted(parent_map.items())), root_construct)
+    return _digest(json.dumps(sorted(parent_map.items())), root_construct, rules.key)
+
+
+def column_hash(structure, values):
+    """Content hash of one scenario column (its raw scores in node-id order) under a structure."""
+    return _digest(structure, np.ascontiguousarray(values, dtype=np.float64).tobytes())
+
+
+_HASH_MULTIPLIERS = np.array([[0x9E3779B97F4A7C15], [0xC2B2AE3D27D4EB4F]], dtype=np.uint64)
+
+
+def _fold(state, word_columns, skip_zero=False):
+    # Multiply-xorshift fold of each word column (a row of `word_columns`) into both hash lanes.
+    for words in word_columns:
+        mixed = (state ^ words) * _HASH_MULTIPLIERS
+        mixed ^= mixed >> np.uint64(29)
+        state = np.where(words != 0, mixed, state) if skip_zero else mixed
+    return state
+
+
+def construct_hashes(names, levels, columns, raw_scores):
+    """Per-construct content hashes over the construct's name, level and (column, raw score) pairs.
+
+    `raw_scores` is a (len(names), len(columns)) matrix, or a callable returning column j's scores
+    so the columns can be read one at a time.
+
+    Rows are hashed column-wise with NumPy (two independent 64-bit multiply-xorshift lanes seeded
+    from the column names), so the cost is a few array operations per name character and score
+    column rather than one hash call per construct. Columns are taken in name order, so the hashes
+    do not depend on the column order of the table. These are change-detection hashes, not
+    cryptographic ones.
+
+    Returns:
+        np.ndarray: uint8 array of shape (len(names), 16), one hash per construct.
+    """
+    n = len(names)
+    order = np.argsort(np.array(columns, dtype=object), kind='stable')
+    seed = hashlib.blake2b('\x1f'.join(columns[j] for j in order).encode('utf-8'), digest_size=16).digest()
+    # Name code points padded with zeros to the longest name; padding is skipped, so a name's words
+    # do not depend on the other names in the table.
+    name_words = np.array(names, dtype=str).view(np.uint32).reshape(n, -1).T.astype(np.uint64) if n else ()
+    level_words = np.asarray(levels, dtype=np.int64).reshape(1, n).view(np.uint64)
+    column_values = raw_scores if callable(raw_scores) else lambda j: np.asarray(raw_scores, dtype=np.float64)[:, j]
+    score_words = (np.ascontiguousarray(column_values(j), dtype=np.float64).view(np.uint64) for j in order)
+
+    state = np.frombuffer(seed, dtype='<u8').astype(np.uint64).reshape(2, 1).repeat(n, axis=1)
+    state = _fold(state, name_words, skip_zero=True)
+    state = _fold(state, level_words)
+    state = _fold(state, score_words)
+    return np.ascontiguousarray(state.T).view(np.uint8).reshape(n, 16)
+
+
+class RunStore:
+    """Append-only store of evaluation runs; see the module docstring for the layout."""
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        for directory in ('structures', 'hierarchies', 'raw', 'aggregated', 'constructs'):
+            os.makedirs(os.path.join(self.path, directory), exist_ok=True)
+        self._runs = []
+        self._manifest_size = -1
+        self._structures = {}
+        self._hierarchies = {}
+        self._topologies = {}
+        self._trends = {}
+        self._changes = {}
+
+    def _blob(self, *parts):
+        return os.path.join(self.path, *parts)
+
+    def _write_once(self, path, write):
+        # Content-addressed: an existing blob already has the right contents.
+        if os.path.exists(path):
+            return False
+        tmp = f"{path}.{os.getpid()}.tmp"
+        write(tmp)
+        os.replace(tmp, path)
+        return True
+
+    def _write_json(self, path, value):
+        def write(tmp):
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(value, f)
+        return self._write_once(path, write)
+
+    def _write_array(self, path, array):
+        def write(tmp):
+            with open(tmp, 'wb') as f:
+                np.save(f, array)
+        return self._write_once(path, write)
+
+    def _reload(self):
+        manifest = self._blob(MANIFEST)
+        size = os.path.getsize(manifest) if os.path.exists(manifest) else 0
+        if size != self._manifest_size:
+            self._runs = []
+            if size:
+                with open(manifest, encoding='utf-8') as f:
+                    self._runs = [json.loads(line) for line in f if line.strip()]
+            self._manifest_size = size
+        return self._runs
+
+    def __len__(self):
+        return len(self._reload())
+
+    def run(self, run_id=None):
+        """The manifest entry of a run (the latest one by default)."""
+        runs = self._reload()
+        if not runs:
+            raise KeyError("The run store has no runs yet.")
+        if run_id is None:
+            return runs[-1]
+        if not 1 <= int(run_id) <= len(runs):
+            raise KeyError(f"Run {run_id} not found in the run store.")
+        return runs[int(run_id) - 1]
+
+    def runs(self):
+        """One row per run: `Run`, `Label`, `Created`, `Columns` and `Aggregated` (columns it had to aggregate)."""
+        runs = self._reload()
+        return pd.DataFrame({
+            'Run': [run['run'] for run in runs],
+            'Label': [run['label'] for run in runs],
+            'Created': [run['created'] for run in runs],
+            'Columns': [len(run['columns']) for run in runs],
+            'Aggregated': [len(run['aggregated']) for run in runs],
+        })
+
+    def add_run(self, dataframe, label=None, parent_map=None, root_construct=ROOT_CONSTRUCT, skip_unchanged=True, rules=None):
+        """Appends a run for a CoRIx table, aggregating only the columns with new content hashes.
+
+        Args:
+            dataframe (pd.DataFrame): Table with `Level`, `Construct` and one column per application/scenario.
+            label (str, optional): Free-form run label.
+            parent_map (dict, optional): Child construct -> parent construct. Defaults to `PARENT_MAP`.
+            root_construct (str): Name of the root node.
+            skip_unchanged (bool): Return the latest run instead of appending one when the table,
+                its columns and the hierarchy are all unchanged.
+            rules (AggregationRules, optional): Operator per level/node. Defaults to `DEFAULT_RULES`.
+
+        Returns:
+            dict: The manifest entry of the new (or unchanged latest) run.
+        """
+        if not isinstance(dataframe, pd.DataFrame):
+            raise TypeError("Input 'dataframe' must be a pandas DataFrame.")
+        for col in REQUIRED_COLUMNS:
+            if col not in dataframe.columns:
+                raise KeyError(f"Required column '{col}' not found in the DataFrame.")
+        if parent_map is None:
+            parent_map = PARENT_MAP
+        columns = score_columns(dataframe)
+        topology, df_sorted = topology_from_frame(dataframe, parent_map, root_construct)
+        return self._add_run(
+            topology, columns, lambda j: df_sorted[columns[j]].to_numpy(dtype=np.float64),
+            label, parent_map, root_construct, skip_unchanged, rules,
+        )
+
+    def add_store_run(self, score_store, label=None, parent_map=None, root_construct=ROOT_CONSTRUCT, skip_unchanged=True, rules=None):
+        """Appends a run for a `ScoreStore`, like `add_run`, reading its memory-mapped columns one at a time.
+
+        Only the `Level`/`Construct` columns and one score column (plus one chunk of changed columns
+        while aggregating) are held in memory, so recording a wide store stays cheap.
+        """
+        if parent_map is None:
+            parent_map = PARENT_MAP
+        columns = list(score_store.columns)
+        # The store's row of every node, carried through the (Level, Construct) sort of the topology.
+        frame = score_store.frame().assign(_row=np.arange(len(score_store)))
+        topology, df_sorted = topology_from_frame(frame, parent_map, root_construct)
+        rows = df_sorted['_row'].to_numpy(dtype=np.int64)
+        return self._add_run(
+            topology, columns, lambda j: np.asarray(score_store.column(columns[j]), dtype=np.float64)[rows],
+            label, parent_map, root_construct, skip_unchanged, rules,
+        )
+
+    def _add_run(self, topology, columns, column_values, label, parent_map, root_construct, skip_unchanged, rules):
+        # `column_values(j)` returns column j's raw scores in node-id order.
+        structure = structure_hash(topology.names, topology.levels)
+        hierarchy = hierarchy_hash(parent_map, root_construct, rules)
+        hashes = {col: column_hash(structure, column_values(j)) for j, col in enumerate(columns)}
+        runs = self._reload()
+        if skip_unchanged and runs:
+            latest = runs[-1]
+            if latest['structure'] == structure and latest['hierarchy'] == hierarchy and latest['columns'] == hashes:
+                return latest
+
+        self._write_json(self._blob('structures', f'{structure}.json'), {'names': list(topology.names), 'levels': topology.levels.tolist()})
+        hierarchy_config = {'parent_map': parent_map, 'root_construct': root_construct}
+        if rules is not None and rules != DEFAULT_RULES:
+            hierarchy_config['rules'] = rules.to_dict()
+        self._write_json(self._blob('hierarchies', f'{hierarchy}.json'), hierarchy_config)
+        per_construct = construct_hashes(topology.names, topology.levels, columns, column_values)
+        constructs = _digest(per_construct.tobytes())
+        self._write_array(self._blob('constructs', f'{constructs}.npy'), per_construct)
+
+        # Only columns without an aggregated blob under this hierarchy are aggregated, a chunk of
+        # columns per pass.
+        changed = [j for j, col in enumerate(columns) if not os.path.exists(self._aggregated_path(hashes[col], hierarchy))]
+        for chunk_start in range(0, len(changed), AGGREGATE_CHUNK_COLUMNS):
+            chunk = changed[chunk_start:chunk_start + AGGREGATE_CHUNK_COLUMNS]
+            raw_scores = np.empty((len(topology), len(chunk)))
+            for k, j in enumerate(chunk):
+                raw_scores[:, k] = column_values(j)
+            scores = aggregate_scores(topology, raw_scores, rules)
+            for k, j in enumerate(chunk):
+                self._write_array(self._blob('raw', f'{hashes[columns[j]]}.npy'), np.ascontiguousarray(raw_scores[:, k]))
+                self._write_array(self._aggregated_path(hashes[columns[j]], hierarchy), np.ascontiguousarray(scores[:, k]))
+
+        entry = {
+            'run': len(runs) + 1, 'label': label or '', 'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'structure': structure, 'hierarchy': hierarchy, 'constructs': constructs,
+            'columns': hashes, 'aggregated': [columns[j] for j in changed],
+        }
+        with open(self._blob(MANIFEST), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._reload()
+        return entry
+
+    def _aggregated_path(self, column_digest, hierarchy):
+        return self._blob('aggregated', f'{column_digest}-{hierarchy}.npy')
+
+    def _structure(self, structure):
+        if structure not in self._structures:
+            with open(self._blob('structures', f'{structure}.json'), encoding='utf-8') as f:
+                value = json.load(f)
+            self._structures[structure] = (value['names'], np.asarray(value['levels'], dtype=np.int64),
+                                           {name: i for i, name in enumerate(value['names'])})
+        return self._structures[structure]
+
+    def _hierarchy(self, hierarchy):
+        if hierarchy not in self._hierarchies:
+            with open(self._blob('hierarchies', f'{hierarchy}.json'), encoding='utf-8') as f:
+                value = json.load(f)
+            value['rules'] = AggregationRules.from_dict(value['rules']) if 'rules' in value else DEFAULT_RULES
+            self._hierarchies[hierarchy] = value
+        return self._hierarchies[hierarchy]
+
+    def topology(self, run_id=None):
+        """The compiled topology of a run (shared between runs with the same structure and hierarchy)."""
+        run = self.run(run_id)
+        key = (run['structure'], run['hierarchy'])
+        if key not in self._topologies:
+            names, levels, _ = self._structure(run['structure'])
+            hierarchy = self._hierarchy(run['hierarchy'])
+            self._topologies[key] = compile_topology(names, levels, hierarchy['parent_map'], hierarchy['root_construct'])
+        return self._topologies[key]
+
+    def tree(self, run_id, column):
+        """The stored `CorixTree` of one column of a run; scores are read-only memory maps, nothing is recomputed."""
+        run = self.run(run_id)
+        if column not in run['columns']:
+            raise KeyError(f"The column '{column}' not found in run {run['run']}.")
+        digest = run['columns'][column]
+        scores = np.load(self._aggregated_path(digest, run['hierarchy']), mmap_mode='r')
+        raw_scores = np.load(self._blob('raw', f'{digest}.npy'), mmap_mode='r')
+        return CorixTree(self.topology(run['run']), scores, raw_scores, column, self._hierarchy(run['hierarchy'])['rules'])
+
+    def construct_hashes(self, run_id=None):
+        """Construct name -> 16-byte content hash (bytes) for a run."""
+        run = self.run(run_id)
+        names, _, _ = self._structure(run['structure'])
+        hashes = np.load(self._blob('constructs', f"{run['constructs']}.npy"))
+        return dict(zip(names, np.ascontiguousarray(hashes).view('V16').ravel().tolist()))
+
+    def _cached(self, cache, key, build):
+        # Runs are never rewritten, so a result keyed by its run ids (or the run count) stays valid.
+        value = cache.get(key)
+        if value is None:
+            value = build()
+            if len(cache) >= READ_CACHE_MAX_ENTRIES:
+                cache.pop(next(iter(cache)), None)
+            cache[key] = value
+        return value
+
+    def changes(self, run_a, run_b):
+        """What changed from `run_a` to `run_b`, read from the stored hashes (cached per pair of runs).
+
+        Returns:
+            dict: `changed_columns`, `added_columns`, `removed_columns`, `changed_constructs`,
+            `added_constructs` and `removed_constructs` (sorted name lists).
+        """
+        a, b = self.run(run_a), self.run(run_b)
+        return self._cached(self._changes, (a['run'], b['run']), lambda: self._compare(a, b))
+
+    def _compare(self, a, b):
+        hashes_a, hashes_b = self.construct_hashes(a['run']), self.construct_hashes(b['run'])
+        return {
+            'changed_columns': sorted(col for col in a['columns'].keys() & b['columns'].keys() if a['columns'][col] != b['columns'][col]),
+            'added_columns': sorted(b['columns'].keys() - a['columns'].keys()),
+            'removed_columns': sorted(a['columns'].keys() - b['columns'].keys()),
+            'changed_constructs': sorted(name for name in hashes_a.keys() & hashes_b.keys() if hashes_a[name] != hashes_b[name]),
+            'added_constructs': sorted(hashes_b.keys() - hashes_a.keys()),
+            'removed_constructs': sorted(hashes_a.keys() - hashes_b.keys()),
+        }
+
+    def trend(self, node_id, columns=None):
+        """Aggregated score of one node in every run, read from the stored blobs.
+
+        Results are cached per run count, node and columns, so a repeated call reads nothing; pass
+        only the columns you need, as every (run, column) pair costs one blob read otherwise.
+
+        Args:
+            node_id (str): Construct name.
+            columns (list, optional): Scenario columns. Defaults to every column of any run.
+
+        Returns:
+            pd.DataFrame: One row per run (index `Run`), one column per scenario; NaN where a run
+            lacks the node or the column.
+        """
+        runs = self._reload()
+        if columns is None:
+            columns = list(dict.fromkeys(col for run in runs for col in run['columns']))
+        key = (len(runs), node_id, tuple(columns))
+        return self._cached(self._trends, key, lambda: self._trend(runs, node_id, list(columns))).copy()
+
+    def _trend(self, runs, node_id, columns):
+        values = np.full((len(runs), len(columns)), np.nan)
+        for r, run in enumerate(runs):
+            _, _, index = self._structure(run['structure'])
+            row = index.get(node_id)
+            if row is None:
+                continue
+            for j, col in enumerate(columns):
+                digest = run['columns'].get(col)
+                if digest is not None:
+                    values[r, j] = np.load(self._aggregated_path(digest, run['hierarchy']), mmap_mode='r')[row]
+        return pd.DataFrame(values, columns=columns, index=pd.Index([run['run'] for run in runs], name='Run'))
+
+
+def open_run_store(path):
+    """Opens (creating it if needed) a run store directory."""
+    return RunStore(path)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from corix.hierarchy import default_hierarchy, load_hierarchy
+
+    parser = argparse.ArgumentParser(description="Record CoRIx evaluation runs and inspect their history.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    add_parser = subparsers.add_parser('add', help="Record a CSV as a new run.")
+    add_parser.add_argument('csv_path', help="CoRIx score CSV (Level, Construct, one column per application/scenario).")
+    add_parser.add_argument('--label', help="Run label.")
+    add_parser.add_argument('--store', help="Run store directory (default: next to the CSV).")
+    add_parser.add_argument('--hierarchy', help="Hierarchy config (.json or .toml) with the parent map and aggregation rules.")
+    for name, help_text in (('list', "List the recorded runs."), ('trend', "Print one node's score in every run.")):
+        command_parser = subparsers.add_parser(name, help=help_text)
+        command_parser.add_argument('store', help="Run store directory.")
+        if name == 'trend':
+            command_parser.add_argument('node_id', help="Construct name.")
+    args = parser.parse_args()
+
+    if args.command == 'add':
+        hierarchy = load_hierarchy(args.hierarchy) if args.hierarchy else default_hierarchy()
+        run_store = open_run_store(args.store or default_runs_path(args.csv_path))
+        entry = run_store.add_run(pd.read_csv(args.csv_path), label=args.label, **hierarchy.options())
+        print(f"Run {entry['run']}: {len(entry['columns'])} columns, {len(entry['aggregated'])} aggregated")
+    elif args.command == 'list':
+        print(open_run_store(args.store).runs().to_string(index=False))
+    else:
+        print(open_run_store(args.store).trend(args.node_id).to_string())
@@ -0,0 +1,428 @@
+"""Standalone HTTP/JSON service for aggregated CoRIx trees (standard library HTTP server, no Streamlit).
+
+    python -m corix.service corix_scores.csv --port 8765
+
+Endpoints (GET or HEAD, parameters in the query string):
+
+- ``/columns``: the application/scenario columns.
+- ``/tree?column=C[&depth=D]``: every node of column C connected to the root, down to depth D
+  (root = 0), as parallel arrays; `parent` holds indexes into those arrays (-1 at the top).
+- ``/subtree?column=C&node=N[&depth=D]``: the same for the subtree under construct N (D counted from N).
+- ``/node?column=C&node=N``: one node with its parent and children.
+- ``/batch?column=C1&column=C2[&node=N1&node=N2]``: scores of several columns, for every node or the given ones.
+
+Every response carries an ETag derived from the content hashes of the data it was built from and
+the canonical request. The ETag only needs those hashes, so a conditional GET (`If-None-Match`) is
+answered with 304 without building, or even looking up, a body. Bodies (plain and gzip) are kept in an in-memory LRU keyed by that ETag, so repeated
+requests are served without aggregating or serializing again. Trees come from the process-wide
+tree cache. The CSV is reloaded (and the ETags change) when it is modified on disk. Unknown
+endpoints, columns and constructs are answered with 404, bad parameters with 400 and any other
+failure with a logged 500.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from corix.store import load_score_store
+from corix.treecache import TreeCache, cached_store_tree
+
+LOGGER = logging.getLogger('corix.service')
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+RESPONSE_CACHE_MAX_ENTRIES = 4096
+RESPONSE_CACHE_MAX_BYTES = 128 * 2**20
+GZIP_MIN_BYTES = 1024
+RELOAD_CHECK_SECONDS = 1.0
+ENDPOINTS = ('/columns', '/tree', '/subtree', '/node', '/batch')
+
+
+def _json_floats(values):
+    # NaN scores become null; everything else stays a plain float.
+    values = np.asarray(values, dtype=np.float64)
+    result = values.tolist()
+    for i in np.flatnonzero(np.isnan(values)):
+        result[i] = None
+    return result
+
+
+def _param(params, name, required=True):
+    values = params.get(name)
+    if not values:
+        if required:
+            raise ValueError(f"Missing query parameter '{name}'.")
+        return None
+    return values[-1]
+
+
+def _depth_param(params):
+    depth = _param(params, 'depth', required=False)
+    if depth is None:
+        return None
+    try:
+        depth = int(depth)
+    except ValueError:
+        raise ValueError(f"depth must be an integer, got '{depth}'") from None
+    if depth < 0:
+        raise ValueError(f"depth must be non-negative, got {depth}")
+    return depth
+
+
+def _node_id(tree, construct):
+    node = tree.topology.index.get(construct)
+    if node is None:
+        raise KeyError(f"The construct '{construct}' not found in column '{tree.column}'.")
+    return node
+
+
+def subtree_nodes(topology, node, max_depth=None):
+    """Node ids of the subtree under `node` in breadth-first order, down to `max_depth` levels below it.
+
+    Each depth's children are gathered from the CSR child arrays in one vectorized step.
+    """
+    levels = [np.array([node], dtype=np.int64)]
+    while len(levels[-1]) and (max_depth is None or len(levels) <= max_depth):
+        frontier = levels[-1]
+        starts, counts = topology.child_offsets[frontier], np.diff(topology.child_offsets)[frontier]
+        if not counts.sum():
+            break
+        positions = np.repeat(starts - np.cumsum(np.r_[0, counts[:-1]]), counts) + np.arange(counts.sum())
+        levels.append(topology.child_index[positions])
+    return np.concatenate(levels)
+
+
+def _nodes_payload(tree, nodes):
+    topology = tree.topology
+    local = np.full(len(topology), -1, dtype=np.int64)
+    local[nodes] = np.arange(len(nodes))
+    parents = topology.parents[nodes]
+    return {
+        'construct': [topology.names[i] for i in nodes.tolist()],
+        'level': topology.levels[nodes].tolist(),
+        'parent': np.where(parents >= 0, local[np.maximum(parents, 0)], -1).tolist(),
+        'score': _json_floats(tree.scores[nodes]),
+        'raw_score': _json_floats(tree.raw_scores[nodes]),
+    }
+
+
+class CorixService:
+    """Builds the JSON bodies and ETags of the endpoints over one CoRIx scores CSV.
+
+    `hierarchy` (a `CorixHierarchy`) replaces the built-in parent map and aggregation rules.
+    """
+
+    def __init__(self, csv_path, cache=None, hierarchy=None):
+        self.csv_path = csv_path
+        self.store = load_score_store(csv_path)
+        self._tree_options = {}
+        self._hierarchy_digest = b''
+        if hierarchy is not None:
+            self._tree_options = hierarchy.options()
+            self._hierarchy_digest = hashlib.blake2b(json.dumps(hierarchy.to_dict(), sort_keys=True).encode('utf-8'), digest_size=16).digest()
+        self.cache = cache or TreeCache(max_entries=RESPONSE_CACHE_MAX_ENTRIES, max_bytes=RESPONSE_CACHE_MAX_BYTES)
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+
+    def current_store(self):
+        """The score store, reloaded when the CSV changed (checked at most every `RELOAD_CHECK_SECONDS`)."""
+        now = time.monotonic()
+        if now - self._checked_at >= RELOAD_CHECK_SECONDS:
+            with self._lock:
+                if now - self._checked_at >= RELOAD_CHECK_SECONDS:
+                    if not self.store.is_current(self.csv_path):
+                        self.store = load_score_store(self.csv_path)
+                    self._checked_at = now
+        return self.store
+
+    def tree(self, store, column):
+        """The shared `CorixTree` of one column under the service's hierarchy."""
+        return cached_store_tree(store, column, **self._tree_options)
+
+    def _columns(self, store, params, many=False):
+        columns = params.get('column', []) if many else [_param(params, 'column')]
+        if not columns:
+            raise ValueError("Missing query parameter 'column'.")
+        for column in columns:
+            if column not in store.column_index:
+                raise KeyError(f"The column '{column}' not found.")
+        return columns
+
+    def etag(self, store, path, params):
+        """Strong ETag of a request: content hashes of the data it reads plus the canonical request."""
+        if path not in ENDPOINTS:
+            raise KeyError(f"Unknown endpoint '{path}'.")
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(path.encode('utf-8'))
+        digest.update(self._hierarchy_digest)
+        if path == '/columns':
+            digest.update(store.content_digest().encode('ascii'))
+            digest.update('\x1f'.join(store.columns).encode('utf-8'))
+        else:
+            for column in self._columns(store, params, many=path == '/batch'):
+                digest.update(store.content_digest(column).encode('ascii'))
+        for name in sorted(params):
+            for value in params[name]:
+                digest.update(f"\x1e{name}\x1f{value}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def body(self, store, path, params):
+        """The response object of a request (not yet serialized)."""
+        if path == '/columns':
+            return {'columns': list(store.columns)}
+        if path == '/batch':
+            columns = self._columns(store, params, many=True)
+            trees = [self.tree(store, column) for column in columns]
+            constructs = params.get('node')
+            nodes = np.arange(len(trees[0].topology)) if not constructs else np.array([_node_id(trees[0], c) for c in constructs], dtype=np.int64)
+            topology = trees[0].topology
+            return {
+                'columns': columns,
+                'construct': [topology.names[i] for i in nodes.tolist()],
+                'level': topology.levels[nodes].tolist(),
+                'scores': {tree.column: _json_floats(tree.scores[nodes]) for tree in trees},
+            }
+
+        tree = self.tree(store, self._columns(store, params)[0])
+        topology = tree.topology
+        if path == '/tree':
+            if topology.root < 0:
+                return {'column': tree.column, 'root': None, 'nodes': _nodes_payload(tree, np.array([], dtype=np.int64))}
+            nodes = subtree_nodes(topology, topology.root, _depth_param(params))
+            return {'column': tree.column, 'root': topology.names[topology.root], 'nodes': _nodes_payload(tree, nodes)}
+        node = _node_id(tree, _param(params, 'node'))
+        if path == '/subtree':
+            nodes = subtree_nodes(topology, node, _depth_param(params))
+            return {'column': tree.column, 'root': topology.names[node], 'nodes': _nodes_payload(tree, nodes)}
+        children = topology.children(node)
+        parent = topology.parent(node)
+        return {
+            'column': tree.column,
+            'construct': topology.names[node],
+            'level': int(topology.levels[node]),
+            'score': _json_floats(tree.scores[[node]])[0],
+            'raw_score': _json_floats(tree.raw_scores[[node]])[0],
+            'parent': topology.names[parent] if parent >= 0 else None,
+            'children': {
+                'construct': [topology.names[i] for i in children.tolist()],
+                'level': topology.levels[children].tolist(),
+                'score': _json_floats(tree.scores[children]),
+            },
+        }
+
+    def request_etag(self, path, params):
+        """Returns `(store, etag)` for a request; only content hashes are read, no body is built."""
+        store = self.current_store()
+        return store, self.etag(store, path, params)
+
+    def response_body(self, store, path, params, etag):
+        """Returns `(plain_body, gzip_body)` of a request, from the response cache when possible.
+
+        `gzip_body` is None when the body is below `GZIP_MIN_BYTES`.
+        """
+        def build():
+            plain = json.dumps(self.body(store, path, params), separators=(',', ':'), allow_nan=False).encode('utf-8')
+            compressed = gzip.compress(plain, compresslevel=6, mtime=0) if len(plain) >= GZIP_MIN_BYTES else None
+            return (plain, compressed), len(plain) + len(compressed or b'')
+
+        return self.cache.get_or_build(etag, build)
+
+    def respond(self, path, params):
+        """Returns `(etag, plain_body, gzip_body)` for a request (see `request_etag` and `response_body`)."""
+        store, etag = self.request_etag(path, params)
+        return (etag, *self.response_body(store, path, params, etag))
+
+
+def _matching_tag(if_none_match, etag):
+    # Weak comparison: the gzip variant's tag is the plain tag plus '-gzip'. Returns the client's tag
+    # that matched (the plain tag for '*'), so a 304 repeats the variant the client has, or None.
+    if if_none_match is None:
+        return None
+    for tag in (tag.strip() for tag in if_none_match.split(',')):
+        if tag == '*':
+            return f'"{etag}"'
+        value = tag.removeprefix('W/').strip('"')
+        if value.removesuffix('-gzip') == etag:
+            return f'"{value}"'
+    return None
+
+
+class CorixRequestHandler(BaseHTTPRequestHandler):
+    """GET/HEAD handler; the server's `service` attribute is the `CorixService`."""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'CorixService/1'
+    # Headers and body are written separately; without this, keep-alive responses stall on delayed ACKs.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def _handle(self, send_body):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query, keep_blank_values=False)
+        path = url.path.rstrip('/') or '/'
+        service = self.server.service
+        try:
+            store, etag = service.request_etag(path, params)
+            matched_tag = _matching_tag(self.headers.get('If-None-Match'), etag)
+            if matched_tag is None:
+                plain, compressed = service.response_body(store, path, params, etag)
+        except KeyError as error:
+            return self._error(404, error.args[0] if error.args else str(error), send_body)
+        except ValueError as error:
+            return self._error(400, str(error), send_body)
+        except Exception:
+            LOGGER.exception("Failed to answer %s", self.path)
+            return self._error(500, "Internal server error.", send_body)
+
+        if matched_tag is not None:
+            self.send_response(304)
+            self._common_headers(matched_tag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        use_gzip = compressed is not None and 'gzip' in self.headers.get('Accept-Encoding', '')
+        tag = f'"{etag}-gzip"' if use_gzip else f'"{etag}"'
+        body = compressed if use_gzip else plain
+        self.send_response(200)
+        self._common_headers(tag)
+        self.send_header('Content-Type', 'application/json')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _common_headers(self, tag):
+        self.send_header('ETag', tag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+
+    def _error(self, status, message, send_body):
+        body = json.dumps({'error': message}, separators=(',', ':')).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        LOGGER.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_server(csv_path, host=DEFAULT_HOST, port=DEFAULT_PORT, hierarchy=None):
+    """Creates (without starting) a threaded HTTP server for a CoRIx scores CSV; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), CorixRequestHandler)
+    server.daemon_threads = True
+    server.service = CorixService(csv_path, hierarchy=hierarchy)
+    return server
+
+
+def load_test(host, port, paths, n_requests, concurrency=8, headers=None):
+    """Sends `n_requests` GETs (cycling through `paths`) over `concurrency` keep-alive connections.
+
+    Returns:
+        dict: `requests`, `seconds`, `requests_per_second`, `p50_ms`, `p95_ms`, `p99_ms`, `bytes`
+        and `statuses` (status code -> count).
+    """
+    import http.client
+
+    if n_requests < 1 or concurrency < 1:
+        raise ValueError(f"n_requests and concurrency must be at least 1, got {n_requests} and {concurrency}")
+    latencies = []
+    statuses = {}
+    received = [0]
+    lock = threading.Lock()
+
+    def worker(offset):
+        connection = http.client.HTTPConnection(host, port)
+        local_latencies, local_statuses, local_bytes = [], {}, 0
+        for i in range(offset, n_requests, concurrency):
+            start = time.perf_counter()
+            connection.request('GET', paths[i % len(paths)], headers=headers or {})
+            response = connection.getresponse()
+            local_bytes += len(response.read())
+            local_latencies.append(time.perf_counter() - start)
+            local_statuses[response.status] = local_statuses.get(response.status, 0) + 1
+        connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+            received[0] += local_bytes
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {
+        'requests': n_requests, 'seconds': seconds, 'requests_per_second': n_requests / seconds,
+        'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'bytes': received[0], 'statuses': statuses,
+    }
+
+
+def _format_load_test(name, result):
+    statuses = ', '.join(f"{status}: {count}" for status, count in sorted(result['statuses'].items()))
+    return (f"{name:<22} {result['requests_per_second']:>9.0f} req/s  p50 {result['p50_ms']:6.2f} ms  "
+            f"p95 {result['p95_ms']:6.2f} ms  p99 {result['p99_ms']:6.2f} ms  {result['bytes'] / result['requests']:>8.0f} B/req  ({statuses})")
+
+
+if __name__ == '__main__':
+    import argparse
+    from urllib.parse import urlencode
+
+    from corix.hierarchy import load_hierarchy
+
+    parser = argparse.ArgumentParser(description="Serve aggregated CoRIx trees as JSON over HTTP.")
+    parser.add_argument('csv_path', nargs='?', default='corix_scores.csv', help="CoRIx scores CSV (default: corix_scores.csv).")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"Interface to bind (default: {DEFAULT_HOST}).")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT}; 0 picks a free one).")
+    parser.add_argument('--load-test', type=int, metavar='N', help="Start the server on a free port, send N requests per scenario and exit.")
+    parser.add_argument('--concurrency', type=int, default=8, help="Concurrent connections for --load-test.")
+    parser.add_argument('--hierarchy', help="Hierarchy config (.json or .toml) with the parent map and aggregation rules.")
+    args = parser.parse_args()
+
+    hierarchy = load_hierarchy(args.hierarchy) if args.hierarchy else None
+    server = make_server(args.csv_path, args.host, 0 if args.load_test else args.port, hierarchy)
+    host, port = server.server_address[:2]
+    if not args.load_test:
+        print(f"Serving {args.csv_path} on http://{host}:{port} ({', '.join(ENDPOINTS)})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+    else:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        store = server.service.store
+        topology = server.service.tree(store, store.columns[0]).topology
+        inner = [name for i, name in enumerate(topology.names) if len(topology.children(i))] or list(topology.names)
+        paths = [f"/tree?{urlencode({'column': column})}" for column in store.columns]
+        paths += [f"/subtree?{urlencode({'column': column, 'node': node})}" for column in store.columns for node in inner[:8]]
+        paths += [f"/node?{urlencode({'column': column, 'node': node})}" for column in store.columns for node in topology.names[:16]]
+        paths.append('/batch?' + urlencode([('column', column) for column in store.columns]))
+
+        cold = load_test(host, port, paths, len(paths), concurrency=1)
+        print(_format_load_test('first requests', cold))
+        print(_format_load_test('repeat (cached)', load_test(host, port, paths, args.load_test, args.concurrency)))
+        print(_format_load_test('repeat, gzip', load_test(host, port, paths, args.load_test, args.concurrency, {'Accept-Encoding': 'gzip'})))
+        etag = server.service.request_etag('/tree', {'column': [store.columns[0]]})[1]
+        print(_format_load_test('conditional (304)', load_test(host, port, [paths[0]], args.load_test, args.concurrency, {'If-None-Match': f'"{etag}"'})))
+        server.shutdown()
+        server.server_close()
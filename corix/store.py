@@ -0,0 +1,227 @@
+"""Columnar, memory-mapped on-disk store for CoRIx score tables.
+
+A store is a directory next to the source CSV (``corix_scores.csv`` -> ``corix_scores.corix/``).
+Each conversion is written to its own ``v-*`` subdirectory, and ``CURRENT`` names the live one; it is
+swapped with ``os.replace``, so a reader never sees files from two different conversions. A version
+directory holds:
+
+- ``header.json``: format version, row count, score column names and the source file's size/mtime.
+- ``constructs.json``: the `Construct` column.
+- ``levels.npy``: the `Level` column (int64).
+- ``scores.npy``: float64 matrix of shape (n_columns, n_rows), so every scenario column is one
+  contiguous run on disk and can be memory-mapped without touching the others.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from corix.engine import REQUIRED_COLUMNS, score_columns
+
+STORE_SUFFIX = '.corix'
+STORE_FORMAT = 'corix-columnar'
+STORE_VERSION = 1
+CURRENT_FILE = 'CURRENT'
+
+
+def default_store_path(csv_path):
+    """Returns the store directory used for a CSV file (`scores.csv` -> `scores.corix`)."""
+    root, _ = os.path.splitext(os.fspath(csv_path))
+    return root + STORE_SUFFIX
+
+
+def _source_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {'source_size': stat.st_size, 'source_mtime_ns': stat.st_mtime_ns}
+
+
+def _resolve_version_path(store_path):
+    """Returns the live version directory of a store, or `store_path` itself for a flat (pre-versioned) store."""
+    try:
+        with open(os.path.join(store_path, CURRENT_FILE), encoding='utf-8') as f:
+            return os.path.join(store_path, f.read().strip())
+    except FileNotFoundError:
+        return store_path
+
+
+def _remove_stale_versions(store_path, keep):
+    # The version that was live until now is kept, so a reader that opened it just before the swap
+    # can still load its lazily-read files; anything older is removed.
+    for name in os.listdir(store_path):
+        if name.startswith('v-') and name not in keep:
+            shutil.rmtree(os.path.join(store_path, name), ignore_errors=True)
+
+
+def convert_csv_to_store(csv_path, store_path=None):
+    """Converts a `corix_scores.csv`-style table into a columnar store.
+
+    Args:
+        csv_path (str or os.PathLike): Source CSV with `Level`, `Construct` and score columns.
+        store_path (str or os.PathLike, optional): Target directory. Defaults to `default_store_path`.
+
+    Returns:
+        str: Path of the written store.
+    """
+    if not isinstance(csv_path, (str, os.PathLike)):
+        raise TypeError(f"csv_path must be a string or a path-like object, got {type(csv_path).__name__}")
+    store_path = os.fspath(store_path or default_store_path(csv_path))
+    dataframe = pd.read_csv(csv_path)
+    for col in REQUIRED_COLUMNS:
+        if col not in dataframe.columns:
+            raise KeyError(f"Required column '{col}' not found in the DataFrame.")
+    columns = score_columns(dataframe)
+
+    os.makedirs(store_path, exist_ok=True)
+    build_path = tempfile.mkdtemp(prefix='build-', dir=store_path)
+    try:
+        np.save(os.path.join(build_path, 'levels.npy'), dataframe['Level'].to_numpy(dtype=np.int64))
+        with open(os.path.join(build_path, 'constructs.json'), 'w', encoding='utf-8') as f:
+            json.dump(dataframe['Construct'].astype(str).tolist(), f)
+        scores = np.lib.format.open_memmap(
+            os.path.join(build_path, 'scores.npy'), mode='w+', dtype=np.float64, shape=(len(columns), len(dataframe))
+        )
+        for j, col in enumerate(columns):
+            scores[j] = pd.to_numeric(dataframe[col], errors='coerce').to_numpy(dtype=np.float64)
+        scores.flush()
+        del scores
+        header = {
+            'format': STORE_FORMAT, 'version': STORE_VERSION, 'n_rows': len(dataframe), 'columns': columns,
+            **_source_signature(csv_path),
+        }
+        with open(os.path.join(build_path, 'header.json'), 'w', encoding='utf-8') as f:
+            json.dump(header, f)
+
+        previous = os.path.basename(_resolve_version_path(store_path))
+        version = 'v-' + os.path.basename(build_path)[len('build-'):]
+        os.rename(build_path, os.path.join(store_path, version))
+    except BaseException:
+        shutil.rmtree(build_path, ignore_errors=True)
+        raise
+
+    # Readers resolve `CURRENT` once, so they see either the old or the new version, never a mix.
+    fd, pointer_path = tempfile.mkstemp(prefix='current-', dir=store_path)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(pointer_path, os.path.join(store_path, CURRENT_FILE))
+    _remove_stale_versions(store_path, keep={version, previous})
+    return store_path
+
+
+class ScoreStore:
+    """Read-only view of a columnar store. Only the header is read eagerly; the `Construct`
+    names, levels and score columns are loaded on first use, and columns are memory-mapped.
+
+    `path` may be a store directory or one of its version directories; `self.path` is always the
+    version directory, so every lazy read comes from the conversion the header belongs to.
+    """
+
+    def __init__(self, path):
+        self.path = _resolve_version_path(os.fspath(path))
+        with open(os.path.join(self.path, 'header.json'), encoding='utf-8') as f:
+            self.header = json.load(f)
+        if self.header.get('format') != STORE_FORMAT or self.header.get('version') != STORE_VERSION:
+            raise ValueError(f"'{self.path}' is not a version {STORE_VERSION} CoRIx store.")
+        self.columns = list(self.header['columns'])
+        self.column_index = {col: j for j, col in enumerate(self.columns)}
+        self.n_rows = int(self.header['n_rows'])
+        self._constructs = None
+        self._levels = None
+        self._scores = None
+        self._digests = {}
+
+    def __len__(self):
+        return self.n_rows
+
+    @property
+    def constructs(self):
+        if self._constructs is None:
+            with open(os.path.join(self.path, 'constructs.json'), encoding='utf-8') as f:
+                self._constructs = json.load(f)
+        return self._constructs
+
+    @property
+    def levels(self):
+        if self._levels is None:
+            self._levels = np.load(os.path.join(self.path, 'levels.npy'), mmap_mode='r')
+        return self._levels
+
+    def column(self, column):
+        """Returns one score column as a read-only memory-mapped array (no copy)."""
+        if column not in self.column_index:
+            raise KeyError(f"The column '{column}' not found in the score store.")
+        if self._scores is None:
+            self._scores = np.load(os.path.join(self.path, 'scores.npy'), mmap_mode='r')
+        return self._scores[self.column_index[column]]
+
+    def content_digest(self, column=None):
+        """Content hash of the `Level`/`Construct` columns plus, if given, one score column.
+
+        Digests are memoized: a version directory is never modified, and re-converting the CSV gives a
+        new one.
+        """
+        if column not in self._digests:
+            digest = hashlib.blake2b(digest_size=16)
+            if column is None:
+                digest.update('\x1f'.join(self.constructs).encode('utf-8'))
+                digest.update(np.ascontiguousarray(self.levels, dtype=np.int64).tobytes())
+            else:
+                digest.update(self.content_digest().encode('ascii'))
+                digest.update(np.ascontiguousarray(self.column(column), dtype=np.float64).tobytes())
+            self._digests[column] = digest.hexdigest()
+        return self._digests[column]
+
+    def frame(self, columns=()):
+        """Returns a DataFrame with `Level`, `Construct` and only the requested score columns."""
+        data = {'Level': self.levels, 'Construct': self.constructs}
+        for col in columns:
+            data[col] = self.column(col)
+        return pd.DataFrame(data)
+
+    def is_current(self, csv_path):
+        """True when the store was converted from the current contents of `csv_path`."""
+        signature = _source_signature(csv_path)
+        return all(self.header.get(key) == value for key, value in signature.items())
+
+
+def open_score_store(path):
+    """Opens an existing store directory."""
+    return ScoreStore(path)
+
+
+def load_score_store(csv_path, store_path=None):
+    """Opens the store for `csv_path`, (re)converting the CSV first if the store is missing or stale.
+
+    Args:
+        csv_path (str or os.PathLike): Source CSV.
+        store_path (str or os.PathLike, optional): Store directory. Defaults to `default_store_path`.
+
+    Returns:
+        ScoreStore: Lazily-loaded, memory-mapped store.
+    """
+    if not isinstance(csv_path, (str, os.PathLike)):
+        raise TypeError(f"filepath must be a string or a path-like object, got {type(csv_path).__name__}")
+    store_path = os.fspath(store_path or default_store_path(csv_path))
+    if os.path.exists(os.path.join(_resolve_version_path(store_path), 'header.json')):
+        try:
+            store = ScoreStore(store_path)
+        except ValueError:
+            store = None
+        if store is not None and (not os.path.exists(csv_path) or store.is_current(csv_path)):
+            return store
+    convert_csv_to_store(csv_path, store_path)
+    return ScoreStore(store_path)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert a CoRIx score CSV into a columnar, memory-mapped store.")
+    parser.add_argument('csv_path', help="Source CSV (Level, Construct, one column per application/scenario).")
+    parser.add_argument('store_path', nargs='?', help="Target store directory (default: next to the CSV).")
+    args = parser.parse_args()
+    print(convert_csv_to_store(args.csv_path, args.store_path))
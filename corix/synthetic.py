@@ -0,0 +1,90 @@
+"""Synthetic CoRIx hierarchies for benchmarks and load tests.
+
+Trees are complete: the root sits at Level 2 and every node at depth d has `fanout[d]` children, so
+the size is controlled exactly by the fan-out per level. Leaves get uniform 0-10 scores (a fraction
+`nan_fraction` of them missing); inner rows are NaN since they are aggregated anyway. The leaves sit at
+Level `len(fanout) + 2`, so trees of any depth are aggregated with `synthetic_rules(fanout)`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from corix.engine import ROOT_CONSTRUCT
+from corix.operators import AggregationRules
+
+DEFAULT_DEPTH = 4
+
+
+def tree_size(fanout):
+    """Number of nodes of a complete tree with the given per-level fan-out."""
+    size, width = 1, 1
+    for f in fanout:
+        width *= f
+        size += width
+    return size
+
+
+def fanout_for_size(n_nodes, depth=DEFAULT_DEPTH):
+    """Uniform fan-out for a tree of `depth` levels (root included) with about `n_nodes` nodes.
+
+    The last level's fan-out is adjusted so the size lands as close to `n_nodes` as possible.
+    """
+    if depth < 2:
+        raise ValueError(f"depth must be at least 2, got {depth}")
+    f = 1
+    while tree_size([f + 1] * (depth - 1)) <= n_nodes:
+        f += 1
+    fanout = [f] * (depth - 1)
+    inner = tree_size(fanout[:-1])
+    width = inner - tree_size(fanout[:-2]) if depth > 2 else 1
+    fanout[-1] = max(1, round((n_nodes - inner) / width))
+    return fanout
+
+
+def generate_corix_table(fanout, n_columns=3, nan_fraction=0.0, seed=None, root_construct=ROOT_CONSTRUCT):
+    """Builds a synthetic table in the `corix_scores.csv` layout plus its parent map.
+
+    Args:
+        fanout (list): Children per node at each depth; `len(fanout) + 1` levels starting at Level 2.
+        n_columns (int): Number of application/scenario columns.
+        nan_fraction (float): Fraction of leaf scores that are missing.
+        seed (int, optional): Random seed.
+        root_construct (str): Name of the root node.
+
+    Returns:
+        tuple: (pd.DataFrame with `Level`, `Construct` and the score columns, parent_map dict).
+    """
+    if not 0.0 <= nan_fraction <= 1.0:
+        raise ValueError(f"nan_fraction must be between 0 and 1, got {nan_fraction}")
+    rng = np.random.default_rng(seed)
+    names, levels = [root_construct], [2]
+    parent_map = {}
+    frontier = [root_construct]
+    for depth, f in enumerate(fanout, start=1):
+        level = 2 + depth
+        next_frontier = []
+        for p, parent in enumerate(frontier):
+            for c in range(f):
+                name = f"L{level} {p * f + c:07d}"
+                parent_map[name] = parent
+                next_frontier.append(name)
+        names.extend(next_frontier)
+        levels.extend([level] * len(next_frontier))
+        frontier = next_frontier
+
+    n, n_leaves = len(names), len(frontier)
+    scores = np.full((n, n_columns), np.nan)
+    leaf_scores = np.round(rng.uniform(0.0, 10.0, (n_leaves, n_columns)), 2)
+    leaf_scores[rng.random((n_leaves, n_columns)) < nan_fraction] = np.nan
+    scores[n - n_leaves:] = leaf_scores
+    table = pd.DataFrame(scores, columns=[f"Application {j} - Scenario {j}" for j in range(n_columns)])
+    table.insert(0, 'Construct', names)
+    table.insert(0, 'Level', levels)
+    return table, parent_map
+
+
+def synthetic_rules(fanout):
+    """CoRIx-style rules for a `generate_corix_table` tree: max at the root, mean at the inner levels
+    and the leaf level as the item level."""
+    leaf_level = 2 + len(fanout)
+    return AggregationRules({2: 'max', **{level: 'mean' for level in range(3, leaf_level)}}, item_level=leaf_level)
@@ -0,0 +1,183 @@
+"""Compiled, array-backed CoRIx hierarchy shared by aggregation, layout and the details panel."""
+
+import hashlib
+import threading
+
+import numpy as np
+
+from corix.operators import DEFAULT_ITEM_LEVEL
+
+_TOPOLOGY_CACHE = {}
+_TOPOLOGY_CACHE_LOCK = threading.Lock()
+_TOPOLOGY_CACHE_MAX_ENTRIES = 32
+
+
+def _read_only(array):
+    array.setflags(write=False)
+    return array
+
+
+class CorixTopology:
+    """Immutable integer-indexed CoRIx hierarchy.
+
+    Node ids are row positions in `names`. Children of node i are
+    `child_index[child_offsets[i]:child_offsets[i + 1]]` (CSR layout, sorted by construct name).
+    `depths` is the distance from the root, or -1 for nodes that are not connected to it.
+    Per-scenario data is then just a float array aligned with `names`.
+
+    The root's tree is also laid out as an Euler tour: `preorder` lists its nodes in pre-order
+    (children in CSR order) and node i's subtree is `preorder[subtree_start[i]:subtree_stop[i]]`.
+    Its assessment items (the nodes at the rules' item level, Level 5 by default), in the same
+    order, are the `item_nodes` of `item_intervals(item_level)`, so the items contributing to node
+    i are the contiguous slice `item_nodes[item_start[i]:item_stop[i]]` of that one shared array.
+    Nodes outside the root's tree have empty intervals (start = stop = 0).
+    """
+
+    def __init__(self, names, levels, parents, root):
+        n = len(names)
+        self.names = tuple(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.levels = _read_only(np.asarray(levels, dtype=np.int64))
+        self.parents = _read_only(np.asarray(parents, dtype=np.int64))
+        self.root = int(root)
+
+        attached = np.flatnonzero(self.parents >= 0)
+        name_rank = np.empty(n, dtype=np.int64)
+        name_rank[np.argsort(np.array(self.names, dtype=object), kind='stable')] = np.arange(n)
+        order = attached[np.lexsort((name_rank[attached], self.parents[attached]))]
+        self.child_index = _read_only(order)
+        self.child_offsets = _read_only(np.r_[0, np.cumsum(np.bincount(self.parents[attached], minlength=n))].astype(np.int64))
+        self.child_counts = _read_only(np.diff(self.child_offsets))
+
+        depths = np.full(n, -1, dtype=np.int64)
+        if self.root >= 0:
+            depths[self.root] = 0
+            frontier = np.zeros(n, dtype=bool)
+            frontier[self.root] = True
+            depth = 0
+            while True:
+                depth += 1
+                on_frontier = frontier[self.parents[order]] & (depths[order] < 0)
+                if not on_frontier.any():
+                    break
+                depths[order[on_frontier]] = depth
+                frontier[:] = False
+                frontier[order[on_frontier]] = True
+        self.depths = _read_only(depths)
+        self.max_depth = int(depths.max()) if n else -1
+
+        # Per-depth reduction plan for bottom-up aggregation: the children at each depth in CSR
+        # order, the offsets where each parent's run starts, and those parents.
+        self.reduce_plan = []
+        for depth in range(self.max_depth, 0, -1):
+            children = order[depths[order] == depth]
+            child_parents = self.parents[children]
+            starts = np.flatnonzero(np.r_[True, child_parents[1:] != child_parents[:-1]])
+            self.reduce_plan.append((_read_only(children), _read_only(starts), _read_only(child_parents[starts])))
+
+        # Euler tour: subtree sizes bottom-up, then each child's pre-order position top-down as its
+        # parent's position + 1 + the sizes of the siblings before it, one depth at a time.
+        sizes = (depths >= 0).astype(np.int64)
+        for children, starts, group_parents in self.reduce_plan:
+            sizes[group_parents] += np.add.reduceat(sizes[children], starts)
+        subtree_start = np.zeros(n, dtype=np.int64)
+        for children, starts, group_parents in reversed(self.reduce_plan):
+            group_sizes = np.diff(np.r_[starts, len(children)])
+            before = np.cumsum(sizes[children]) - sizes[children]
+            before -= np.repeat(before[starts], group_sizes)
+            subtree_start[children] = np.repeat(subtree_start[group_parents], group_sizes) + 1 + before
+        in_tree = np.flatnonzero(depths >= 0)
+        preorder = np.empty(len(in_tree), dtype=np.int64)
+        preorder[subtree_start[in_tree]] = in_tree
+        self.preorder = _read_only(preorder)
+        self.subtree_start = _read_only(subtree_start)
+        self.subtree_stop = _read_only(subtree_start + sizes)
+
+        self._item_intervals = {}
+        self._item_intervals_lock = threading.Lock()
+
+        digest = hashlib.sha1()
+        digest.update('\x1f'.join(self.names).encode('utf-8'))
+        digest.update(self.levels.tobytes())
+        digest.update(self.parents.tobytes())
+        self.key = digest.hexdigest()
+
+    def __len__(self):
+        return len(self.names)
+
+    def children(self, node):
+        """Returns the child ids of `node` as a read-only array slice."""
+        return self.child_index[self.child_offsets[node]:self.child_offsets[node + 1]]
+
+    def parent(self, node):
+        """Returns the parent id of `node`, or -1."""
+        return int(self.parents[node])
+
+    def item_intervals(self, item_level=DEFAULT_ITEM_LEVEL):
+        """Returns `(item_nodes, item_start, item_stop)` for the items at `item_level` (cached per level)."""
+        with self._item_intervals_lock:
+            intervals = self._item_intervals.get(item_level)
+        if intervals is None:
+            item_positions = np.flatnonzero(self.levels[self.preorder] == item_level)
+            intervals = (
+                _read_only(self.preorder[item_positions]),
+                _read_only(np.searchsorted(item_positions, self.subtree_start).astype(np.int64)),
+                _read_only(np.searchsorted(item_positions, self.subtree_stop).astype(np.int64)),
+            )
+            with self._item_intervals_lock:
+                intervals = self._item_intervals.setdefault(item_level, intervals)
+        return intervals
+
+    def items(self, node, item_level=DEFAULT_ITEM_LEVEL):
+        """Returns the `item_level` item ids under `node` (itself included) as a read-only slice of `item_nodes`."""
+        item_nodes, item_start, item_stop = self.item_intervals(item_level)
+        return item_nodes[item_start[node]:item_stop[node]]
+
+    def ancestors(self, node):
+        """Returns the ids on the path from `node`'s parent up to the top of its tree."""
+        path = []
+        node = self.parents[node]
+        while node >= 0 and len(path) < len(self.names):
+            path.append(int(node))
+            node = self.parents[node]
+        return path
+
+
+def compile_topology(names, levels, parent_map, root_construct):
+    """Compiles (or fetches from the process cache) the topology for an ordered list of constructs.
+
+    Args:
+        names (list): Construct names; their order defines the node ids.
+        levels (array-like): CoRIx level of each construct.
+        parent_map (dict): Child construct -> parent construct.
+        root_construct (str): Name of the root node.
+
+    Returns:
+        CorixTopology: Shared, read-only topology. Identical hierarchies return the same object.
+    """
+    names = list(names)
+    levels = np.asarray(levels, dtype=np.int64)
+    digest = hashlib.sha1()
+    digest.update('\x1f'.join(names).encode('utf-8'))
+    digest.update(levels.tobytes())
+    digest.update(repr(sorted(parent_map.items())).encode('utf-8'))
+    digest.update(root_construct.encode('utf-8'))
+    cache_key = digest.hexdigest()
+
+    with _TOPOLOGY_CACHE_LOCK:
+        topology = _TOPOLOGY_CACHE.get(cache_key)
+    if topology is not None:
+        return topology
+
+    index = {name: i for i, name in enumerate(names)}
+    parents = np.array([index.get(parent_map.get(name), -1) for name in names], dtype=np.int64)
+    root = index.get(root_construct, -1)
+    if root >= 0:
+        parents[root] = -1
+    topology = CorixTopology(names, levels, parents, root)
+
+    with _TOPOLOGY_CACHE_LOCK:
+        if len(_TOPOLOGY_CACHE) >= _TOPOLOGY_CACHE_MAX_ENTRIES:
+            _TOPOLOGY_CACHE.pop(next(iter(_TOPOLOGY_CACHE)))
+        topology = _TOPOLOGY_CACHE.setdefault(cache_key, topology)
+    return topology
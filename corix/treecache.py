@@ -0,0 +1,273 @@
+"""Process-wide cache of immutable per-scenario `CorixTree`s, shared by every session.
+
+Entries are keyed by the content hash of the source store (its `Level`/`Construct` columns and the
+scenario column), the column name and the hierarchy, so identical data loaded from different files
+or re-converted stores shares one entry. Trees are handed out as-is: their score arrays are
+read-only, so no caller gets (or needs) a copy. The cache evicts least recently used trees once it
+holds more than `max_entries` trees or `max_bytes` of score arrays (topologies are shared between
+trees and cached separately in `corix.topology`).
+
+`warm_tree_cache` aggregates the columns of a store in chunks on a background thread pool; a
+session asking for a tree that is being built waits for that build instead of repeating it.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from corix.diagnostics import mark_cache_miss
+from corix.engine import DEFAULT_RULES, PARENT_MAP, ROOT_CONSTRUCT, CorixTree, aggregate_all_columns
+from corix.store import ScoreStore
+
+TREE_CACHE_MAX_ENTRIES = 1024
+TREE_CACHE_MAX_BYTES = 256 * 2**20
+WARM_COLUMNS_PER_TASK = 64
+
+
+def _read_only(array):
+    array.setflags(write=False)
+    return array
+
+
+class TreeCache:
+    """Thread-safe LRU of built values with an entry-count and a byte budget.
+
+    Keys being built are tracked as pending futures, so concurrent requests for the same key share
+    one build.
+    """
+
+    def __init__(self, max_entries=TREE_CACHE_MAX_ENTRIES, max_bytes=TREE_CACHE_MAX_BYTES):
+        if max_entries < 1 or max_bytes < 0:
+            raise ValueError(f"max_entries must be at least 1 and max_bytes non-negative, got {max_entries} and {max_bytes}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Returns the cached value (marking it recently used) or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes):
+        """Stores a value of `nbytes` bytes, then evicts the least recently used entries over budget.
+
+        A value larger than the whole byte budget is not kept.
+        """
+        with self._lock:
+            self._store(key, value, nbytes)
+
+    def _store(self, key, value, nbytes):
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key)[1]
+        if nbytes > self.max_bytes:
+            return
+        self._entries[key] = (value, nbytes)
+        self.nbytes += nbytes
+        while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self.nbytes -= evicted_bytes
+            self.evictions += 1
+
+    def claim(self, keys):
+        """Marks the keys that are neither cached nor being built as pending and returns them.
+
+        The caller must `resolve` (or `fail`) every returned key.
+        """
+        with self._lock:
+            claimed = [key for key in keys if key not in self._entries and key not in self._pending]
+            for key in claimed:
+                self._pending[key] = Future()
+            return claimed
+
+    def resolve(self, key, value, nbytes):
+        """Stores the value of a claimed key and wakes up the requests waiting for it."""
+        with self._lock:
+            self._store(key, value, nbytes)
+            future = self._pending.pop(key)
+        future.set_result(value)
+
+    def fail(self, key, error):
+        """Releases a claimed key whose build raised; waiting requests get the error."""
+        with self._lock:
+            future = self._pending.pop(key)
+        future.set_exception(error)
+
+    def get_or_build(self, key, build):
+        """Returns the cached value for `key`, calling `build()` -> (value, nbytes) on a miss.
+
+        A request for a key another thread is building waits for that result.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            future = self._pending.get(key)
+            if future is None:
+                self._pending[key] = Future()
+                self.misses += 1
+        if future is not None:
+            return future.result()
+
+        mark_cache_miss()
+        try:
+            value, nbytes = build()
+        except BaseException as error:
+            self.fail(key, error)
+            raise
+        self.resolve(key, value, nbytes)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """Entry count, bytes held, budgets and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                'entries': len(self._entries), 'nbytes': self.nbytes, 'pending': len(self._pending),
+                'max_entries': self.max_entries, 'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+            }
+
+
+_TREE_CACHE = TreeCache()
+
+
+def _hierarchy_digest(parent_map, root_construct, rules=None):
+    # The default hierarchy is the common case; a custom parent map is hashed on every call. Defaults
+    # passed explicitly get the same key as omitted ones, so the same tree is never cached twice.
+    rules_key = (DEFAULT_RULES if rules is None else rules).key
+    if parent_map is None or parent_map is PARENT_MAP:
+        return f"default\x1f{root_construct}\x1f{rules_key}"
+    digest = hashlib.blake2b(repr(sorted(parent_map.items())).encode('utf-8'), digest_size=16)
+    digest.update(root_construct.encode('utf-8'))
+    digest.update(rules_key.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _tree_key(store, column, hierarchy):
+    return (store.content_digest(column), column, hierarchy)
+
+
+def _build_trees(store, columns, parent_map, root_construct, rules):
+    """Aggregates `columns` in one pass and splits the result into per-column trees with their sizes."""
+    matrix = aggregate_all_columns(store.frame(columns), parent_map, root_construct, columns=list(columns), rules=rules)
+    trees = []
+    for j, column in enumerate(columns):
+        scores = _read_only(np.ascontiguousarray(matrix.scores[:, j]))
+        raw_scores = _read_only(np.ascontiguousarray(matrix.raw_scores[:, j]))
+        trees.append((CorixTree(matrix.topology, scores, raw_scores, column, matrix.rules), scores.nbytes + raw_scores.nbytes))
+    return trees
+
+
+def cached_store_tree(store, column, parent_map=None, root_construct=ROOT_CONSTRUCT, cache=None, rules=None):
+    """Returns the shared, read-only `CorixTree` of one store column, aggregating it on a miss.
+
+    Args:
+        store (ScoreStore): Source of the `Level`/`Construct` columns and scores.
+        column (str): Application/scenario column.
+        parent_map (dict, optional): Child construct -> parent construct. Defaults to `PARENT_MAP`.
+        root_construct (str): Name of the root node.
+        cache (TreeCache, optional): Cache to use. Defaults to the process-wide cache.
+        rules (AggregationRules, optional): Operator per level/node. Defaults to `DEFAULT_RULES`.
+
+    Returns:
+        CorixTree: Tree whose `scores` and `raw_scores` are read-only.
+    """
+    if not isinstance(store, ScoreStore):
+        raise TypeError("store must be a ScoreStore.")
+    if column not in store.column_index:
+        raise KeyError(f"The column '{column}' not found in the score store.")
+    cache = _TREE_CACHE if cache is None else cache
+    key = _tree_key(store, column, _hierarchy_digest(parent_map, root_construct, rules))
+    return cache.get_or_build(key, lambda: _build_trees(store, [column], parent_map, root_construct, rules)[0])
+
+
+def _warm_chunk(cache, store, columns, hierarchy, parent_map, root_construct, rules):
+    keys = {_tree_key(store, column, hierarchy): column for column in columns}
+    claimed = cache.claim(list(keys))
+    if not claimed:
+        return 0
+    try:
+        trees = _build_trees(store, [keys[key] for key in claimed], parent_map, root_construct, rules)
+    except BaseException as error:
+        for key in claimed:
+            cache.fail(key, error)
+        raise
+    for key, (tree, nbytes) in zip(claimed, trees):
+        cache.resolve(key, tree, nbytes)
+    return len(claimed)
+
+
+def warm_tree_cache(store, columns=None, workers=None, columns_per_task=WARM_COLUMNS_PER_TASK, parent_map=None,
+                    root_construct=ROOT_CONSTRUCT, cache=None, rules=None):
+    """Builds the trees of a store's columns on a background thread pool and returns immediately.
+
+    Columns are aggregated `columns_per_task` at a time (one bottom-up pass per chunk). Columns that
+    are already cached or being built are skipped, and at most the cache's `max_entries` columns
+    are warmed so warming does not evict its own trees.
+
+    Args:
+        store (ScoreStore): Source store.
+        columns (list, optional): Columns to warm. Defaults to all of them.
+        workers (int, optional): Threads. Defaults to `min(4, os.cpu_count())`.
+        columns_per_task (int): Columns aggregated together per task.
+        parent_map (dict, optional): Child construct -> parent construct. Defaults to `PARENT_MAP`.
+        root_construct (str): Name of the root node.
+        cache (TreeCache, optional): Cache to fill. Defaults to the process-wide cache.
+        rules (AggregationRules, optional): Operator per level/node. Defaults to `DEFAULT_RULES`.
+
+    Returns:
+        list: One `concurrent.futures.Future` per task; each resolves to the number of trees it built.
+    """
+    if not isinstance(store, ScoreStore):
+        raise TypeError("store must be a ScoreStore.")
+    if columns_per_task < 1:
+        raise ValueError(f"columns_per_task must be at least 1, got {columns_per_task}")
+    cache = _TREE_CACHE if cache is None else cache
+    columns = list(store.columns if columns is None else columns)[:cache.max_entries]
+    hierarchy = _hierarchy_digest(parent_map, root_construct, rules)
+    workers = workers or min(4, os.cpu_count() or 1)
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='corix-warm')
+    futures = []
+    for start in range(0, len(columns), columns_per_task):
+        chunk = columns[start:start + columns_per_task]
+        futures.append(pool.submit(_warm_chunk, cache, store, chunk, hierarchy, parent_map, root_construct, rules))
+    pool.shutdown(wait=False)
+    return futures
+
+
+def tree_cache_stats():
+    """`TreeCache.stats` of the process-wide cache."""
+    return _TREE_CACHE.stats()
+
+
+def clear_tree_cache():
+    """Drops every tree from the process-wide cache."""
+    _TREE_CACHE.clear()
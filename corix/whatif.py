@@ -0,0 +1,139 @@
+"""Incremental what-if re-aggregation of one scenario when Level 5 scores are overridden."""
+
+import heapq
+
+import numpy as np
+
+from corix.engine import CorixTree
+
+
+class WhatIfAggregator:
+    """Maintains a scenario's aggregated scores under Level 5 overrides in O(depth) per edit.
+
+    Mean nodes keep the running sum, child count and NaN-child count of their children's
+    contributions. Max nodes keep a lazy-deletion max-heap of `(-contribution, child)` entries, so an
+    update pushes one entry and stale tops are discarded on read instead of rescanning every child.
+    Nodes whose rule selects another operator re-apply it to their children (O(children) per edit).
+    Only the ancestors of an edited leaf are touched.
+    """
+
+    def __init__(self, tree):
+        if not isinstance(tree, CorixTree):
+            raise TypeError("tree must be a CorixTree.")
+        topology = tree.topology
+        self.topology = topology
+        self.column = tree.column
+        self.base_scores = tree.scores
+        self.scores = np.array(tree.scores, dtype=np.float64)
+        self.raw_scores = np.array(tree.raw_scores, dtype=np.float64)
+        self.rules = tree.rules
+        self.overrides = {}
+
+        n = len(topology)
+        levels = topology.levels
+        leaf_mask = topology.child_counts == 0
+        self.contributions = self.scores.copy()
+        self.contributions[leaf_mask & (levels != self.rules.item_level)] = 0.0
+        self._operators = self.rules.node_operators(topology)
+
+        self._sums = np.zeros(n)
+        self._nan_counts = np.zeros(n, dtype=np.int64)
+        self._heaps = {}
+        in_tree = topology.depths >= 0
+        for node in np.flatnonzero(in_tree & ~leaf_mask):
+            children = topology.children(node)
+            values = self.contributions[children]
+            nan_mask = np.isnan(values)
+            self._nan_counts[node] = int(nan_mask.sum())
+            if self._operators[node] == 'max':
+                heap = [(-float(v), int(c)) for v, c in zip(values[~nan_mask], children[~nan_mask])]
+                heapq.heapify(heap)
+                self._heaps[int(node)] = heap
+            else:
+                self._sums[node] = float(values[~nan_mask].sum())
+
+    def _max_of(self, node):
+        heap = self._heaps[node]
+        while heap and -heap[0][0] != self.contributions[heap[0][1]]:
+            heapq.heappop(heap)
+        # Keep stale entries bounded after many edits to the same node.
+        if len(heap) > 4 * self.topology.child_counts[node] + 16:
+            heap[:] = [(-float(self.contributions[c]), int(c)) for c in self.topology.children(node) if not np.isnan(self.contributions[c])]
+            heapq.heapify(heap)
+        return -heap[0][0] if heap else np.nan
+
+    def _recompute(self, node):
+        operator = self._operators[node]
+        if operator not in ('max', 'mean'):
+            return float(self.rules.reduce_node(self.topology, node, self.contributions[self.topology.children(node)])[0])
+        if self._nan_counts[node]:
+            return np.nan
+        if operator == 'max':
+            return self._max_of(node)
+        return self._sums[node] / self.topology.child_counts[node]
+
+    def _replace_contribution(self, parent, child, old, new):
+        if np.isnan(old):
+            self._nan_counts[parent] -= 1
+        elif parent not in self._heaps:
+            self._sums[parent] -= old
+        self.contributions[child] = new
+        if np.isnan(new):
+            self._nan_counts[parent] += 1
+        elif parent in self._heaps:
+            heapq.heappush(self._heaps[parent], (-float(new), int(child)))
+        else:
+            self._sums[parent] += new
+
+    def set_leaf_score(self, node_id, score):
+        """Overrides an item-level (Level 5) leaf and re-aggregates its ancestors.
+
+        Args:
+            node_id (str): Construct name of an item-level leaf.
+            score (float): New score (NaN allowed).
+
+        Returns:
+            list: Node ids (ints) whose score changed, starting with the leaf.
+        """
+        topology = self.topology
+        if node_id not in topology.index:
+            raise KeyError(f"Node with ID '{node_id}' not found.")
+        node = topology.index[node_id]
+        if topology.levels[node] != self.rules.item_level or topology.child_counts[node]:
+            raise ValueError(f"Only Level {self.rules.item_level} leaves can be overridden, got '{node_id}'.")
+
+        score = float(score)
+        if np.isnan(self.base_scores[node]) and np.isnan(score) or score == self.base_scores[node]:
+            self.overrides.pop(node_id, None)
+        else:
+            self.overrides[node_id] = score
+
+        changed = [node]
+        old = self.contributions[node]
+        self.scores[node] = score
+        self.raw_scores[node] = score
+        child, new = node, score
+        parent = topology.parents[node]
+        while parent >= 0 and topology.depths[parent] >= 0:
+            self._replace_contribution(parent, child, old, new)
+            old = self.contributions[parent]
+            new = self._recompute(parent)
+            if new == old or (np.isnan(new) and np.isnan(old)):
+                break
+            self.scores[parent] = new
+            changed.append(int(parent))
+            child, parent = parent, topology.parents[parent]
+        else:
+            self.contributions[child] = new
+        return changed
+
+    def reset(self, node_id=None):
+        """Drops one override (or all of them) and restores the baseline scores."""
+        node_ids = [node_id] if node_id is not None else list(self.overrides)
+        for name in node_ids:
+            if name in self.overrides:
+                self.set_leaf_score(name, self.base_scores[self.topology.index[name]])
+
+    def tree(self):
+        """Returns the what-if scores as a `CorixTree` over the same topology."""
+        return CorixTree(self.topology, self.scores, self.raw_scores, self.column, self.rules)
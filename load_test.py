@@ -0,0 +1,293 @@
+"""Concurrent-session load test for the CoRIx Tree Explorer, run offline with Streamlit's `AppTest`.
+
+Every simulated session is its own `AppTest` of `app.py` (its own session state). After opening
+the explorer, and once every session got there, each session performs random actions and the
+rerun each one triggers is timed:
+
+- ``scenario``: pick another value in the `Select Application/Scenario` selectbox;
+- ``depth``: move the `Max Tree Depth` slider;
+- ``click``: select a node (what a click in the tree does; the plot component itself cannot be
+  clicked headlessly).
+
+Two modes:
+
+- ``threads`` (default): all sessions in this process, one thread each, sharing the process-wide
+  caches like browser sessions share one Streamlit server. `AppTest` swaps process-global runtime
+  state for each run, so reruns are serialized on one lock: only one rerun runs at a time, and a
+  rerun's latency is its own time plus the time spent queueing behind the other sessions' reruns.
+  Latency and throughput therefore measure serial reruns over shared caches, not parallel reruns
+  contending for the GIL; the report says so. Per-session memory is the RSS growth divided by the
+  number of sessions.
+- ``processes``: one process per session, so reruns really run in parallel and every session's
+  resident memory is measured on its own (caches are then per session, not shared).
+
+The report has p50/p95/p99 rerun latency (overall and per action), throughput in reruns per
+second and resident memory::
+
+    python load_test.py --sessions 8 --actions 25
+    python load_test.py --sessions 4 --mode processes --synthetic-columns 200 -o load_test.json
+
+``--synthetic-columns`` replaces the bundled example scores by that many random application/scenario
+columns over the same constructs. The dataset (and the store converted from it) is written to a
+temporary directory that is removed afterwards, so the working copy's `corix_scores.csv` is left alone.
+"""
+
+import contextlib
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(APP_DIR, 'app.py')
+EXPLORER_PAGE = 'CoRIx Tree Explorer'
+ACTIONS = ('scenario', 'depth', 'click')
+MODES = ('threads', 'processes')
+DEFAULT_SESSIONS = 8
+DEFAULT_ACTIONS = 25
+DEFAULT_TIMEOUT = 120
+LOG_LEVEL_VARIABLE = 'STREAMLIT_LOGGER_LEVEL'
+
+
+def resident_memory():
+    """Current resident set size of this process in bytes (peak RSS where /proc is not available)."""
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _sample_scores():
+    if APP_DIR not in sys.path:
+        sys.path.insert(0, APP_DIR)
+    from application_pages.data import SAMPLE_CORIX_SCORES
+    return SAMPLE_CORIX_SCORES
+
+
+def write_dataset(directory, synthetic_columns=0, seed=0):
+    """Writes `corix_scores.csv` into `directory`: the bundled example, or `synthetic_columns` random columns over its constructs."""
+    frame = pd.DataFrame(_sample_scores())
+    if synthetic_columns:
+        rng = np.random.default_rng(seed)
+        scores = np.round(rng.uniform(0.0, 10.0, (len(frame), synthetic_columns)), 2)
+        frame = pd.concat([frame[['Level', 'Construct']], pd.DataFrame(
+            scores, columns=[f"Application {j // 4 + 1} - Scenario {j % 4 + 1}" for j in range(synthetic_columns)]
+        )], axis=1)
+    path = os.path.join(directory, 'corix_scores.csv')
+    frame.to_csv(path, index=False)
+    return path
+
+
+def run_session(session, n_actions, seed, start_barrier, timeout=DEFAULT_TIMEOUT, run_lock=None):
+    """Opens the explorer in a fresh `AppTest`, waits at `start_barrier`, then performs `n_actions` random actions.
+
+    Returns:
+        dict: `session`, `first_load` (seconds to open the explorer), `actions` and `latencies`
+        (seconds) of the timed reruns, `rss_loaded`/`rss_end` (bytes, this process) and `error`.
+    """
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+
+    set_log_level(os.environ.get(LOG_LEVEL_VARIABLE, 'error'))
+    run_lock = run_lock or contextlib.nullcontext()
+    result = {'session': session, 'first_load': None, 'actions': [], 'latencies': [], 'rss_loaded': None, 'rss_end': None, 'error': None}
+    rng = random.Random(seed)
+    node_ids = list(_sample_scores()['Construct'])
+    try:
+        start = time.perf_counter()
+        with run_lock:
+            at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+            at.run()
+            # The first run parses Streamlit's config, which resets the log level again.
+            set_log_level(os.environ.get(LOG_LEVEL_VARIABLE, 'error'))
+            at.sidebar.selectbox[0].set_value(EXPLORER_PAGE).run()
+        result['first_load'] = time.perf_counter() - start
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        scenarios = list(at.selectbox(key='selected_app_scenario').options)
+        result['rss_loaded'] = resident_memory()
+        start_barrier.wait()
+
+        for _ in range(n_actions):
+            action = rng.choice(ACTIONS)
+            if action == 'scenario':
+                at.selectbox(key='selected_app_scenario').set_value(rng.choice(scenarios))
+            elif action == 'depth':
+                at.slider(key='max_tree_depth').set_value(rng.randint(2, 5))
+            else:
+                # Same state a click leaves behind (see `node_id_from_click` in page2).
+                at.session_state['selected_node_id'] = rng.choice(node_ids)
+            start = time.perf_counter()
+            with run_lock:
+                at.run()
+            result['latencies'].append(time.perf_counter() - start)
+            result['actions'].append(action)
+            if at.exception:
+                raise RuntimeError(at.exception[0].message)
+        result['rss_end'] = resident_memory()
+    except Exception as error:
+        result['error'] = f"{type(error).__name__}: {error}"
+        with contextlib.suppress(threading.BrokenBarrierError):
+            start_barrier.abort()
+    return result
+
+
+def _session_process(workdir, queue, *args):
+    os.chdir(workdir)
+    queue.put(run_session(*args))
+
+
+def _percentiles(seconds):
+    if not len(seconds):
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+    p50, p95, p99 = np.percentile(np.asarray(seconds) * 1000, [50, 95, 99])
+    return {'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99)}
+
+
+def run_load_test(n_sessions=DEFAULT_SESSIONS, n_actions=DEFAULT_ACTIONS, mode='threads', synthetic_columns=0, seed=0, timeout=DEFAULT_TIMEOUT):
+    """Runs `n_sessions` concurrent sessions of `n_actions` actions each and summarizes their reruns.
+
+    Returns:
+        dict: `mode`, `serialized_reruns` (True in threads mode), `sessions`, `actions_per_session`,
+        `reruns`, `seconds`, `reruns_per_second`, overall, per-action and first-load latency
+        percentiles, `rss_per_session_bytes` (plus the process RSS figures in threads mode) and
+        `errors` (session -> message).
+    """
+    if n_sessions < 1 or n_actions < 1:
+        raise ValueError(f"n_sessions and n_actions must be at least 1, got {n_sessions} and {n_actions}")
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got '{mode}'")
+    # Headless sessions trip Streamlit's bare-mode and widget-policy warnings on every rerun. The
+    # variable must be set before Streamlit first reads its config (spawned sessions inherit it).
+    os.environ.setdefault(LOG_LEVEL_VARIABLE, 'error')
+    with tempfile.TemporaryDirectory(prefix='corix-load-test-') as workdir:
+        write_dataset(workdir, synthetic_columns, seed)
+        rss_start = resident_memory()
+
+        if mode == 'threads':
+            cwd = os.getcwd()
+            os.chdir(workdir)  # the app reads corix_scores.csv from the working directory
+            try:
+                barrier, run_lock = threading.Barrier(n_sessions + 1), threading.Lock()
+                results = [None] * n_sessions
+
+                def target(i):
+                    results[i] = run_session(i, n_actions, seed + i, barrier, timeout, run_lock)
+
+                workers = [threading.Thread(target=target, args=(i,), name=f'session-{i}') for i in range(n_sessions)]
+                for worker in workers:
+                    worker.start()
+                with contextlib.suppress(threading.BrokenBarrierError):
+                    barrier.wait()
+                rss_loaded = resident_memory()
+                start = time.perf_counter()
+                for worker in workers:
+                    worker.join()
+                seconds = time.perf_counter() - start
+                rss_end = resident_memory()
+            finally:
+                os.chdir(cwd)
+        else:
+            context = multiprocessing.get_context('spawn')
+            barrier, queue = context.Barrier(n_sessions + 1), context.Queue()
+            workers = [context.Process(target=_session_process, args=(workdir, queue, i, n_actions, seed + i, barrier, timeout))
+                       for i in range(n_sessions)]
+            for worker in workers:
+                worker.start()
+            with contextlib.suppress(threading.BrokenBarrierError):
+                barrier.wait()
+            start = time.perf_counter()
+            results = sorted((queue.get() for _ in workers), key=lambda result: result['session'])
+            seconds = time.perf_counter() - start
+            for worker in workers:
+                worker.join()
+
+    latencies = [latency for result in results for latency in result['latencies']]
+    report = {
+        'mode': mode, 'serialized_reruns': mode == 'threads', 'sessions': n_sessions, 'actions_per_session': n_actions, 'synthetic_columns': synthetic_columns,
+        'reruns': len(latencies), 'seconds': seconds,
+        'reruns_per_second': len(latencies) / seconds if seconds > 0 else None,
+        'latency': _percentiles(latencies),
+        'latency_by_action': {
+            action: _percentiles([latency for result in results for name, latency in zip(result['actions'], result['latencies']) if name == action])
+            for action in ACTIONS
+        },
+        'first_load': _percentiles([result['first_load'] for result in results if result['first_load'] is not None]),
+        'errors': {result['session']: result['error'] for result in results if result['error']},
+    }
+    if mode == 'threads':
+        report.update({
+            'rss_start_bytes': rss_start, 'rss_loaded_bytes': rss_loaded, 'rss_end_bytes': rss_end,
+            'rss_per_session_bytes': (max(rss_loaded, rss_end) - rss_start) / n_sessions,
+        })
+    else:
+        per_session = [max(result['rss_loaded'] or 0, result['rss_end'] or 0) for result in results]
+        report['rss_per_session_bytes'] = float(np.median(per_session))
+        report['rss_per_session_max_bytes'] = max(per_session)
+    return report
+
+
+def _format_percentiles(name, entry):
+    if entry['p50_ms'] is None:
+        return f"{name:<12} -"
+    return f"{name:<12} p50 {entry['p50_ms']:8.1f} ms  p95 {entry['p95_ms']:8.1f} ms  p99 {entry['p99_ms']:8.1f} ms"
+
+
+def format_report(report):
+    """Human-readable summary of `run_load_test`."""
+    mib = 2**20
+    lines = [
+        f"{report['sessions']} sessions ({report['mode']}) x {report['actions_per_session']} actions: {report['reruns']} reruns in "
+        f"{report['seconds']:.2f}s ({report['reruns_per_second'] or 0:.1f} reruns/s)",
+        _format_percentiles('all reruns', report['latency']),
+    ]
+    if report['serialized_reruns']:
+        lines.insert(1, "reruns run one at a time (AppTest shares process state), so latency includes queueing "
+                        "behind other sessions' reruns; use --mode processes for parallel reruns")
+    lines += [_format_percentiles(action, entry) for action, entry in report['latency_by_action'].items()]
+    lines.append(_format_percentiles('first load', report['first_load']))
+    if report['mode'] == 'threads':
+        lines.append(f"RSS {report['rss_start_bytes'] / mib:.0f} MiB before, {report['rss_loaded_bytes'] / mib:.0f} MiB loaded, "
+                     f"{report['rss_end_bytes'] / mib:.0f} MiB at the end ({report['rss_per_session_bytes'] / mib:.1f} MiB per session)")
+    else:
+        lines.append(f"RSS per session process: median {report['rss_per_session_bytes'] / mib:.0f} MiB, "
+                     f"max {report['rss_per_session_max_bytes'] / mib:.0f} MiB")
+    for session, error in report['errors'].items():
+        lines.append(f"session {session} failed: {error}")
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load-test the CoRIx Tree Explorer with concurrent headless sessions.")
+    parser.add_argument('--sessions', type=int, default=DEFAULT_SESSIONS, help=f"Concurrent sessions (default: {DEFAULT_SESSIONS}).")
+    parser.add_argument('--actions', type=int, default=DEFAULT_ACTIONS, help=f"Timed actions per session (default: {DEFAULT_ACTIONS}).")
+    parser.add_argument('--mode', choices=MODES, default='threads', help="Sessions as threads of this process (shared caches) or as separate processes.")
+    parser.add_argument('--synthetic-columns', type=int, default=0, help="Use this many random application/scenario columns instead of the bundled example.")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the actions and synthetic scores.")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="Seconds a single rerun may take.")
+    parser.add_argument('-o', '--output', help="Also write the report as JSON.")
+    args = parser.parse_args()
+
+    report = run_load_test(args.sessions, args.actions, args.mode, args.synthetic_columns, args.seed, args.timeout)
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    if report['errors']:
+        sys.exit(1)
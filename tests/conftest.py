@@ -0,0 +1,93 @@
+"""Shared fixtures: fuzzed CoRIx tables and a recursive reference aggregation (the pre-vectorization semantics)."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from application_pages.data import SAMPLE_CORIX_SCORES
+
+ROOT = 'root'
+
+
+def random_hierarchy(rng, n_nodes=60, max_level=5, n_orphans=4):
+    """A random tree rooted at Level 2 plus a few orphans (parents that are missing from the table).
+
+    Returns:
+        tuple: (names, levels, parent_map)
+    """
+    names, levels, parent_map = [ROOT], [2], {}
+    for i in range(1, n_nodes):
+        parent = rng.integers(len(names))
+        if levels[parent] >= max_level:
+            parent = 0
+        name = f"n{i:03d}"
+        names.append(name)
+        levels.append(levels[parent] + 1)
+        parent_map[name] = names[parent]
+    for i in range(n_orphans):
+        name = f"orphan{i}"
+        names.append(name)
+        levels.append(int(rng.integers(3, max_level + 1)))
+        parent_map[name] = f"missing{i}"
+    return names, levels, parent_map
+
+
+def random_table(rng, n_columns=3, nan_fraction=0.1, **hierarchy_options):
+    """A shuffled CoRIx table over `random_hierarchy` with random 0-10 scores and some NaNs."""
+    names, levels, parent_map = random_hierarchy(rng, **hierarchy_options)
+    scores = rng.uniform(0.0, 10.0, (len(names), n_columns))
+    scores[rng.random(scores.shape) < nan_fraction] = np.nan
+    frame = pd.DataFrame(scores, columns=[f"App {j} - Scenario" for j in range(n_columns)])
+    frame.insert(0, 'Construct', names)
+    frame.insert(0, 'Level', levels)
+    return frame.sample(frac=1.0, random_state=int(rng.integers(2**31))).reset_index(drop=True), parent_map
+
+
+def reference_aggregate(frame, column, parent_map, root=ROOT, item_level=5):
+    """Recursive max (Level 2) / mean (Levels 3-5) aggregation of one column, node by node.
+
+    Leaves below the item level contribute 0.0 to their parent; nodes outside the root's tree keep
+    their raw score.
+    """
+    raw = dict(zip(frame['Construct'], frame[column].astype(float)))
+    level = dict(zip(frame['Construct'], frame['Level'].astype(int)))
+    children = {}
+    for name in raw:
+        parent = parent_map.get(name)
+        if parent in raw and name != root:
+            children.setdefault(parent, []).append(name)
+    scores = dict(raw)
+
+    def visit(node):
+        kids = children.get(node, [])
+        if not kids:
+            return raw[node] if level[node] == item_level else 0.0
+        values = [visit(child) for child in kids]
+        if level[node] == 2:
+            scores[node] = float(np.max(values))
+        elif level[node] in (3, 4, 5):
+            scores[node] = float(np.mean(values))
+        else:
+            scores[node] = np.nan
+        return scores[node]
+
+    if root in raw:
+        visit(root)
+    return scores
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(20261016)
+
+
+@pytest.fixture
+def sample_frame():
+    return pd.DataFrame(SAMPLE_CORIX_SCORES)
+
+
+@pytest.fixture
+def sample_csv(tmp_path, sample_frame):
+    path = tmp_path / 'corix_scores.csv'
+    sample_frame.to_csv(path, index=False)
+    return path
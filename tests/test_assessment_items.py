@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from conftest import ROOT, random_table
+from corix.engine import aggregate_all_columns, tree_data_from_scores
+
+
+def reference_items(frame, column, parent_map, root=ROOT):
+    """Sorted item ids per node as `build_corix_tree_data` collected them (copied up the tree and deduplicated)."""
+    raw = dict(zip(frame['Construct'], frame[column].astype(float)))
+    level = dict(zip(frame['Construct'], frame['Level'].astype(int)))
+    children = {}
+    for name in raw:
+        if parent_map.get(name) in raw and name != root:
+            children.setdefault(parent_map[name], []).append(name)
+    items = {name: [name] if level[name] == 5 and not np.isnan(raw[name]) else [] for name in raw}
+
+    def visit(node):
+        for child in children.get(node, []):
+            visit(child)
+            if level[node] < 5:
+                items[node].extend(items[child])
+        items[node] = sorted(set(items[node]))
+
+    visit(root)
+    return items
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_items_match_the_copied_lists(seed):
+    frame, parent_map = random_table(np.random.default_rng(seed), n_orphans=6)
+    matrix = aggregate_all_columns(frame, parent_map=parent_map, root_construct=ROOT)
+    for column in matrix.columns:
+        expected = reference_items(frame, column, parent_map)
+        tree_data = tree_data_from_scores(matrix, column)
+        tree = matrix.tree(column)
+        for name, node in tree_data.items():
+            assert sorted(item['item_id'] for item in node['raw_assessment_items']) == expected[name], name
+            if matrix.topology.depths[matrix.index[name]] >= 0:
+                assert len(tree.assessment_items(matrix.index[name])) == len(expected[name])
+
+
+def test_orphan_items_list_themselves(rng):
+    frame, parent_map = random_table(rng, nan_fraction=0.0, n_orphans=0)
+    frame.loc[len(frame)] = [5, 'lost item', 1.0, 2.0, 3.0]
+    frame.loc[len(frame)] = [4, 'lost group', 4.0, 5.0, 6.0]
+    parent_map = {**parent_map, 'lost item': 'missing', 'lost group': 'missing'}
+    matrix = aggregate_all_columns(frame, parent_map=parent_map, root_construct=ROOT)
+    tree_data = tree_data_from_scores(matrix, matrix.columns[1])
+    assert tree_data['lost item']['raw_assessment_items'] == [{'item_id': 'lost item', 'question': 'Assessment for lost item', 'score': 2.0}]
+    assert tree_data['lost group']['raw_assessment_items'] == []
+    # Orphans are never counted under the root.
+    assert 'lost item' not in {item['item_id'] for item in tree_data[ROOT]['raw_assessment_items']}
+
+
+def test_pages_slice_the_shared_item_array(rng):
+    frame, parent_map = random_table(rng, nan_fraction=0.0, n_nodes=200)
+    matrix = aggregate_all_columns(frame, parent_map=parent_map, root_construct=ROOT)
+    tree = matrix.tree(matrix.columns[0])
+    items = tree.assessment_items(matrix.root)
+    assert len(items) == len(tree.scored_items)
+    pages = [items.page(offset, 7) for offset in range(0, len(items), 7)]
+    assert [name for page in pages for name in page['Item ID']] == [tree.topology.names[i] for i in tree.scored_items]
+    np.testing.assert_array_equal(pages[0]['Score'], tree.raw_scores[items.node_ids(0, 7)])
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from conftest import ROOT, random_table
+from corix.attribution import attribute_leaves
+from corix.engine import aggregate_all_columns
+from corix.operators import AggregationRules
+
+EPSILON = 1e-6
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_sensitivity_matches_finite_differences(seed):
+    frame, parent_map = random_table(np.random.default_rng(seed), nan_fraction=0.0)
+    matrix = aggregate_all_columns(frame, parent_map=parent_map, root_construct=ROOT)
+    attribution = attribute_leaves(matrix)
+    assert len(attribution.leaves)
+
+    for i, leaf in enumerate(attribution.leaves.tolist()):
+        name = matrix.names[leaf]
+        bumped = frame.copy()
+        bumped.loc[bumped['Construct'] == name, matrix.columns] += EPSILON
+        root = aggregate_all_columns(bumped, parent_map=parent_map, root_construct=ROOT).scores[matrix.root]
+        numeric = (root - matrix.scores[matrix.root]) / EPSILON
+        np.testing.assert_allclose(attribution.sensitivity[i], numeric, atol=1e-6, err_msg=name)
+
+
+def test_shares_of_mean_only_tree_sum_to_one(sample_frame):
+    rules = AggregationRules({2: 'mean', 3: 'mean', 4: 'mean', 5: 'mean'})
+    attribution = attribute_leaves(aggregate_all_columns(sample_frame, rules=rules))
+    np.testing.assert_allclose(np.nansum(attribution.share, axis=0), 1.0)
+
+
+def test_unsupported_operators_are_rejected(sample_frame):
+    rules = AggregationRules({2: 'max', 3: 'nanmean', 4: 'mean', 5: 'mean'})
+    with pytest.raises(ValueError):
+        attribute_leaves(aggregate_all_columns(sample_frame, rules=rules))
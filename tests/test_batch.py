@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT, random_table
+from corix.batch import RESULT_COLUMNS, batch_score, write_results
+from corix.engine import aggregate_all_columns
+
+
+@pytest.fixture
+def score_files(tmp_path, rng):
+    files = []
+    for i in range(2):
+        frame, parent_map = random_table(rng, n_columns=5)
+        path = tmp_path / f'scores_{i}.csv'
+        frame.to_csv(path, index=False)
+        files.append((path, frame))
+    return files, parent_map
+
+
+def _expected(frame, parent_map, source):
+    matrix = aggregate_all_columns(frame, parent_map=parent_map, root_construct=ROOT)
+    return {(source, column, name): score for column in matrix.columns
+            for name, score in zip(matrix.names, matrix.column_scores(column))}
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_batch_matches_in_process_aggregation(score_files, workers):
+    files, parent_map = score_files
+    result, report = batch_score([path for path, _ in files], workers=workers, columns_per_task=2,
+                                 parent_map=parent_map, root_construct=ROOT)
+    assert list(result.columns) == RESULT_COLUMNS
+    assert (report.n_files, report.n_columns, report.n_tasks) == (2, 10, 6)
+    expected = {}
+    for path, frame in files:
+        expected.update(_expected(frame, parent_map, str(path)))
+    actual = {(row.Source, row.Column, row.Construct): row.Score for row in result.itertuples()}
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        np.testing.assert_allclose(actual[key], value, rtol=1e-12, err_msg=str(key))
+
+
+def test_column_subset_and_validation(score_files):
+    files, parent_map = score_files
+    path, frame = files[0]
+    column = frame.columns[3]
+    result, report = batch_score(path, columns=[column, 'missing'], workers=1, parent_map=parent_map, root_construct=ROOT)
+    assert set(result['Column']) == {column} and report.n_columns == 1
+    with pytest.raises(ValueError):
+        batch_score(path, columns_per_task=0)
+
+
+@pytest.mark.parametrize('output_format', ['csv', 'json'])
+def test_write_results(tmp_path, score_files, output_format):
+    files, parent_map = score_files
+    result, _ = batch_score(files[0][0], workers=1, parent_map=parent_map, root_construct=ROOT)
+    output = tmp_path / f'out.{output_format}'
+    write_results(result, output)
+    written = pd.read_csv(output) if output_format == 'csv' else pd.read_json(output, orient='records')
+    assert len(written) == len(result) and list(written.columns) == RESULT_COLUMNS
+    with pytest.raises(ValueError):
+        write_results(result, tmp_path / 'out.xlsx')
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT, random_table
+from corix.bootstrap import _row_quantiles, bootstrap_intervals, bootstrap_resamples
+from corix.engine import aggregate_all_columns
+from corix.ingest import ResponseAccumulator, leaf_standard_errors
+
+
+@pytest.fixture
+def tree(rng):
+    frame, parent_map = random_table(rng, n_columns=1, nan_fraction=0.0, n_nodes=120)
+    matrix = aggregate_all_columns(frame, parent_map=parent_map, root_construct=ROOT)
+    return matrix.tree(matrix.columns[0])
+
+
+def test_row_quantiles_match_nanquantile(rng):
+    samples = rng.normal(size=(50, 37))
+    samples[rng.random(samples.shape) < 0.2] = np.nan
+    samples[0] = np.nan
+    low, high = _row_quantiles(samples, (0.025, 0.975))
+    with np.errstate(invalid='ignore'), pytest.warns(RuntimeWarning):
+        np.testing.assert_allclose(low, np.nanquantile(samples, 0.025, axis=1))
+        np.testing.assert_allclose(high, np.nanquantile(samples, 0.975, axis=1))
+
+
+def test_resamples_are_seeded_and_keep_single_item_groups(tree):
+    first = bootstrap_resamples(tree, n_resamples=300, seed=7)
+    assert first.shape == (len(tree), 300) and first.dtype == np.float32
+    np.testing.assert_array_equal(first, bootstrap_resamples(tree, n_resamples=300, seed=7))
+    assert not np.array_equal(first, bootstrap_resamples(tree, n_resamples=300, seed=8))
+
+    # Items that are their parent's only item can only be redrawn as themselves.
+    topology = tree.topology
+    items = np.flatnonzero((topology.levels == 5) & (topology.child_counts == 0) & (topology.depths >= 0))
+    only_children = [i for i in items if np.sum(topology.parents[items] == topology.parents[i]) == 1]
+    np.testing.assert_array_equal(first[only_children], np.repeat(tree.raw_scores[only_children, None], 300, axis=1).astype(np.float32))
+
+
+def test_intervals_contain_the_point_estimate(tree):
+    intervals = bootstrap_intervals(tree, n_resamples=400, seed=0)
+    in_tree = tree.topology.depths >= 0
+    assert (intervals.low <= intervals.high).all()
+    assert np.mean((intervals.low[in_tree] <= tree.scores[in_tree] + 1e-6) & (tree.scores[in_tree] <= intervals.high[in_tree] + 1e-6)) > 0.9
+    assert intervals.interval(ROOT) == (intervals.low[tree.topology.root], intervals.high[tree.topology.root])
+    with pytest.raises(KeyError):
+        intervals.interval('missing')
+    with pytest.raises(ValueError):
+        bootstrap_intervals(tree, confidence=1.0)
+
+
+def test_ingested_standard_errors_widen_the_intervals(tree):
+    topology = tree.topology
+    items = [topology.names[i] for i in np.flatnonzero((topology.levels == 5) & (topology.depths >= 0))]
+    responses = pd.DataFrame({
+        'construct': np.repeat(items, 2), 'column': tree.column,
+        'score': np.tile([-1.5, 1.5], len(items)) + np.repeat(tree.raw_scores[[topology.index[name] for name in items]], 2),
+    })
+    totals = ResponseAccumulator()
+    totals.add_chunk(responses)
+    errors = leaf_standard_errors(totals.standard_errors_frame(), topology, tree.column)
+    assert leaf_standard_errors(totals.standard_errors_frame(), topology, 'missing') is None
+
+    plain = bootstrap_intervals(tree, n_resamples=400, seed=0)
+    noisy = bootstrap_intervals(tree, n_resamples=400, seed=0, leaf_standard_errors=errors)
+    root = topology.root
+    assert noisy.width[root] > plain.width[root]
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from application_pages.data import SAMPLE_CORIX_SCORES, load_corix_dataset, write_sample_dataset
+
+
+def _modules_after(statement):
+    code = f"import sys; {statement}; print(','.join(sorted(set(sys.modules) & {{'numpy', 'pandas', 'plotly'}})))"
+    return subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout.strip()
+
+
+def test_importing_corix_stays_light():
+    assert _modules_after('import corix') == ''
+    assert _modules_after('import corix.diagnostics') == ''
+    # The lazy exports still resolve, importing their submodule on first access.
+    assert 'numpy' in _modules_after('import corix; corix.aggregate_scores')
+
+
+def test_unknown_export_raises():
+    import corix
+    with pytest.raises(AttributeError):
+        corix.missing_name
+
+
+def test_sample_dataset_is_consistent(tmp_path):
+    lengths = {len(values) for values in SAMPLE_CORIX_SCORES.values()}
+    assert lengths == {45}
+    path = tmp_path / 'scores.csv'
+    write_sample_dataset(path)
+    frame = pd.read_csv(path)
+    assert list(frame.columns) == list(SAMPLE_CORIX_SCORES) and frame['Construct'].is_unique
+
+
+def test_loading_a_missing_dataset_writes_the_sample(tmp_path):
+    path = tmp_path / 'scores.csv'
+    load_corix_dataset.clear()
+    try:
+        score_store = load_corix_dataset(str(path))
+        assert path.exists()
+        assert list(score_store.columns) == [name for name in SAMPLE_CORIX_SCORES if name not in ('Level', 'Construct')]
+    finally:
+        load_corix_dataset.clear()
+    with pytest.raises(TypeError):
+        load_corix_dataset(42)
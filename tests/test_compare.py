@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from conftest import ROOT, random_table
+from corix.compare import compare_scenarios
+from corix.engine import aggregate_all_columns
+from corix.render import create_diff_corix_tree_plot
+
+
+@pytest.fixture
+def matrix(rng):
+    frame, parent_map = random_table(rng, n_columns=4)
+    return aggregate_all_columns(frame, parent_map=parent_map, root_construct=ROOT)
+
+
+def test_deltas_ranks_and_spread_match_per_column_trees(matrix):
+    columns = matrix.columns[1:]
+    comparison = compare_scenarios(matrix, columns, baseline=columns[1])
+    baseline = matrix.tree(columns[1]).scores
+    for j, column in enumerate(columns):
+        scores = matrix.tree(column).scores
+        np.testing.assert_array_equal(comparison.scores[:, j], scores)
+        np.testing.assert_array_equal(comparison.deltas[:, j], scores - baseline)
+        np.testing.assert_array_equal(comparison.delta_tree(column).scores, scores - baseline)
+    root = matrix.root
+    expected_order = sorted(range(len(columns)), key=lambda j: -np.nan_to_num(comparison.scores[root, j], nan=-np.inf))
+    assert [comparison.ranks[root, j] for j in expected_order] == list(range(1, len(columns) + 1))
+    np.testing.assert_allclose(comparison.spread[root], np.nanmax(comparison.scores[root]) - np.nanmin(comparison.scores[root]))
+
+
+def test_summary_and_node_frame(matrix):
+    comparison = compare_scenarios(matrix)
+    summary = comparison.scenario_summary()
+    assert summary['Rank'].tolist() == list(range(1, len(matrix.columns) + 1))
+    baseline_delta = summary.loc[summary['Scenario'] == matrix.columns[0], f'Delta vs {matrix.columns[0]}'].item()
+    assert baseline_delta == 0 or np.isnan(summary.loc[summary['Scenario'] == matrix.columns[0], 'Overall Score'].item())
+
+    frame = comparison.node_frame(level=4)
+    assert (frame['Level'] == 4).all()
+    assert len(frame) == np.sum((matrix.topology.levels == 4) & (matrix.topology.depths >= 0))
+    assert frame['Spread'].fillna(-np.inf).is_monotonic_decreasing
+    assert [col for col in frame.columns if col.startswith('Delta')] == [f'Delta {col}' for col in matrix.columns[1:]]
+
+
+def test_top_differing_leaves(matrix):
+    comparison = compare_scenarios(matrix)
+    top = comparison.top_differing_leaves(5)
+    topology = matrix.topology
+    leaves = np.flatnonzero((topology.depths >= 0) & (topology.child_counts == 0))
+    expected = np.sort(np.nan_to_num(comparison.spread[leaves], nan=-np.inf))[::-1][:5]
+    np.testing.assert_array_equal(np.nan_to_num(top['Spread'].to_numpy(), nan=-np.inf), expected)
+    np.testing.assert_allclose(top['Highest Score'] - top['Lowest Score'], top['Spread'])
+
+
+def test_invalid_columns_raise(matrix):
+    with pytest.raises(KeyError):
+        compare_scenarios(matrix, ['missing'])
+    with pytest.raises(KeyError):
+        compare_scenarios(matrix, matrix.columns[:2], baseline=matrix.columns[3])
+    with pytest.raises(ValueError):
+        compare_scenarios(matrix, [])
+
+
+def test_diff_plot(matrix):
+    comparison = compare_scenarios(matrix)
+    fig = create_diff_corix_tree_plot(comparison, matrix.columns[1], max_labels=3)
+    nodes = [trace for trace in fig.data if trace.name == 'Nodes'][0]
+    assert nodes.marker.cmin == -nodes.marker.cmax
+    assert len([trace for trace in fig.data if trace.name == 'Labels'][0].text) == 3
+    with pytest.raises(KeyError):
+        create_diff_corix_tree_plot(comparison, 'missing')
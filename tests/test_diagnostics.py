@@ -0,0 +1,74 @@
+import json
+import logging
+import tracemalloc
+
+import pytest
+
+from corix import diagnostics
+from corix.diagnostics import current, mark_cache_miss, stage, start_rerun
+
+
+@pytest.fixture(autouse=True)
+def no_env_flag(monkeypatch):
+    monkeypatch.delenv(diagnostics.ENV_FLAG, raising=False)
+
+
+def test_disabled_reruns_record_nothing():
+    recorder = start_rerun('page')
+    assert current() is recorder
+    with stage('work', cached=True):
+        mark_cache_miss()
+    assert recorder.records == [] and not tracemalloc.is_tracing()
+    recorder.finish()
+    assert current() is None
+
+
+def test_stages_record_time_memory_and_cache(caplog):
+    recorder = start_rerun('page', enabled=True)
+    with stage('cached hit', cached=True):
+        pass
+    with stage('cached miss', cached=True):
+        mark_cache_miss()
+    with stage('allocate'):
+        block = bytearray(4 * 2**20)
+    del block
+    with caplog.at_level(logging.INFO, logger='corix.diagnostics'):
+        total_ms = recorder.finish()
+    assert not tracemalloc.is_tracing()
+
+    records = {record['stage']: record for record in recorder.records}
+    assert records['cached hit']['cache'] == 'hit' and records['cached miss']['cache'] == 'miss'
+    assert records['allocate']['cache'] is None and records['allocate']['alloc_bytes'] >= 4 * 2**20
+    assert total_ms >= sum(record['ms'] for record in recorder.records)
+
+    lines = [json.loads(message) for message in caplog.messages]
+    assert [line['stage'] for line in lines if line['event'] == 'stage'] == ['cached hit', 'cached miss', 'allocate']
+    assert lines[-1]['event'] == 'rerun' and lines[-1]['stages'] == 3
+    assert list(recorder.frame().columns) == ['Stage', 'ms', 'Cache', 'Allocated KiB']
+
+
+def test_overlapping_reruns_do_not_report_allocations():
+    first = start_rerun('first', enabled=True)
+    with stage('overlapped'):
+        second = diagnostics.Diagnostics('second', enabled=True)
+        block = bytearray(2**20)
+    del block
+    with first.stage('shared'):
+        pass
+    second.finish()
+    with first.stage('alone again'):
+        pass
+    first.finish()
+    assert not tracemalloc.is_tracing()
+    allocations = {record['stage']: record['alloc_bytes'] for record in first.records}
+    assert allocations['overlapped'] is None and allocations['shared'] is None
+    assert allocations['alone again'] is not None
+
+
+def test_env_flag_enables_recording(monkeypatch):
+    monkeypatch.setenv(diagnostics.ENV_FLAG, '1')
+    recorder = start_rerun('page', track_memory=False)
+    with stage('work'):
+        pass
+    recorder.finish()
+    assert recorder.enabled and recorder.records[0]['alloc_bytes'] is None
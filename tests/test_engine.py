@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT, random_table, reference_aggregate
+from corix.engine import PARENT_MAP, ROOT_CONSTRUCT, aggregate_all_columns
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_matches_reference_aggregation_on_fuzzed_tables(seed):
+    frame, parent_map = random_table(np.random.default_rng(seed))
+    matrix = aggregate_all_columns(frame, parent_map=parent_map, root_construct=ROOT)
+    for column in matrix.columns:
+        expected = reference_aggregate(frame, column, parent_map)
+        actual = matrix.column_scores(column)
+        for name, value in expected.items():
+            np.testing.assert_allclose(actual[matrix.index[name]], value, rtol=1e-12, err_msg=f"{column} / {name}")
+
+
+def test_orphans_keep_their_raw_scores(rng):
+    frame, parent_map = random_table(rng, nan_fraction=0.0)
+    matrix = aggregate_all_columns(frame, parent_map=parent_map, root_construct=ROOT)
+    for name in frame.loc[frame['Construct'].str.startswith('orphan'), 'Construct']:
+        node = matrix.index[name]
+        assert matrix.topology.depths[node] == -1
+        np.testing.assert_array_equal(matrix.scores[node], matrix.raw_scores[node])
+
+
+def test_sample_dataset_matches_reference(sample_frame):
+    matrix = aggregate_all_columns(sample_frame)
+    for column in matrix.columns:
+        expected = reference_aggregate(sample_frame, column, PARENT_MAP, root=ROOT_CONSTRUCT)
+        actual = matrix.column_scores(column)
+        for name, value in expected.items():
+            np.testing.assert_allclose(actual[matrix.index[name]], value, rtol=1e-12, err_msg=f"{column} / {name}")
+
+
+def test_missing_required_column_raises(sample_frame):
+    with pytest.raises(KeyError):
+        aggregate_all_columns(sample_frame.drop(columns='Level'))
+
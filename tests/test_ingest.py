@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from corix.engine import PARENT_MAP, aggregate_all_columns
+from corix.ingest import ingest_responses
+
+LEAVES = ['MT RA 1', 'MT RA 2', 'MT DD 3']
+
+
+@pytest.fixture
+def responses(rng):
+    n = 600
+    return pd.DataFrame({
+        'construct': rng.choice(LEAVES, n),
+        'application': rng.choice(['Application A', 'Application B'], n),
+        'scenario': 'Pathfinder',
+        'score': rng.uniform(0.0, 10.0, n),
+    })
+
+
+def _expected(responses, statistic):
+    column = responses['application'] + ' - ' + responses['scenario']
+    return responses.groupby(['construct', column])['score'].agg(statistic)
+
+
+@pytest.mark.parametrize('chunksize', [1, 7, 1000, 100_000])
+def test_chunked_totals_match_one_pass_statistics(tmp_path, responses, chunksize):
+    path = tmp_path / 'responses.csv'
+    responses.to_csv(path, index=False)
+    totals = ingest_responses(path, chunksize=chunksize)
+    assert totals.n_responses == len(responses)
+    means, errors = totals.means(), totals.standard_errors()
+    expected_means = _expected(responses, 'mean')
+    expected_errors = _expected(responses, lambda x: np.std(x, ddof=1) / np.sqrt(len(x)))
+    for (construct, column), value in expected_means.items():
+        cell = totals._construct_index[construct], totals._column_index[column]
+        np.testing.assert_allclose(means[cell], value, rtol=1e-12)
+        np.testing.assert_allclose(errors[cell], expected_errors[construct, column], rtol=1e-9)
+
+
+def test_chan_merge_stays_accurate_for_low_spread(tmp_path):
+    scores = 7.0 + 1e-6 * np.tile([-1.0, 1.0], 10_000)
+    path = tmp_path / 'responses.jsonl'
+    with open(path, 'w', encoding='utf-8') as f:
+        for score in scores:
+            f.write(json.dumps({'construct': 'MT RA 1', 'column': 'Application A - Pathfinder', 'score': score}) + '\n')
+    totals = ingest_responses(path, chunksize=999)
+    expected = np.std(scores, ddof=1) / np.sqrt(len(scores))
+    np.testing.assert_allclose(totals.standard_errors()[0, 0], expected, rtol=1e-6)
+
+
+def test_missing_fields_raise(tmp_path):
+    path = tmp_path / 'responses.csv'
+    pd.DataFrame({'construct': ['MT RA 1'], 'score': [1.0]}).to_csv(path, index=False)
+    with pytest.raises(KeyError):
+        ingest_responses(path)
+
+
+def test_frame_adds_the_hierarchy_and_aggregates(tmp_path, responses):
+    path = tmp_path / 'responses.csv'
+    responses.to_csv(path, index=False)
+    totals = ingest_responses(path)
+    frame = totals.to_frame()
+    leaves_only = totals.to_frame(include_hierarchy=False)
+    assert sorted(leaves_only['Construct']) == sorted(LEAVES)
+    assert set(frame['Construct']) > set(LEAVES)
+    assert frame.loc[frame['Construct'] == PARENT_MAP['MT RA 1'], 'Level'].item() == 4
+
+    matrix = totals.to_score_matrix()
+    expected = aggregate_all_columns(frame)
+    np.testing.assert_array_equal(matrix.scores, expected.scores)
+    errors = totals.node_standard_errors(matrix.topology, 'Application A - Pathfinder')
+    assert np.isfinite(errors[[matrix.index[name] for name in LEAVES]]).all()
+    assert np.isnan(errors[matrix.root])
+    with pytest.raises(KeyError):
+        totals.node_standard_errors(matrix.topology, 'missing')
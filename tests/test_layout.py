@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from conftest import ROOT, random_hierarchy
+from corix.layout import SIBLING_DISTANCE, compute_tree_layout, tree_layout
+from corix.topology import compile_topology
+
+
+@pytest.fixture(params=range(6))
+def topology(request):
+    rng = np.random.default_rng(request.param)
+    names, levels, parent_map = random_hierarchy(rng, n_nodes=int(rng.integers(2, 200)))
+    return compile_topology(names, levels, parent_map, ROOT)
+
+
+def test_nodes_on_one_depth_never_overlap(topology):
+    layout = compute_tree_layout(topology)
+    for depth in range(topology.max_depth + 1):
+        nodes = topology.preorder[topology.depths[topology.preorder] == depth]
+        # Pre-order lists each depth left to right.
+        assert np.all(np.diff(layout.x[nodes]) >= SIBLING_DISTANCE - 1e-9)
+
+
+def test_parents_are_centred_over_their_children(topology):
+    layout = compute_tree_layout(topology)
+    for node in np.flatnonzero(topology.depths >= 0):
+        children = topology.children(node)
+        if len(children):
+            assert layout.x[node] == pytest.approx((layout.x[children[0]] + layout.x[children[-1]]) / 2)
+
+
+def test_coordinates_and_cache(topology):
+    layout = tree_layout(topology)
+    assert tree_layout(topology) is layout
+    in_tree = topology.depths >= 0
+    assert np.nanmin(layout.x) == 0.0 and layout.width == np.nanmax(layout.x)
+    assert np.isnan(layout.x[~in_tree]).all() and np.isnan(layout.y[~in_tree]).all()
+    np.testing.assert_array_equal(layout.y[in_tree], topology.levels[in_tree])
+    with pytest.raises(ValueError):
+        layout.x[topology.root] = 1.0
+
+
+def test_visible_nodes_and_edges(topology):
+    layout = tree_layout(topology)
+    visible = layout.visible(3)
+    assert set(visible.tolist()) == set(np.flatnonzero((topology.depths >= 0) & (topology.levels <= 3)).tolist())
+    edge_x, edge_y = layout.edges(visible)
+    assert len(edge_x) == 3 * (len(visible) - 1)
+    np.testing.assert_array_equal(edge_y[2::3], np.nan)
+    assert set(edge_y[1::3].tolist()) <= {3.0}
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from application_pages.data import SAMPLE_CORIX_SCORES, load_corix_dataset
+from load_test import ACTIONS, _percentiles, format_report, run_load_test, write_dataset
+
+
+def test_write_dataset(tmp_path):
+    sample = pd.read_csv(write_dataset(tmp_path))
+    assert list(sample.columns) == list(SAMPLE_CORIX_SCORES)
+
+    synthetic = pd.read_csv(write_dataset(tmp_path, synthetic_columns=6, seed=3))
+    assert len(synthetic.columns) == 8 and synthetic.columns[-1] == 'Application 2 - Scenario 2'
+    assert synthetic['Construct'].tolist() == sample['Construct'].tolist()
+    assert synthetic.iloc[:, 2:].stack().between(0, 10).all()
+
+
+def test_percentiles():
+    assert _percentiles([]) == {'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+    result = _percentiles(np.arange(1, 101) / 1000)
+    assert result['p50_ms'] == pytest.approx(50.5) and result['p99_ms'] == pytest.approx(99.01)
+
+
+def test_short_run_and_report():
+    load_corix_dataset.clear()
+    try:
+        report = run_load_test(n_sessions=2, n_actions=2, seed=1)
+    finally:
+        load_corix_dataset.clear()
+    assert report['errors'] == {}
+    assert report['reruns'] == 4 and report['serialized_reruns']
+    assert set(report['latency_by_action']) == set(ACTIONS)
+    text = format_report(report)
+    assert text.startswith('2 sessions (threads) x 2 actions: 4 reruns') and 'first load' in text
+    with pytest.raises(ValueError):
+        run_load_test(mode='fibers')
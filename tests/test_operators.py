@@ -0,0 +1,117 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT, random_table
+from corix.engine import DEFAULT_RULES, aggregate_all_columns, tree_data_from_scores
+from corix.operators import OPERATORS, AggregationOperator, AggregationRules, register_operator
+
+REFERENCE = {
+    'max': lambda v, w: np.max(v),
+    'min': lambda v, w: np.min(v),
+    'mean': lambda v, w: np.mean(v),
+    'nanmean': lambda v, w: np.nan if np.isnan(v).all() else np.nanmean(v),
+    'weighted_mean': lambda v, w: np.sum(v * w) / np.sum(w),
+    'trimmed_mean': lambda v, w: np.nan if np.isnan(v).any() else np.mean(np.sort(v)[int(0.25 * len(v)):len(v) - int(0.25 * len(v))]),
+    'quantile': lambda v, w: np.quantile(v, 0.75),
+}
+SPECS = {'trimmed_mean': {'operator': 'trimmed_mean', 'proportion': 0.25}, 'quantile': {'operator': 'quantile', 'q': 0.75}}
+
+
+def _reference(matrix, column, rules, reference):
+    """Recursive aggregation of one column with `reference(node, values, weights)` at every parent with children."""
+    topology = matrix.topology
+    raw = matrix.raw_scores[:, matrix.column_index[column]]
+    weights = rules.node_weights(topology)
+    scores = raw.copy()
+
+    def visit(node):
+        children = topology.children(node)
+        if not len(children):
+            return raw[node] if topology.levels[node] == rules.item_level else 0.0
+        values = np.array([visit(child) for child in children])
+        scores[node] = reference(node, values, weights[children])
+        return scores[node]
+
+    visit(topology.root)
+    return scores
+
+
+@pytest.mark.parametrize('name', sorted(REFERENCE))
+def test_builtin_operators_match_a_reference(rng, name):
+    frame, parent_map = random_table(rng, n_columns=3, nan_fraction=0.05, n_nodes=120)
+    weights = {construct: float(w) for construct, w in zip(frame['Construct'], rng.uniform(0.5, 2.0, len(frame)))}
+    spec = SPECS.get(name, name)
+    rules = AggregationRules({2: spec, 3: spec, 4: spec, 5: spec}, weights=weights)
+    matrix = aggregate_all_columns(frame, parent_map=parent_map, root_construct=ROOT, rules=rules)
+    for column in matrix.columns:
+        expected = _reference(matrix, column, rules, lambda node, v, w: REFERENCE[name](v, w))
+        np.testing.assert_allclose(matrix.column_scores(column), expected, rtol=1e-12, err_msg=column)
+
+
+def test_node_rules_override_levels_and_unruled_parents_are_nan(rng):
+    frame, parent_map = random_table(rng, n_columns=2, nan_fraction=0.0)
+    topology = aggregate_all_columns(frame, parent_map=parent_map, root_construct=ROOT).topology
+    overridden = next(i for i in range(len(topology)) if topology.levels[i] == 3 and len(topology.children(i)) > 1)
+    rules = AggregationRules({2: 'max', 3: 'mean', 5: 'mean'}, nodes={topology.names[overridden]: 'min'})
+    matrix = aggregate_all_columns(frame, parent_map=parent_map, root_construct=ROOT, rules=rules)
+    assert rules.node_operators(topology)[overridden] == 'min'
+
+    def reference(node, values, weights):
+        if node == overridden:
+            return np.min(values)
+        reduce = {2: np.max, 3: np.mean, 5: np.mean}.get(int(topology.levels[node]))
+        return np.nan if reduce is None else reduce(values)
+
+    for column in matrix.columns:
+        np.testing.assert_allclose(matrix.column_scores(column), _reference(matrix, column, rules, reference), rtol=1e-12)
+    level_4 = (topology.levels == 4) & (topology.child_counts > 0) & (topology.depths >= 0)
+    assert level_4.any() and np.isnan(matrix.scores[level_4]).all()
+
+
+def test_items_follow_the_rules_item_level():
+    frame = pd.DataFrame({
+        'Level': [2, 3, 4, 5, 6, 6],
+        'Construct': ['R', 'a', 'b', 'c', 'd', 'e'],
+        'X': [np.nan, np.nan, np.nan, np.nan, 1.0, 3.0],
+    })
+    parent_map = {'a': 'R', 'b': 'a', 'c': 'b', 'd': 'c', 'e': 'c'}
+    rules = AggregationRules({2: 'max', 3: 'mean', 4: 'mean', 5: 'mean'}, item_level=6)
+    matrix = aggregate_all_columns(frame, parent_map=parent_map, root_construct='R', rules=rules)
+    tree = matrix.tree('X')
+    assert tree.scores[tree.topology.root] == pytest.approx(2.0)
+    assert tree.assessment_items(tree.topology.root).page()['Item ID'].tolist() == ['d', 'e']
+    nodes = tree_data_from_scores(matrix, 'X')
+    assert [item['item_id'] for item in nodes['c']['raw_assessment_items']] == ['d', 'e']
+
+
+def test_rules_round_trip_and_validate():
+    rules = AggregationRules({2: 'max', 3: {'operator': 'quantile', 'q': 0.9}}, nodes={'x': 'min'}, weights={'y': 2}, item_level=6)
+    assert AggregationRules.from_dict(rules.to_dict()) == rules == pickle.loads(pickle.dumps(rules))
+    assert AggregationRules({3: 'quantile'}) == AggregationRules({3: {'operator': 'quantile', 'q': 0.5}})
+    assert rules.key != DEFAULT_RULES.key
+    with pytest.raises(ValueError):
+        AggregationRules({2: 'median'})
+    with pytest.raises(ValueError):
+        AggregationRules({2: {'operator': 'quantile', 'q': 2.0}})
+    with pytest.raises(ValueError):
+        AggregationRules({2: {'operator': 'max', 'q': 0.5}})
+    with pytest.raises(TypeError):
+        AggregationRules({2: 3})
+
+
+def test_registering_an_operator_invalidates_compiled_plans(sample_frame):
+    original = OPERATORS['max']
+    rules = AggregationRules({2: 'max', 3: 'mean', 4: 'mean', 5: 'mean'})
+    before = aggregate_all_columns(sample_frame, rules=rules)
+    try:
+        register_operator(AggregationOperator('max', lambda values, segments: np.full((len(segments), values.shape[1]), -1.0)))
+        after = aggregate_all_columns(sample_frame, rules=rules)
+        np.testing.assert_array_equal(after.scores[after.root], -1.0)
+    finally:
+        register_operator(original)
+    np.testing.assert_array_equal(aggregate_all_columns(sample_frame, rules=rules).scores, before.scores)
+    with pytest.raises(TypeError):
+        register_operator('max')
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT, random_table
+from corix.engine import aggregate_all_columns
+from corix.query import RESULT_COLUMNS, CorixIndex
+
+
+@pytest.fixture
+def matrix(rng):
+    frame, parent_map = random_table(rng, n_columns=4, nan_fraction=0.2, n_nodes=150)
+    return aggregate_all_columns(frame, parent_map=parent_map, root_construct=ROOT)
+
+
+def _long(matrix):
+    """Every (column, node) score as a long frame, the brute-force side of each query."""
+    topology = matrix.topology
+    return pd.DataFrame({
+        'Column': np.repeat(matrix.columns, len(topology)),
+        'Level': np.tile(topology.levels, len(matrix.columns)),
+        'Construct': np.tile(topology.names, len(matrix.columns)),
+        'Score': matrix.scores.T.ravel(),
+    })
+
+
+def _rows(frame):
+    return sorted(zip(frame['Column'], frame['Construct']))
+
+
+@pytest.mark.parametrize('low, high, level', [(2.0, 6.0, None), (None, 3.0, 4), (7.5, None, None), (11.0, None, 3)])
+def test_score_range_matches_brute_force(matrix, low, high, level):
+    index = CorixIndex(matrix)
+    result = index.score_range(low=low, high=high, level=level)
+    assert list(result.columns) == RESULT_COLUMNS
+    expected = _long(matrix)
+    mask = expected['Score'].between(-np.inf if low is None else low, np.inf if high is None else high)
+    if level is not None:
+        mask &= expected['Level'] == level
+    assert _rows(result) == _rows(expected[mask])
+    assert result['Score'].is_monotonic_decreasing
+
+
+@pytest.mark.parametrize('level', [None, 5])
+def test_top_k_matches_brute_force(matrix, level):
+    index = CorixIndex(matrix)
+    expected = _long(matrix).dropna(subset=['Score'])
+    if level is not None:
+        expected = expected[expected['Level'] == level]
+    top = index.top_k(7, level=level, columns=matrix.columns[1:])
+    expected = expected[expected['Column'] != matrix.columns[0]]
+    np.testing.assert_array_equal(top['Score'], np.sort(expected['Score'])[::-1][:7])
+    with pytest.raises(ValueError):
+        index.top_k(0)
+
+
+def test_prefix_and_combined_queries(matrix):
+    index = CorixIndex(matrix)
+    names = np.asarray(matrix.topology.names)
+    assert sorted(names[index.prefix_nodes('N0')]) == sorted(name for name in names if name.startswith('n0'))
+    assert len(index.prefix_nodes('')) == len(names)
+
+    result = index.query(prefix='n1', low=5.0, columns=[matrix.columns[2]])
+    expected = _long(matrix)
+    expected = expected[expected['Construct'].str.startswith('n1') & (expected['Score'] >= 5.0) & (expected['Column'] == matrix.columns[2])]
+    assert _rows(result) == _rows(expected)
+
+    # Without score bounds a prefix returns every searched column, NaN scores included.
+    assert len(index.query(prefix='orphan')) == 4 * len(matrix.columns)
+    with pytest.raises(KeyError):
+        index.query(prefix='n', columns=['missing'])
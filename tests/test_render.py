@@ -0,0 +1,108 @@
+import json
+
+import numpy as np
+import pytest
+
+from conftest import ROOT, random_table
+from corix.engine import aggregate_all_columns
+from corix.render import (
+    LARGE_SELECTED_NODE_SIZE, SELECTED_NODE_COLOR, SELECTED_NODE_SIZE, cached_tree_figure, collapsed_nodes,
+    create_large_corix_tree_plot, node_id_from_click, subtree_max_scores,
+)
+
+
+@pytest.fixture
+def tree(sample_frame):
+    matrix = aggregate_all_columns(sample_frame)
+    return matrix.tree(matrix.columns[0])
+
+
+@pytest.fixture
+def random_tree(rng):
+    frame, parent_map = random_table(rng, n_columns=1, nan_fraction=0.0, n_nodes=300)
+    matrix = aggregate_all_columns(frame, parent_map=parent_map, root_construct=ROOT)
+    return matrix.tree(matrix.columns[0])
+
+
+def test_subtree_max_scores(random_tree):
+    topology = random_tree.topology
+    subtree_max = subtree_max_scores(random_tree)
+    for node in np.flatnonzero(topology.depths >= 0):
+        subtree = topology.preorder[topology.subtree_start[node]:topology.subtree_stop[node]]
+        assert subtree_max[node] == np.nanmax(random_tree.scores[subtree])
+
+
+def test_low_scoring_subtrees_collapse_unless_expanded(random_tree):
+    topology = random_tree.topology
+    threshold = float(np.median(subtree_max_scores(random_tree)))
+    visible, is_collapsed, hidden_counts = collapsed_nodes(random_tree, 5, collapse_below=threshold)
+    collapsed = visible[is_collapsed]
+    assert len(collapsed) and topology.root not in collapsed
+    assert (subtree_max_scores(random_tree)[collapsed] < threshold).all()
+    shown = set(visible.tolist())
+    for node in collapsed:
+        descendants = topology.preorder[topology.subtree_start[node] + 1:topology.subtree_stop[node]]
+        assert not shown & set(descendants.tolist())
+    assert hidden_counts[is_collapsed].tolist() == [topology.subtree_stop[n] - topology.subtree_start[n] - 1 for n in collapsed]
+
+    expanded = topology.names[collapsed[0]]
+    visible, is_collapsed, _ = collapsed_nodes(random_tree, 5, collapse_below=threshold, expanded_node_ids=[expanded])
+    assert topology.index[expanded] not in visible[is_collapsed]
+    assert set(topology.children(topology.index[expanded]).tolist()) <= set(visible.tolist())
+
+
+def test_large_mode_uses_webgl_and_the_label_budget(random_tree):
+    fig = create_large_corix_tree_plot(random_tree, collapse_below=0.0, max_labels=7)
+    assert {trace.type for trace in fig.data} == {'scattergl'}
+    labels = [trace for trace in fig.data if trace.name == 'Labels']
+    assert len(labels[0].text) == 7
+
+
+@pytest.mark.parametrize('large_tree_mode', [False, True])
+def test_selection_is_patched_into_the_cached_json(tree, large_tree_mode):
+    tree_figure = cached_tree_figure(tree, large_tree_mode=large_tree_mode)
+    node_trace = tree_figure.node_trace
+    node_ids = list(tree_figure.customdata(node_trace))
+    base = json.loads(tree_figure.to_json())
+    selected = json.loads(tree_figure.to_json(node_ids[3]))
+    assert json.loads(tree_figure.to_json('not a node')) == base
+
+    marker, selected_marker = base['data'][node_trace]['marker'], selected['data'][node_trace]['marker']
+    assert tree_figure.figure(node_ids[3]).data[node_trace].marker.size[3] == selected_marker['size'][3]
+    if large_tree_mode:
+        patched = {('size',): LARGE_SELECTED_NODE_SIZE, ('line', 'color'): SELECTED_NODE_COLOR}
+    else:
+        patched = {('size',): SELECTED_NODE_SIZE, ('color',): SELECTED_NODE_COLOR}
+    for path, value in patched.items():
+        before, after = marker, selected_marker
+        for key in path:
+            before, after = before[key], after[key]
+        assert after[3] == value
+        assert after[:3] + after[4:] == before[:3] + before[4:]
+    # Nothing outside the node markers changes.
+    del base['data'][node_trace]['marker'], selected['data'][node_trace]['marker']
+    assert selected == base
+
+def test_figures_are_cached_by_scores(tree, sample_frame):
+    first = cached_tree_figure(tree, max_depth_to_display=4)
+    assert cached_tree_figure(tree, max_depth_to_display=4) is first
+    assert cached_tree_figure(tree, max_depth_to_display=3) is not first
+
+    edited = sample_frame.copy()
+    edited.loc[edited['Level'] == 5, edited.columns[2]] = 10.0
+    edited_tree = aggregate_all_columns(edited).tree(edited.columns[2])
+    assert cached_tree_figure(edited_tree, max_depth_to_display=4) is not first
+
+
+def test_node_id_from_click(tree):
+    tree_figure = cached_tree_figure(tree)
+    node_trace = tree_figure.node_trace
+    node_ids = tree_figure.customdata(node_trace)
+    point = {'curveNumber': node_trace, 'pointIndex': 2}
+    for fig in (tree_figure, tree_figure.with_selection(node_ids[0]), tree_figure.figure()):
+        assert node_id_from_click(fig, point) == node_ids[2]
+        assert node_id_from_click(fig, {'curveNumber': node_trace, 'pointNumber': 1}) == node_ids[1]
+        assert node_id_from_click(fig, {'curveNumber': node_trace, 'pointIndex': len(node_ids)}) is None
+        assert node_id_from_click(fig, {'curveNumber': 99, 'pointIndex': 0}) is None
+        assert node_id_from_click(fig, {}) is None
+    assert node_id_from_click(tree_figure, {'customdata': 'MT RA 1'}) == 'MT RA 1'
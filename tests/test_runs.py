@@ -0,0 +1,78 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from corix.engine import aggregate_all_columns
+from corix.runs import MANIFEST, default_runs_path, open_run_store
+from corix.store import load_score_store
+
+
+@pytest.fixture
+def runs(tmp_path):
+    return open_run_store(tmp_path / 'scores.runs')
+
+
+def test_default_runs_path():
+    assert default_runs_path('data/corix_scores.csv') == 'data/corix_scores.runs'
+
+
+def test_unchanged_columns_are_reused(runs, sample_frame):
+    first = runs.add_run(sample_frame, label='first')
+    columns = list(sample_frame.columns[2:])
+    assert first['run'] == 1 and first['aggregated'] == columns
+    # Nothing changed: no new run is appended.
+    assert runs.add_run(sample_frame) == first and len(runs) == 1
+
+    edited = sample_frame.copy()
+    edited.loc[edited['Construct'] == 'MT RA 1', columns[1]] = 5.0
+    second = runs.add_run(edited, label='second')
+    assert second['run'] == 2 and second['aggregated'] == [columns[1]]
+    assert {col for col in columns if first['columns'][col] == second['columns'][col]} == {columns[0], columns[2]}
+    assert runs.runs()['Aggregated'].tolist() == [3, 1]
+
+    changes = runs.changes(1, 2)
+    assert changes['changed_columns'] == [columns[1]] and changes['added_columns'] == []
+    assert changes['changed_constructs'] == ['MT RA 1']
+
+    # Re-adding the first table appends a run but aggregates nothing: every column hash has a blob.
+    third = runs.add_run(sample_frame, label='back')
+    assert third['run'] == 3 and third['aggregated'] == [] and third['columns'] == first['columns']
+
+
+def test_manifest_is_append_only_and_reloaded(runs, sample_frame):
+    runs.add_run(sample_frame, label='a')
+    edited = sample_frame.assign(**{sample_frame.columns[2]: 1.0})
+    runs.add_run(edited, label='b')
+    with open(os.path.join(runs.path, MANIFEST), encoding='utf-8') as f:
+        assert [json.loads(line)['label'] for line in f] == ['a', 'b']
+    reopened = open_run_store(runs.path)
+    assert reopened.runs()['Label'].tolist() == ['a', 'b']
+    with pytest.raises(KeyError):
+        reopened.run(3)
+
+
+def test_run_trees_match_a_fresh_aggregation(runs, sample_frame):
+    runs.add_run(sample_frame)
+    edited = sample_frame.assign(**{sample_frame.columns[3]: sample_frame[sample_frame.columns[3]] / 2})
+    runs.add_run(edited)
+    for run_id, frame in ((1, sample_frame), (2, edited)):
+        matrix = aggregate_all_columns(frame)
+        for column in matrix.columns:
+            tree = runs.tree(run_id, column)
+            np.testing.assert_array_equal(tree.scores, matrix.tree(column).scores)
+            assert not tree.scores.flags.writeable
+    with pytest.raises(KeyError):
+        runs.tree(1, 'missing')
+
+    column = sample_frame.columns[3]
+    trend = runs.trend('Validity/Reliability (V/R)', columns=[column])
+    root = runs.tree(1, column).topology.root
+    np.testing.assert_allclose(trend[column].to_numpy(), [runs.tree(1, column).scores[root], runs.tree(2, column).scores[root]])
+
+
+def test_store_runs_match_frame_runs(tmp_path, runs, sample_csv, sample_frame):
+    from_store = runs.add_store_run(load_score_store(sample_csv))
+    other = open_run_store(tmp_path / 'other.runs')
+    assert other.add_run(sample_frame)['columns'] == from_store['columns']
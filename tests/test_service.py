@@ -0,0 +1,78 @@
+import http.client
+import json
+import threading
+from urllib.parse import urlencode
+
+import pytest
+
+from corix.service import make_server
+
+
+@pytest.fixture
+def server(sample_csv):
+    server = make_server(sample_csv, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path, headers=None):
+    connection = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+    try:
+        connection.request('GET', path, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def tree_path(server):
+    return '/tree?' + urlencode({'column': server.service.store.columns[0]})
+
+
+def test_tree_returns_200_with_an_etag(server):
+    status, headers, body = get(server, tree_path(server))
+    assert status == 200
+    assert headers['ETag'].startswith('"')
+    payload = json.loads(body)
+    assert payload['root'] == 'Validity/Reliability (V/R)'
+    assert len(payload['nodes']['construct']) == len(payload['nodes']['score'])
+
+
+def test_conditional_get_returns_304_without_building_a_body(server):
+    _, headers, _ = get(server, tree_path(server))
+    server.service.cache.clear()
+
+    def fail(*args):
+        raise AssertionError("body built for a conditional GET")
+
+    server.service.response_body = fail
+    status, headers_304, body = get(server, tree_path(server), {'If-None-Match': headers['ETag']})
+    assert status == 304
+    assert headers_304['ETag'] == headers['ETag']
+    assert body == b''
+
+
+@pytest.mark.parametrize('path', ['/tree?column=missing', '/nowhere', '/node?' + urlencode({'column': 'x', 'node': 'y'})])
+def test_unknown_resources_return_404(server, path):
+    status, _, body = get(server, path)
+    assert status == 404
+    assert 'error' in json.loads(body)
+
+
+def test_bad_parameters_return_400(server):
+    column = server.service.store.columns[0]
+    assert get(server, '/tree?' + urlencode({'column': column, 'depth': 'deep'}))[0] == 400
+    assert get(server, '/node?' + urlencode({'column': column}))[0] == 400
+
+
+def test_unexpected_failures_return_500(server):
+    def fail(*args):
+        raise OSError("disk gone")
+
+    server.service.body = fail
+    status, _, body = get(server, tree_path(server))
+    assert status == 500
+    assert json.loads(body) == {'error': "Internal server error."}
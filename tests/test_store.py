@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from corix.store import ScoreStore, convert_csv_to_store, default_store_path, load_score_store
+
+
+def test_round_trip(sample_csv, sample_frame):
+    store = load_score_store(sample_csv)
+    assert store.columns == list(sample_frame.columns[2:])
+    assert len(store) == len(sample_frame)
+    pd.testing.assert_frame_equal(store.frame(store.columns), sample_frame, check_dtype=False)
+    column = store.column(store.columns[0])
+    assert not column.flags.writeable
+    with pytest.raises(KeyError):
+        store.column('missing')
+
+
+def test_load_reuses_a_current_store(sample_csv):
+    first = load_score_store(sample_csv)
+    second = load_score_store(sample_csv)
+    assert second.path == first.path
+
+
+def test_reconversion_never_mixes_versions(sample_csv, sample_frame):
+    old = load_score_store(sample_csv)
+    column = old.columns[0]
+    old_digest = old.content_digest(column)
+
+    # A smaller table: an in-place rewrite would show the old store zeros or the new values.
+    sample_frame.head(5).assign(**{column: 1.0}).to_csv(sample_csv, index=False)
+    os.utime(sample_csv, ns=(0, 0))
+    new = load_score_store(sample_csv)
+
+    assert new.path != old.path
+    np.testing.assert_array_equal(new.column(column), np.ones(5))
+    np.testing.assert_array_equal(old.column(column), sample_frame[column].to_numpy())
+    assert old.content_digest(column) == old_digest != new.content_digest(column)
+    assert len(ScoreStore(old.path).constructs) == len(sample_frame)
+
+
+def test_only_the_live_and_previous_versions_are_kept(sample_csv):
+    for _ in range(4):
+        convert_csv_to_store(sample_csv)
+    versions = [name for name in os.listdir(default_store_path(sample_csv)) if name.startswith('v-')]
+    assert len(versions) == 2
+
+
+def test_missing_required_column_raises(tmp_path):
+    path = tmp_path / 'bad.csv'
+    pd.DataFrame({'Construct': ['a'], 'X': [1.0]}).to_csv(path, index=False)
+    with pytest.raises(KeyError):
+        convert_csv_to_store(path)
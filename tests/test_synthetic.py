@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from corix.benchmark import compare_results, run_benchmarks
+from corix.engine import aggregate_all_columns
+from corix.synthetic import fanout_for_size, generate_corix_table, synthetic_rules, tree_size
+
+
+@pytest.mark.parametrize('depth', [2, 3, 4, 6])
+def test_generated_trees_have_the_requested_shape(depth):
+    fanout = fanout_for_size(1000, depth)
+    assert len(fanout) == depth - 1
+    table, parent_map = generate_corix_table(fanout, n_columns=2, seed=0)
+    assert len(table) == tree_size(fanout) and abs(len(table) - 1000) < 0.2 * 1000
+    assert sorted(table['Level'].unique()) == list(range(2, depth + 2))
+    leaves = table['Level'] == depth + 1
+    assert table.loc[leaves, table.columns[2:]].notna().all().all()
+    assert table.loc[~leaves, table.columns[2:]].isna().all().all()
+    assert len(parent_map) == len(table) - 1
+
+
+@pytest.mark.parametrize('depth', [2, 3, 4, 6])
+def test_synthetic_rules_aggregate_the_leaves(depth):
+    fanout = fanout_for_size(300, depth)
+    table, parent_map = generate_corix_table(fanout, n_columns=2, seed=1)
+    rules = synthetic_rules(fanout)
+    assert rules.item_level == depth + 1
+    matrix = aggregate_all_columns(table, parent_map=parent_map, rules=rules)
+    leaves = table.loc[table['Level'] == depth + 1, table.columns[2:]].to_numpy()
+    # Complete trees: the root's children are equal-sized means, so the root is the max of their leaf means.
+    per_child = leaves.reshape(fanout[0], -1, leaves.shape[1]).mean(axis=1)
+    np.testing.assert_allclose(matrix.scores[matrix.root], per_child.max(axis=0))
+
+
+def test_nan_fraction_and_validation():
+    table, _ = generate_corix_table([3, 50], n_columns=4, nan_fraction=0.5, seed=2)
+    leaf_scores = table.loc[table['Level'] == 4, table.columns[2:]].to_numpy()
+    assert 0.4 < np.isnan(leaf_scores).mean() < 0.6
+    with pytest.raises(ValueError):
+        generate_corix_table([2], nan_fraction=1.5)
+    with pytest.raises(ValueError):
+        fanout_for_size(100, depth=1)
+
+
+@pytest.mark.parametrize('depth', [3, 5])
+def test_benchmark_records_every_stage(depth):
+    records = run_benchmarks(sizes=(200,), depth=depth, repeat=1, measure_memory=False, max_render_nodes=100)
+    assert [record['stage'] for record in records] == ['build', 'aggregate', 'layout', 'render']
+    assert all(record['seconds'] > 0 for record in records[:3])
+    assert records[3]['skipped'] and records[3]['seconds'] is None
+    with pytest.raises(ValueError):
+        run_benchmarks(sizes=(200,), stages=('unknown',))
+
+
+def test_compare_results_flags_regressions():
+    baseline = [{'stage': 'aggregate', 'n_nodes': 100, 'n_columns': 3, 'seconds': 1.0}]
+    slower = [{'stage': 'aggregate', 'n_nodes': 100, 'n_columns': 3, 'seconds': 1.5}]
+    same = [{'stage': 'aggregate', 'n_nodes': 100, 'n_columns': 3, 'seconds': 1.1}]
+    assert [r['ratio'] for r in compare_results(slower, baseline)] == [1.5]
+    assert compare_results(same, baseline) == []
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from conftest import ROOT, random_hierarchy
+from corix.topology import compile_topology
+
+
+@pytest.fixture
+def topology(rng):
+    names, levels, parent_map = random_hierarchy(rng)
+    order = rng.permutation(len(names))
+    return compile_topology([names[i] for i in order], np.asarray(levels)[order], parent_map, ROOT), parent_map
+
+
+def test_identical_hierarchies_share_one_topology(rng):
+    names, levels, parent_map = random_hierarchy(rng)
+    first = compile_topology(names, levels, parent_map, ROOT)
+    assert compile_topology(list(names), np.asarray(levels), dict(parent_map), ROOT) is first
+    assert compile_topology(names, levels, parent_map, 'n001') is not first
+
+
+def test_arrays_are_read_only(topology):
+    topology, _ = topology
+    with pytest.raises(ValueError):
+        topology.parents[0] = 1
+
+
+def test_children_match_the_parent_map_sorted_by_name(topology):
+    topology, parent_map = topology
+    for i, name in enumerate(topology.names):
+        expected = sorted(child for child, parent in parent_map.items() if parent == name)
+        assert [topology.names[c] for c in topology.children(i)] == expected
+        assert topology.parent(i) == topology.index.get(parent_map.get(name), -1)
+
+
+def test_depths_and_ancestors(topology):
+    topology, _ = topology
+    root = topology.index[ROOT]
+    assert topology.root == root and topology.depths[root] == 0
+    for i, name in enumerate(topology.names):
+        path = topology.ancestors(i)
+        if name.startswith('orphan'):
+            assert topology.depths[i] == -1
+        else:
+            assert topology.depths[i] == len(path)
+            assert path[-1:] == ([root] if i != root else [])
+
+
+def test_euler_tour_intervals_are_the_subtrees(topology):
+    topology, _ = topology
+    in_tree = np.flatnonzero(topology.depths >= 0)
+    assert sorted(topology.preorder.tolist()) == in_tree.tolist()
+    for i in in_tree:
+        subtree = topology.preorder[topology.subtree_start[i]:topology.subtree_stop[i]]
+        expected = [j for j in in_tree if j == i or i in topology.ancestors(j)]
+        assert subtree[0] == i
+        assert sorted(subtree.tolist()) == expected
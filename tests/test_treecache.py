@@ -0,0 +1,94 @@
+import threading
+
+import numpy as np
+import pytest
+
+from corix.engine import DEFAULT_RULES, PARENT_MAP, aggregate_all_columns
+from corix.store import load_score_store
+from corix.treecache import TreeCache, _hierarchy_digest, cached_store_tree, warm_tree_cache
+
+
+def test_lru_by_entries():
+    cache = TreeCache(max_entries=2, max_bytes=100)
+    cache.put('a', 1, 10)
+    cache.put('b', 2, 10)
+    assert cache.get('a') == 1
+    cache.put('c', 3, 10)
+    assert 'b' not in cache and cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1 and cache.nbytes == 20
+
+
+def test_byte_budget_and_oversize_values():
+    cache = TreeCache(max_entries=10, max_bytes=100)
+    for key in 'abc':
+        cache.put(key, key, 40)
+    assert list(cache._entries) == ['b', 'c'] and cache.nbytes == 80
+    cache.put('huge', 'huge', 101)
+    assert 'huge' not in cache and cache.nbytes == 80
+    # Replacing a key with a value over budget drops the old value too.
+    cache.put('b', 'b2', 500)
+    assert 'b' not in cache and cache.nbytes == 40
+    with pytest.raises(ValueError):
+        TreeCache(max_entries=0)
+
+
+def test_claim_resolve_and_fail():
+    cache = TreeCache()
+    cache.put('cached', 0, 1)
+    assert cache.claim(['cached', 'a', 'b']) == ['a', 'b']
+    assert cache.claim(['a', 'b']) == []
+
+    waiting = {}
+    waiter = threading.Thread(target=lambda: waiting.update(a=cache.get_or_build('a', lambda: pytest.fail('rebuilt'))))
+    waiter.start()
+    cache.resolve('a', 'built', 1)
+    waiter.join()
+    assert waiting['a'] == 'built' and cache.get('a') == 'built'
+
+    cache.fail('b', RuntimeError('broken'))
+    assert 'b' not in cache and cache.stats()['pending'] == 0
+    assert cache.claim(['b']) == ['b']
+
+
+def test_get_or_build_counts_and_releases_failures():
+    cache = TreeCache()
+    calls = []
+
+    def build():
+        calls.append(1)
+        return 'value', 8
+    assert cache.get_or_build('k', build) == 'value' == cache.get_or_build('k', build)
+    assert len(calls) == 1 and cache.stats()['misses'] == 1 and cache.stats()['hits'] == 1
+
+    def broken():
+        raise RuntimeError('broken')
+    with pytest.raises(RuntimeError):
+        cache.get_or_build('bad', broken)
+    assert cache.get_or_build('bad', build) == 'value'
+
+
+def test_default_hierarchy_has_one_key():
+    assert _hierarchy_digest(None, 'root') == _hierarchy_digest(PARENT_MAP, 'root', DEFAULT_RULES)
+    assert _hierarchy_digest(None, 'root') != _hierarchy_digest({'a': 'root'}, 'root')
+
+
+def test_store_trees_are_shared_and_read_only(sample_csv):
+    store = load_score_store(sample_csv)
+    cache = TreeCache()
+    column = store.columns[1]
+    tree = cached_store_tree(store, column, cache=cache)
+    assert cached_store_tree(store, column, cache=cache, parent_map=PARENT_MAP, rules=DEFAULT_RULES) is tree
+    assert not tree.scores.flags.writeable
+    expected = aggregate_all_columns(store.frame(store.columns)).column_scores(column)
+    np.testing.assert_array_equal(tree.scores, expected)
+    with pytest.raises(KeyError):
+        cached_store_tree(store, 'missing', cache=cache)
+
+
+def test_warm_builds_every_column_once(sample_csv):
+    store = load_score_store(sample_csv)
+    cache = TreeCache()
+    futures = warm_tree_cache(store, columns_per_task=2, cache=cache)
+    assert sum(future.result() for future in futures) == len(store.columns)
+    assert len(cache) == len(store.columns)
+    assert sum(future.result() for future in warm_tree_cache(store, cache=cache)) == 0
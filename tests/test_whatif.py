@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from conftest import ROOT, random_table
+from corix.engine import aggregate_all_columns
+from corix.whatif import WhatIfAggregator
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_incremental_updates_match_full_reaggregation(seed):
+    rng = np.random.default_rng(seed)
+    frame, parent_map = random_table(rng, n_columns=1)
+    column = frame.columns[-1]
+    matrix = aggregate_all_columns(frame, parent_map=parent_map, root_construct=ROOT)
+    topology = matrix.topology
+    aggregator = WhatIfAggregator(matrix.tree(column))
+    items = [topology.names[i] for i in np.flatnonzero(
+        (topology.levels == 5) & (topology.child_counts == 0) & (topology.depths >= 0))]
+
+    edited = frame.copy()
+    for _ in range(30):
+        name = items[rng.integers(len(items))]
+        score = np.nan if rng.random() < 0.15 else float(np.round(rng.uniform(0, 10), 2))
+        aggregator.set_leaf_score(name, score)
+        edited.loc[edited['Construct'] == name, column] = score
+        expected = aggregate_all_columns(edited, parent_map=parent_map, root_construct=ROOT).column_scores(column)
+        np.testing.assert_allclose(aggregator.scores, expected, rtol=1e-12, atol=1e-12)
+
+    aggregator.reset()
+    assert not aggregator.overrides
+    np.testing.assert_allclose(aggregator.scores, matrix.column_scores(column), rtol=1e-12, atol=1e-12)
+
+
+def test_only_item_level_leaves_can_be_overridden(sample_frame):
+    matrix = aggregate_all_columns(sample_frame)
+    aggregator = WhatIfAggregator(matrix.tree(matrix.columns[0]))
+    with pytest.raises(ValueError):
+        aggregator.set_leaf_score('Model Testing (MT)', 1.0)
+    with pytest.raises(KeyError):
+        aggregator.set_leaf_score('no such construct', 1.0)